@@ -11,9 +11,11 @@ from dash import Dash, html, dcc, Input, Output, State, no_update
 import dash_bootstrap_components as dbc
 
 from langchain.schema import Document
-from fusion_assistant_ReAct.app import simulate_group_chat_and_store, react_executor
+from fusion_assistant_ReAct.app import simulate_group_chat_and_store, make_group, session_memory
 from fusion_assistant_ReAct.groups import GroupChatSystem
 from fusion_assistant_ReAct.io.paths import STORAGE_PATH, RETRIEVAL_LOG, DRAFT_RUNS_DIR
+from fusion_assistant_ReAct.persistence.body_store import expand
+from fusion_assistant_ReAct.persistence.draft_index import DraftIndex
 
 # -----------------------
 # Per-session state store
@@ -26,10 +28,15 @@ from fusion_assistant_ReAct.io.paths import STORAGE_PATH, RETRIEVAL_LOG, DRAFT_R
 #
 # NOTE: This is per-process (per worker). For true cross-worker sharing,
 # back with Redis/DB. For now, this isolates users within a worker.
+# Prompt history is not kept here: each GroupChatSystem reads this session's
+# bounded window from app.session_memory. Entries here follow the same idle/LRU
+# policy: every access touches the session there, and its evictions drop them.
 SESSION_STATE: Dict[str, Dict[str, Any]] = {}
+session_memory.on_evict(lambda sid: SESSION_STATE.pop(sid, None))
 
 def _get_state(session_id: str) -> Dict[str, Any]:
     """Get or initialize per-session state."""
+    session_memory.touch(session_id)
     state = SESSION_STATE.setdefault(session_id, {})
     docs = state.setdefault("documents", {})
     groups = state.setdefault("group_chats", {})
@@ -38,7 +45,7 @@ def _get_state(session_id: str) -> Dict[str, Any]:
     if "Scratchpad" not in docs:
         docs["Scratchpad"] = Document(page_content="", metadata={"filename": "Scratchpad"})
     if "Scratchpad" not in groups:
-        groups["Scratchpad"] = GroupChatSystem(react_executor)
+        groups["Scratchpad"] = make_group(session_id, "Scratchpad")
 
     return state
 
@@ -188,13 +195,31 @@ def _load_run_drafts(run_file_path: str, limit: Optional[int] = None):
     with p.open("r", encoding="utf-8") as fh:
         for i, line in enumerate(fh, 1):
             try:
-                items.append(json.loads(line))
+                items.append(expand(json.loads(line)))
             except Exception:
                 continue
             if limit and len(items) >= limit:
                 break
     return items
 
+_SEARCH_FILTERS = {"host": "hostname", "hostname": "hostname", "ip": "ip", "owner": "owner", "run": "run_id"}
+
+def _search_drafts(query: str, limit: int = 50):
+    """'host:web01 owner:alice disk full' -> exact filters + full-text over the rest."""
+    filters, words = {}, []
+    for tok in (query or "").split():
+        key, sep, val = tok.partition(":")
+        if sep and key.lower() in _SEARCH_FILTERS and val:
+            filters[_SEARCH_FILTERS[key.lower()]] = val
+        else:
+            words.append(tok)
+    index = DraftIndex()
+    try:
+        index.sync()  # pick up run files written since the last search
+        return index.search(" ".join(words) or None, limit=limit, **filters)
+    finally:
+        index.close()
+
 def _render_drafts(items):
     if not items:
         return html.Div("No drafts in this run.")
@@ -203,7 +228,13 @@ def _render_drafts(items):
         subj = d.get("subject", "(no subject)")
         host = (d.get("record") or {}).get("hostname", "")
         header = f"{idx}. {subj} — {host}"
-        body_pre = html.Pre(d.get("body", ""), style=S_TERM_PRE)
+        if d.get("body_missing"):
+            body_pre = html.Div(
+                f"⚠️ Body could not be rebuilt from the body store: {d.get('body_error', 'unknown error')}",
+                className="text-danger",
+            )
+        else:
+            body_pre = html.Pre(d.get("body", ""), style=S_TERM_PRE)
         meta = html.Div([
             html.Div([html.Strong("To: "), html.Code(", ".join(d.get("to", [])) or "(none)")]),
             html.Div([html.Strong("CC: "), html.Code(", ".join(d.get("cc", [])) or "(none)")]),
@@ -257,6 +288,10 @@ def sidebar():
             dbc.Button("Refresh runs", id="refresh-runs", size="sm", className="mt-2"),
             html.Div(id="runs-msg", className="text-muted mt-2"),
             html.Div(id="drafts-panel", className="mt-2"),
+            dcc.Input(id="draft-search", type="text", debounce=True, className="mt-2",
+                      placeholder="Search all runs (host:, owner:, ip:, run: or text)", style={"width":"100%"}),
+            dbc.Button("Search drafts", id="draft-search-btn", size="sm", className="mt-2"),
+            html.Div(id="draft-search-panel", className="mt-2"),
         ]),
         className="h-100",
     )
@@ -344,6 +379,23 @@ def load_selected_run(run_file_path):
     items = _load_run_drafts(run_file_path)
     return _render_drafts(items)
 
+@app.callback(
+    Output("draft-search-panel", "children"),
+    Input("draft-search-btn", "n_clicks"),
+    Input("draft-search", "value"),
+    prevent_initial_call=True,
+)
+def search_drafts(_n, query):
+    if not (query or "").strip():
+        return html.Div("Enter a search.")
+    try:
+        items = _search_drafts(query)
+    except Exception as e:
+        return html.Div(f"Search failed: {e}", className="text-danger")
+    if not items:
+        return html.Div("No matching drafts.")
+    return _render_drafts(items)
+
 # ---------- Dynamic load area ----------
 @app.callback(Output("load-area","children"), Input("load-mode","value"))
 def render_load_area(mode):
@@ -396,7 +448,7 @@ def handle_upload(contents, filenames, session_id):
             except Exception:
                 continue
         docs[fn] = Document(page_content=text, metadata={"filename": fn})
-        state["group_chats"].setdefault(fn, GroupChatSystem(react_executor))
+        state["group_chats"].setdefault(fn, make_group(session_id, fn))
         added += 1
         last = fn
 
@@ -438,7 +490,7 @@ def handle_dir(n, dir_path, session_id):
             except Exception:
                 continue
             docs[fname] = Document(page_content=content, metadata={"filename": fname})
-            groups.setdefault(fname, GroupChatSystem(react_executor))
+            groups.setdefault(fname, make_group(session_id, fname))
             added += 1
             last = fname
 
@@ -539,7 +591,8 @@ def refresh_chat(filename, session_id):
         return []
     state = _get_state(session_id)
     groups = state["group_chats"]
-    group = groups.setdefault(filename or "Scratchpad", GroupChatSystem(react_executor))
+    name = filename or "Scratchpad"
+    group = groups.setdefault(name, make_group(session_id, name))
     return _render_history(group)
 
 @app.callback(Output("input-field","value"), Input("clear-btn","n_clicks"), prevent_initial_call=True)
@@ -569,7 +622,8 @@ def on_send(n, user_text, filename, doc_content, session_id):
 
     state = _get_state(session_id)
     groups = state["group_chats"]
-    group = groups.setdefault(filename or "Scratchpad", GroupChatSystem(react_executor))
+    name = filename or "Scratchpad"
+    group = groups.setdefault(name, make_group(session_id, name))
     try:
         simulate_group_chat_and_store(group, STORAGE_PATH, text, filename or "Scratchpad", doc_content or "")
         return ("✅ Sent.", _now_iso(), _render_history(group), "")
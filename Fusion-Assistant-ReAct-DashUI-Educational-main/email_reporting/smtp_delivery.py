@@ -0,0 +1,395 @@
+# email_reporting/smtp_delivery.py
+"""
+Bulk SMTP delivery of approved asset drafts.
+
+Reads drafts from run files (drafts/runs/<run_id>.drafts.jsonl), keeps only
+those with approved == true and at least one recipient, and sends them:
+  - over a small pool of SMTP sessions, each reused for up to
+    SMTP_MSGS_PER_CONN messages (no connect/EHLO/AUTH per email)
+  - at most SMTP_RATE_PER_DOMAIN messages per minute to any one recipient domain
+  - with exponential backoff on transient failures (disconnects, 4xx);
+    5xx replies fail the draft immediately
+  - recording per-draft state in SQLite (drafts/delivery.sqlite); drafts
+    already marked sent are skipped, so re-running a batch is safe. The
+    Message-ID is derived from the draft id, so the rare resend after a crash
+    between "250 OK" and the state write can be de-duplicated by mail systems.
+
+Any SMTP server works for testing, e.g. aiosmtpd:
+  python -m aiosmtpd -n -l localhost:8025
+  SMTP_PORT=8025 python -m email_reporting.smtp_delivery --run-id <run_id>
+
+Env:
+  SMTP_HOST / SMTP_PORT / SMTP_USER / SMTP_PASSWORD / SMTP_STARTTLS
+  SMTP_FROM              sender address (default soc-team@yourorg.com)
+  SMTP_POOL_SIZE         concurrent sessions (default 4)
+  SMTP_MSGS_PER_CONN     messages per session before reconnecting (default 100)
+  SMTP_RATE_PER_DOMAIN   messages per minute per recipient domain (default 60, 0 = unlimited)
+  SMTP_MAX_ATTEMPTS      tries per draft (default 5)
+  SMTP_BACKOFF_S         first retry delay, doubled each attempt (default 2)
+"""
+
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from email.message import EmailMessage
+from email.utils import formatdate
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+import argparse
+import hashlib
+import json
+import os
+import queue
+import random
+import smtplib
+import socket
+import sqlite3
+import threading
+import time
+
+from fusion_assistant_ReAct.io.paths import DELIVERY_DB, DRAFT_RUNS_DIR
+from fusion_assistant_ReAct.persistence.body_store import expand
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS deliveries (
+    draft_id   TEXT PRIMARY KEY,
+    run_id     TEXT,
+    status     TEXT NOT NULL,
+    attempts   INTEGER NOT NULL DEFAULT 0,
+    recipients TEXT,
+    message_id TEXT,
+    error      TEXT,
+    updated    REAL
+) WITHOUT ROWID;
+"""
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+# ---------------------- input ----------------------
+
+def iter_approved_drafts(run_files: Iterable[Path]) -> Iterator[Dict[str, Any]]:
+    """Approved drafts with at least one recipient, in file order."""
+    for path in run_files:
+        with Path(path).open("r", encoding="utf-8") as fh:
+            for line in fh:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    d = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if d.get("approved") and (d.get("to") or d.get("cc") or d.get("bcc")):
+                    yield expand(d)
+
+
+def run_files_for(run_id: Optional[str] = None, runs_dir: str = DRAFT_RUNS_DIR) -> List[Path]:
+    root = Path(runs_dir)
+    if run_id:
+        return [root / f"{run_id}.drafts.jsonl"]
+    return sorted(root.glob("*.drafts.jsonl"))
+
+
+# ---------------------- state ----------------------
+
+class DeliveryLog:
+    """Idempotent per-draft delivery state (pending / sent / failed)."""
+
+    def __init__(self, db_path: str = DELIVERY_DB):
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def status(self, draft_id: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT status FROM deliveries WHERE draft_id = ?", (draft_id,)).fetchone()
+        return row[0] if row else None
+
+    def record(self, draft: Dict[str, Any], status: str, *, attempts: int, message_id: str,
+               error: Optional[str] = None) -> None:
+        rcpts = json.dumps(_recipients(draft))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO deliveries (draft_id, run_id, status, attempts, recipients, message_id, error, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (draft["id"], draft.get("run_id"), status, attempts, rcpts, message_id, error, time.time()),
+            )
+            self._conn.commit()
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._conn.execute("SELECT status, COUNT(*) FROM deliveries GROUP BY status").fetchall())
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# ---------------------- rate limiting ----------------------
+
+class DomainRateLimiter:
+    """Token bucket per recipient domain: `per_minute` messages, refilled continuously."""
+
+    def __init__(self, per_minute: Optional[int] = None):
+        self.per_minute = per_minute if per_minute is not None else _env_int("SMTP_RATE_PER_DOMAIN", 60)
+        self._buckets: Dict[str, Tuple[float, float]] = {}  # domain -> (tokens, last refill)
+        self._lock = threading.Lock()
+
+    def acquire(self, domains: Iterable[str]) -> None:
+        """Block until every domain has a token, then take one from each."""
+        if self.per_minute <= 0:
+            return
+        domains = sorted(set(domains))
+        rate = self.per_minute / 60.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = 0.0
+                state = {}
+                for d in domains:
+                    tokens, last = self._buckets.get(d, (float(self.per_minute), now))
+                    tokens = min(float(self.per_minute), tokens + (now - last) * rate)
+                    state[d] = tokens
+                    if tokens < 1.0:
+                        wait = max(wait, (1.0 - tokens) / rate)
+                if wait == 0.0:
+                    for d, tokens in state.items():
+                        self._buckets[d] = (tokens - 1.0, now)
+                    return
+            time.sleep(wait)
+
+
+# ---------------------- connections ----------------------
+
+class SMTPPool:
+    """Up to `size` SMTP sessions, each reused for `msgs_per_conn` messages."""
+
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None, *, size: Optional[int] = None,
+                 msgs_per_conn: Optional[int] = None, timeout: float = 30.0):
+        self.host = host or os.getenv("SMTP_HOST", "localhost")
+        self.port = port or _env_int("SMTP_PORT", 25)
+        self.size = size or _env_int("SMTP_POOL_SIZE", 4)
+        self.msgs_per_conn = msgs_per_conn or _env_int("SMTP_MSGS_PER_CONN", 100)
+        self.timeout = timeout
+        self.user = os.getenv("SMTP_USER")
+        self.password = os.getenv("SMTP_PASSWORD")
+        self.starttls = os.getenv("SMTP_STARTTLS", "").lower() in ("1", "true", "yes")
+        self._idle: "queue.LifoQueue[Tuple[smtplib.SMTP, int]]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self.opened = 0
+
+    def _connect(self) -> smtplib.SMTP:
+        conn = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        conn.ehlo()
+        if self.starttls:
+            conn.starttls()
+            conn.ehlo()
+        if self.user:
+            conn.login(self.user, self.password or "")
+        with self._lock:
+            self.opened += 1
+        return conn
+
+    def send(self, msg: EmailMessage, from_addr: str, to_addrs: List[str]) -> None:
+        try:
+            conn, used = self._idle.get_nowait()
+        except queue.Empty:
+            conn, used = self._connect(), 0
+        try:
+            conn.send_message(msg, from_addr=from_addr, to_addrs=to_addrs)
+        except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused):
+            # server rejected this message; the session itself is still usable
+            try:
+                conn.rset()
+                self._idle.put((conn, used + 1))
+            except Exception:
+                _quiet_close(conn)
+            raise
+        except OSError:  # disconnects, timeouts, protocol errors
+            _quiet_close(conn)
+            raise
+        used += 1
+        if used >= self.msgs_per_conn:
+            _quiet_close(conn, quit=True)
+        else:
+            self._idle.put((conn, used))
+
+    def close(self) -> None:
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            _quiet_close(conn, quit=True)
+
+
+def _quiet_close(conn: smtplib.SMTP, quit: bool = False) -> None:
+    try:
+        conn.quit() if quit else conn.close()
+    except Exception:
+        pass
+
+
+# ---------------------- messages ----------------------
+
+def _recipients(draft: Dict[str, Any]) -> List[str]:
+    seen, out = set(), []
+    for field in ("to", "cc", "bcc"):
+        for addr in draft.get(field) or []:
+            a = str(addr).strip()
+            if a and a.lower() not in seen:
+                seen.add(a.lower())
+                out.append(a)
+    return out
+
+
+def _domain(addr: str) -> str:
+    return addr.rpartition("@")[2].lower()
+
+
+def message_id_for(draft_id: str, sender: str) -> str:
+    return f"<{hashlib.blake2b(draft_id.encode('utf-8'), digest_size=12).hexdigest()}@{_domain(sender) or 'localhost'}>"
+
+
+def build_message(draft: Dict[str, Any], sender: str) -> EmailMessage:
+    msg = EmailMessage()
+    msg["From"] = sender
+    if draft.get("to"):
+        msg["To"] = ", ".join(draft["to"])
+    if draft.get("cc"):
+        msg["Cc"] = ", ".join(draft["cc"])
+    msg["Subject"] = draft.get("subject") or "Asset Review"
+    msg["Date"] = formatdate(localtime=True)
+    msg["Message-ID"] = message_id_for(draft["id"], sender)
+    msg.set_content(draft.get("body") or "")
+    return msg
+
+
+def _transient(e: BaseException) -> bool:
+    """4xx replies and lost connections are retried; 5xx and protocol errors are final."""
+    if isinstance(e, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in e.recipients.values())
+    if isinstance(e, smtplib.SMTPResponseException):
+        return 400 <= e.smtp_code < 500
+    if isinstance(e, smtplib.SMTPServerDisconnected):
+        return True
+    if isinstance(e, smtplib.SMTPException):  # SMTPException subclasses OSError
+        return False
+    return isinstance(e, (socket.timeout, ConnectionError, OSError))
+
+
+# ---------------------- engine ----------------------
+
+def deliver_approved(
+    drafts: Iterable[Dict[str, Any]],
+    *,
+    pool: Optional[SMTPPool] = None,
+    log: Optional[DeliveryLog] = None,
+    limiter: Optional[DomainRateLimiter] = None,
+    sender: Optional[str] = None,
+    max_attempts: Optional[int] = None,
+    backoff_s: Optional[float] = None,
+    send_fn: Optional[Callable[[EmailMessage, str, List[str]], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Send every approved draft not yet marked sent. `send_fn(msg, sender,
+    recipients)` replaces the SMTP pool. Returns counts.
+    """
+    sender = sender or os.getenv("SMTP_FROM", "soc-team@yourorg.com")
+    max_attempts = max_attempts or _env_int("SMTP_MAX_ATTEMPTS", 5)
+    backoff_s = backoff_s if backoff_s is not None else float(os.getenv("SMTP_BACKOFF_S", "2"))
+    own_pool = pool is None and send_fn is None
+    pool = pool or (SMTPPool() if send_fn is None else None)
+    own_log = log is None
+    log = log or DeliveryLog()
+    limiter = limiter or DomainRateLimiter()
+    send = send_fn or pool.send
+    stats = {"sent": 0, "failed": 0, "skipped": 0, "retries": 0}
+    stats_lock = threading.Lock()
+    t0 = time.monotonic()
+
+    def _one(draft: Dict[str, Any]) -> None:
+        rcpts = _recipients(draft)
+        msg = build_message(draft, sender)
+        mid = msg["Message-ID"]
+        if draft.get("body_missing"):
+            # body could not be rebuilt from the body store; a blank email must not go out
+            log.record(draft, "failed", attempts=0, message_id=mid,
+                       error=f"body missing: {draft.get('body_error') or 'unknown'}"[:2000])
+            with stats_lock:
+                stats["failed"] += 1
+            print(f"[smtp_delivery] {draft['id']} not sent: body could not be rebuilt")
+            return
+        for attempt in range(1, max_attempts + 1):
+            limiter.acquire(_domain(r) for r in rcpts)
+            try:
+                send(msg, sender, rcpts)
+            except Exception as e:
+                if _transient(e) and attempt < max_attempts:
+                    with stats_lock:
+                        stats["retries"] += 1
+                    time.sleep(backoff_s * (2 ** (attempt - 1)) * (0.5 + random.random() / 2))
+                    continue
+                log.record(draft, "failed", attempts=attempt, message_id=mid, error=repr(e)[:2000])
+                with stats_lock:
+                    stats["failed"] += 1
+                print(f"[smtp_delivery] {draft['id']} failed after {attempt} attempt(s): {e}")
+                return
+            log.record(draft, "sent", attempts=attempt, message_id=mid)
+            with stats_lock:
+                stats["sent"] += 1
+            return
+
+    def _todo() -> Iterator[Dict[str, Any]]:
+        seen = set()
+        for d in drafts:
+            if d["id"] in seen or log.status(d["id"]) == "sent":
+                stats["skipped"] += 1
+                continue
+            seen.add(d["id"])
+            yield d
+
+    workers = pool.size if pool is not None else _env_int("SMTP_POOL_SIZE", 4)
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="smtp") as ex:
+            # bounded submission keeps memory flat for large run files
+            inflight: List[Any] = []
+            for d in _todo():
+                inflight.append(ex.submit(_one, d))
+                if len(inflight) >= workers * 4:
+                    inflight.pop(0).result()
+            for f in inflight:
+                f.result()
+    finally:
+        if own_pool and pool is not None:
+            stats["connections"] = pool.opened
+            pool.close()
+        elif pool is not None:
+            stats["connections"] = pool.opened
+        if own_log:
+            log.close()
+    stats["seconds"] = round(time.monotonic() - t0, 2)
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Send approved asset drafts over SMTP")
+    ap.add_argument("--run-id", default=None, help="one run (default: every run file)")
+    ap.add_argument("--runs-dir", default=DRAFT_RUNS_DIR)
+    ap.add_argument("--dry-run", action="store_true", help="count deliverable drafts without sending")
+    args = ap.parse_args(argv)
+
+    drafts = iter_approved_drafts(p for p in run_files_for(args.run_id, args.runs_dir) if p.exists())
+    if args.dry_run:
+        print(f"[smtp_delivery] {sum(1 for _ in drafts)} approved drafts with recipients")
+        return
+    print(f"[smtp_delivery] {deliver_approved(drafts)}")
+
+
+if __name__ == "__main__":
+    main()
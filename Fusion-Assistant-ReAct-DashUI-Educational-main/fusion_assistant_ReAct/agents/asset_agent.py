@@ -3,6 +3,7 @@ from __future__ import annotations
 from typing import Any, Dict, Iterable, List, Optional, Tuple, Callable
 from pathlib import Path
 import json
+import os
 import re
 from datetime import datetime, timezone
 import pandas as pd
@@ -11,7 +12,33 @@ from langchain.memory import ConversationBufferMemory
 from langchain.schema import BaseMessage
 
 from email_reporting.general_report import GENERAL_REPORT_TEMPLATE
+from fusion_assistant_ReAct.io.excel_cache import read_excel_cached
 from fusion_assistant_ReAct.io.paths import DRAFT_CHECKPOINT, DRAFT_RUNS_DIR
+from fusion_assistant_ReAct.persistence.checkpoint_store import CheckpointStore, db_path_for
+from fusion_assistant_ReAct.persistence.body_store import BodyStore, body_store_enabled
+from fusion_assistant_ReAct.persistence.draft_index import DraftIndex, index_enabled
+from fusion_assistant_ReAct.persistence.draft_queue import DraftQueue
+from fusion_assistant_ReAct.persistence.asset_snapshot import AssetSnapshotStore, snapshot_path_for
+from fusion_assistant_ReAct.util.misc import approx_tokens, content_id
+from fusion_assistant_ReAct.agents.asset_digest import (
+    DIGEST_PROMPT,
+    asset_health,
+    asset_table,
+    digest_actions,
+    group_by_owner as group_by_owner_fn,
+    needs_attention,
+    rules_cover,
+)
+from fusion_assistant_ReAct.agents.asset_record import AssetRecord
+from fusion_assistant_ReAct.agents.asset_triage import run_triage
+from fusion_assistant_ReAct.agents.asset_policy import AssetPolicy, policy_enabled, policy_summary
+from fusion_assistant_ReAct.agents.asset_pipeline import (
+    DurableAppender,
+    ProgressReporter,
+    count_records,
+    iter_jsonl_records,
+    run_ordered_pipeline,
+)
 
 try:
     from prompts import Asset_Disc_Prompt as DEFAULT_ASSET_TEMPLATE
@@ -37,6 +64,9 @@ class Asset_Discovery_Agent:
         ] = None,
         asset_prompt_template: Optional[str] = None,
         use_general_template: bool = True,
+        history_turns: Optional[int] = None,
+        history_max_tokens: Optional[int] = None,
+        policy: Optional[AssetPolicy] = None,
     ):
         self.qa_chain = qa_chain
         self.memory = memory or ConversationBufferMemory(return_messages=True)
@@ -45,27 +75,50 @@ class Asset_Discovery_Agent:
         self.send_email_fn = send_email_fn
         self.asset_prompt_template = asset_prompt_template or DEFAULT_ASSET_TEMPLATE
         self.use_general_template = use_general_template
+        # Interactive memory window: last N records, capped at a token budget
+        self.history_turns = (
+            history_turns if history_turns is not None
+            else int(os.getenv("ASSET_HISTORY_TURNS", "3"))
+        )
+        self.history_max_tokens = (
+            history_max_tokens if history_max_tokens is not None
+            else int(os.getenv("ASSET_HISTORY_MAX_TOKENS", "1500"))
+        )
+        # Rule-only fast path: routine records are rendered from templates (see asset_policy)
+        self.policy = policy if policy is not None else (AssetPolicy() if policy_enabled() else None)
 
         self._recipient_index: Optional[pd.DataFrame] = None
-        self._draft_queue: List[Dict[str, Any]] = []
+        self._column_lookup: Dict[str, str] = {}
+        self._key_indexes: Dict[str, Tuple[Dict[Any, int], Dict[str, int]]] = {}
+        self._row_emails: List[List[str]] = []
+        self._draft_queue = DraftQueue()  # bounded window; full history stays in the run files
         self._sent_log: List[Dict[str, Any]] = []
 
         if self.excel_path:
             self._load_excel_index(self.excel_path)
 
     # ---------------- Public: single-record path ----------------
-    def handle_query(self, data: Dict[str, Any]) -> Any:
+    def handle_query(self, data: Dict[str, Any], *, stateless: bool = False) -> Any:
+        """
+        Draft one asset email. stateless=True (batch runs) neither reads nor
+        writes conversation memory, so every record costs the same prompt size.
+        Records the policy classifies as routine get templated findings and
+        skip qa_chain; the result carries "policy_class" and "path" (template | llm).
+        """
         try:
-            history_str = self._format_history_for_prompt(
-                self.memory.load_memory_variables({}).get("history", "")
-            )
-            prompt = self.asset_prompt_template.format(
-                history=history_str,
-                asset_data=json.dumps(data, ensure_ascii=False, indent=2),
-            )
-
-            result = self.qa_chain.invoke({"input": prompt})
-            findings_text = self._extract_answer_text(result).strip()
+            policy_class = self.policy.classify(data)[0] if self.policy is not None else None
+            if policy_class is not None and policy_class in self.policy.template_classes:
+                path = "template"
+                findings_text = self.policy.render_findings(data, policy_class)
+            else:
+                path = "llm"
+                history_str = "" if stateless else self._bounded_history()
+                prompt = self.asset_prompt_template.format(
+                    history=history_str,
+                    asset_data=json.dumps(dict(data), ensure_ascii=False, indent=2),
+                )
+                result = self.qa_chain.invoke({"input": prompt})
+                findings_text = self._extract_answer_text(result).strip()
 
             subject = f"Asset Report: {data.get('hostname', '(unknown asset)')}"
             corrective, preventive = self._recommended_actions_sections(data)
@@ -81,10 +134,10 @@ class Asset_Discovery_Agent:
             else:
                 body = findings_text
 
-            self.memory.chat_memory.add_user_message(json.dumps(data, ensure_ascii=False))
-            self.memory.chat_memory.add_ai_message(body)
+            if not stateless:
+                self._remember(data, subject, findings_text)
 
-            return {"answer": body, "subject": subject}
+            return {"answer": body, "subject": subject, "policy_class": policy_class, "path": path}
         except Exception as e:
             return {"answer": f"An error occurred while processing the asset: {e}"}
 
@@ -97,11 +150,38 @@ class Asset_Discovery_Agent:
         subject_template: str = "Asset Review: {hostname}",
         run_id: Optional[str] = None,
         max_preview: int = 8,
+        workers: Optional[int] = None,
+        change_detection: Optional[bool] = None,
+        group_by_owner: Optional[bool] = None,
+        triage: Optional[bool] = None,
+        only_lines: Optional[Dict[str, Iterable[int]]] = None,
+        run_file: Optional[str] = None,
     ) -> str:
         """
         Accepts either a directory (recursively scans *.jsonl) OR a single .jsonl file.
         Drafts emails, writes checkpoint, persists full drafts to drafts/runs/<run_id>.drafts.jsonl,
         and returns a concise report string (with run file path).
+        Records are drafted concurrently by `workers` threads (see asset_pipeline);
+        output files are written in input order.
+        With change_detection (env ASSET_CHANGE_DETECTION, default on) only assets
+        whose significant state differs from the last drafted snapshot are sent
+        to the LLM (see persistence/asset_snapshot.py); the rest are reported as unchanged.
+        With group_by_owner (env ASSET_GROUP_BY_OWNER) one digest per owner is
+        drafted instead of one email per asset (see draft_owner_digest).
+        Routine records (env ASSET_POLICY, see asset_policy) skip the LLM; the
+        report counts records per policy path.
+        With triage (env ASSET_TRIAGE, default on) the whole inventory is first
+        flagged in one vectorized pass (see asset_triage); duplicate hosts, and
+        unflagged ones under ASSET_TRIAGE_SCOPE=flagged, are never drafted.
+        Records travel as compact AssetRecords; run-file drafts keep only a
+        summary + "ref" / "ref_id" (see asset_record.resolve_record) unless
+        ASSET_RUN_FULL_RECORDS is set.
+        only_lines ({file: line numbers}) and run_file restrict a call to one
+        job-queue lease and redirect its output (see asset_jobs).
+        Each draft is also added to the cross-run search index (env DRAFT_INDEX,
+        see persistence/draft_index.py). Bodies go to the content-addressed
+        section store and the run file keeps a body_ref (env DRAFT_BODY_STORE,
+        see persistence/body_store.py).
         """
         root = Path(asset_dir)
         if not root.exists():
@@ -122,76 +202,203 @@ class Asset_Discovery_Agent:
         Path(checkpoint_path).parent.mkdir(parents=True, exist_ok=True)
         Path(DRAFT_RUNS_DIR).mkdir(parents=True, exist_ok=True)
 
-        # Preload checkpoint (dedupe)
-        drafted_ids_seen = set()
         ckpt_p = Path(checkpoint_path)
-        if ckpt_p.exists():
-            with ckpt_p.open("r", encoding="utf-8") as fh:
-                for line in fh:
-                    try:
-                        rec = json.loads(line)
-                        if rec.get("status") == "drafted" and rec.get("id"):
-                            drafted_ids_seen.add(rec["id"])
-                    except Exception:
-                        pass
+        seen_this_run = set()
+        if change_detection is None:
+            change_detection = os.getenv("ASSET_CHANGE_DETECTION", "1").lower() not in ("0", "false", "no")
+        run_states: Dict[str, str] = {}  # asset_key -> fingerprint queued in this run
+        delta = {"new": 0, "changed": 0, "unchanged": 0, "untracked": 0}
+        changes_preview: List[str] = []
 
         ts = datetime.now(timezone.utc).replace(microsecond=0).isoformat()
         run_id = run_id or f"run-{ts}"
-        run_file = Path(DRAFT_RUNS_DIR) / f"{run_id}.drafts.jsonl"
+        run_file = Path(run_file) if run_file else Path(DRAFT_RUNS_DIR) / f"{run_id}.drafts.jsonl"
+        run_file.parent.mkdir(parents=True, exist_ok=True)
+        run_file_start = run_file.stat().st_size if run_file.exists() else 0
 
         created = 0
         duplicates = 0
         subjects_preview: List[str] = []
-
-        with ckpt_p.open("a", encoding="utf-8") as ckpt_fh, run_file.open("a", encoding="utf-8") as run_fh:
-            for file in files:
-                with file.open("r", encoding="utf-8") as f:
-                    for i, line in enumerate(f, 1):
-                        line = line.strip()
-                        if not line:
-                            continue
+        if triage is None:
+            triage = os.getenv("ASSET_TRIAGE", "1").lower() not in ("0", "false", "no")
+        triage_info: Optional[Dict[str, Any]] = None
+        triage_skip: set = set()
+        if only_lines is not None:
+            only_lines = {str(f): set(lines) for f, lines in only_lines.items()}
+            files = [f for f in files if str(f) in only_lines]
+            total = sum(len(v) for v in only_lines.values())
+        elif triage:
+            flags, triage_info, triage_skip = run_triage(files)
+            total = len(flags)
+            del flags
+        else:
+            total = count_records(files)
+        triaged_out = 0
+        # Run files reference the input line ("ref") instead of copying the record
+        full_records = os.getenv("ASSET_RUN_FULL_RECORDS", "").lower() in ("1", "true", "yes")
+        progress = ProgressReporter(total)
+
+        # Reader stage: drop triaged-out records and unchanged assets, then
+        # dedupe against the checkpoint (and within this run) before drafting
+        def _to_draft():
+            nonlocal duplicates, triaged_out
+            for file, line_no, rec in iter_jsonl_records(files):
+                if only_lines is not None and line_no not in only_lines[str(file)]:
+                    continue
+                if triage_skip and (str(file), line_no) in triage_skip:
+                    triaged_out += 1
+                    progress.update(skipped=1)
+                    continue
+                rec = AssetRecord.from_dict(rec, source=(str(file), line_no))
+                snap = None
+                if snapshot is not None:
+                    kind, key, state, fp, changes = snapshot.classify(rec)
+                    if key is not None and run_states.get(key) == fp:
+                        kind = "unchanged"
+                    delta[kind] += 1
+                    if kind == "unchanged":
+                        progress.update(skipped=1)
+                        continue
+                    if kind == "changed" and len(changes_preview) < max_preview:
+                        changes_preview.append(f"- {rec.get('hostname') or key}: {'; '.join(changes)}")
+                    if key is not None:
+                        run_states[key] = fp
+                        snap = (key, state, fp)
+                draft_id = self._make_draft_id(rec)
+                if draft_id in seen_this_run or store.has(draft_id):
+                    duplicates += 1
+                    progress.update(skipped=1)
+                    continue
+                seen_this_run.add(draft_id)
+                yield draft_id, rec, snap
+
+        if group_by_owner is None:
+            group_by_owner = os.getenv("ASSET_GROUP_BY_OWNER", "").lower() in ("1", "true", "yes")
+        digest_llm_calls = 0
+        policy_counts: Dict[str, int] = {}
+
+        # Worker stage: LLM call + recipient lookup (no shared mutable state)
+        def _draft(item):
+            draft_id, rec, _snap = item
+            single = self.handle_query(rec, stateless=True)  # {"answer": body, "subject": subject}
+            to_list, _meta = self._lookup_recipients(rec)
+            return {
+                "id": draft_id,
+                "record": dict(rec) if full_records else rec.summary(),
+                "subject": self._safe_subject(subject_template, rec),
+                "to": self._unique_emails(to_list),
+                "cc": [],
+                "bcc": [],
+                "body": self._extract_answer_text(single),
+                "approved": False,
+                "run_id": run_id,
+                "timestamp": ts,
+                "_policy_class": single.get("policy_class") if isinstance(single, dict) else None,
+            }
+
+        # Digest mode: one unit of work per owner group
+        def _draft_digest(group):
+            owner, members = group
+            recs = [m[1] for m in members]
+            digest = self.draft_owner_digest(owner, recs)
+            to_list: List[str] = []
+            for rec in recs:
+                to_list.extend(self._lookup_recipients(rec)[0])
+            hosts = [str(r.get("hostname") or r.get("ip") or r.get("asset_id") or "?") for r in recs]
+            return {
+                "id": f"digest:{owner}:{content_id(sorted(m[0] for m in members))}",
+                "record": {
+                    "owner": owner,
+                    "hostname": ", ".join(hosts[:3]) + (f" +{len(hosts) - 3} more" if len(hosts) > 3 else ""),
+                    "assets": [m[0] for m in members],
+                },
+                "subject": digest["subject"],
+                "to": self._unique_emails(to_list),
+                "cc": [],
+                "bcc": [],
+                "body": digest["answer"],
+                "approved": False,
+                "run_id": run_id,
+                "timestamp": ts,
+                "_llm_used": digest["llm_used"],
+            }
+
+        # Indexed checkpoint (dedupe by primary key; legacy JSONL imported on first use)
+        # and the other run stores; closed in the finally below, also when drafting fails
+        store = CheckpointStore(db_path_for(checkpoint_path), jsonl_path=checkpoint_path)
+        snapshot: Optional[AssetSnapshotStore] = None
+        body_store: Optional[BodyStore] = None
+        draft_index: Optional[DraftIndex] = None
+        try:
+            snapshot = AssetSnapshotStore(snapshot_path_for(checkpoint_path)) if change_detection else None
+            if index_enabled():
+                try:
+                    draft_index = DraftIndex()
+                except Exception as e:
+                    print(f"[asset_discovery] Draft index unavailable, continuing without it: {e}")
+            body_store = BodyStore() if body_store_enabled() else None
+
+            with DurableAppender(ckpt_p) as ckpt_fh, DurableAppender(run_file) as run_fh:
+                # Writer stage (this thread, input order): full draft first, then the
+                # checkpoint lines, so a crash never marks an unsaved draft as done
+                def _persist(draft, members):
+                    nonlocal created, digest_llm_calls, draft_index
+                    if draft.pop("_llm_used", False):
+                        digest_llm_calls += 1
+                    policy_class = draft.pop("_policy_class", None)
+                    if policy_class:
+                        policy_counts[policy_class] = policy_counts.get(policy_class, 0) + 1
+                    created += 1
+                    if len(subjects_preview) < max_preview:
+                        subjects_preview.append(f"- {draft['subject']}")
+
+                    # persist: draft content (body sections deduplicated into the body store),
+                    # then queue it (bounded in memory)
+                    run_fh.write(body_store.pack(draft) if body_store is not None else draft)
+                    self._draft_queue.append(draft, run_file=run_file)
+                    if draft_index is not None:
                         try:
-                            rec = json.loads(line)
-                        except json.JSONDecodeError:
-                            continue
-
-                        draft_id = self._make_draft_id(rec)
-                        if draft_id in drafted_ids_seen:
-                            duplicates += 1
-                            continue
-
-                        single = self.handle_query(rec)  # {"answer": body, "subject": subject}
-                        body = self._extract_answer_text(single)
-                        subject = self._safe_subject(subject_template, rec)
-
-                        to_list, _meta = self._lookup_recipients(rec)
-                        draft = {
-                            "id": draft_id,
-                            "record": rec,
-                            "subject": subject,
-                            "to": self._unique_emails(to_list),
-                            "cc": [],
-                            "bcc": [],
-                            "body": body,
-                            "approved": False,
-                            "run_id": run_id,
-                            "timestamp": ts,
-                        }
-                        self._draft_queue.append(draft)
-                        created += 1
-                        if len(subjects_preview) < max_preview:
-                            subjects_preview.append(f"- {subject}")
-
-                        # persist: checkpoint line (lightweight)
-                        ckpt_fh.write(json.dumps({
-                            "timestamp": ts, "run_id": run_id, "id": draft_id, "status": "drafted",
+                            draft_index.add(draft, run_file)
+                        except Exception as e:
+                            # the index is derived data; DraftIndex.sync() catches up from the run file
+                            print(f"[asset_discovery] Draft index write failed, continuing without it: {e}")
+                            draft_index.close()
+                            draft_index = None
+
+                    # persist: one checkpoint line (lightweight) + index row per asset covered
+                    for member_id, rec, snap in members:
+                        ckpt = {
+                            "timestamp": ts, "run_id": run_id, "id": member_id, "status": "drafted",
                             "hostname": rec.get("hostname"), "ip": rec.get("ip"),
                             "owner": rec.get("owner"), "resource_owner": rec.get("resource_owner"),
-                            "subject": subject,
-                        }, ensure_ascii=False) + "\n")
-
-                        # persist: full draft content (heavy)
-                        run_fh.write(json.dumps(draft, ensure_ascii=False) + "\n")
+                            "subject": draft["subject"],
+                        }
+                        ckpt_fh.write(ckpt)
+                        store.mark(ckpt)
+                        if snapshot is not None and snap is not None:
+                            key, state, fp = snap
+                            snapshot.update(key, state, fp, draft_id=draft["id"], run_id=run_id, updated=ts)
+
+                if group_by_owner:
+                    groups = group_by_owner_fn(_to_draft())
+                    progress.update(force=True)
+                    progress = ProgressReporter(len(groups), label="asset_digest")
+                    run_ordered_pipeline(
+                        list(groups.items()), _draft_digest, lambda g, d: _persist(d, g[1]),
+                        workers=workers, progress=progress,
+                    )
+                else:
+                    run_ordered_pipeline(
+                        _to_draft(), _draft, lambda item, d: _persist(d, [item]),
+                        workers=workers, progress=progress,
+                    )
+            if draft_index is not None:
+                draft_index.mark_synced(run_file, run_file_start)
+        finally:
+            for res in (snapshot, body_store, draft_index, store):
+                if res is not None:
+                    res.close()
+        progress.update(force=True, in_flight=0)
 
         root_display = str(root if root.is_dir() else root.parent)
         report_lines = [
@@ -204,11 +411,100 @@ class Asset_Discovery_Agent:
             f"New drafts created: {created}",
             f"Skipped duplicates: {duplicates}",
         ]
+        if group_by_owner:
+            report_lines.append(f"Owner digests: {created} (LLM used for {digest_llm_calls}, rules only for the rest)")
+        if triage_info is not None:
+            report_lines.append(
+                f"Triage: {triage_info['hosts']} hosts in {triage_info['seconds']}s - "
+                f"{triage_info['offline']} offline, {triage_info['stale']} stale, "
+                f"{triage_info['owner_missing']} owner missing, {triage_info['duplicate']} duplicate; "
+                f"{triaged_out} filtered before drafting"
+            )
+        if policy_counts:
+            report_lines.append(f"Policy paths: {policy_summary(policy_counts, self.policy.template_classes)}")
+        if snapshot is not None:
+            report_lines.append(
+                f"Change detection: {delta['new']} new, {delta['changed']} changed, "
+                f"{delta['unchanged']} unchanged (not re-drafted), {delta['untracked']} without asset key"
+            )
+        report_lines.append(f"Throughput: {progress.summary()}")
+        if changes_preview:
+            report_lines.append("Changed assets:")
+            report_lines.extend(changes_preview)
         if subjects_preview:
             report_lines.append("Sample subjects:")
             report_lines.extend(subjects_preview)
         return "\n".join(report_lines)
 
+    # ---------------- Draft access ----------------
+    def iter_drafts(self, run_id: Optional[str] = None) -> Iterable[Dict[str, Any]]:
+        """All drafts queued by this agent (or one run), streamed from the run files."""
+        return self._draft_queue.iter_drafts(run_id)
+
+    def recent_drafts(self, n: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Newest drafts still held in memory."""
+        return self._draft_queue.recent(n)
+
+    def deliver_approved(self, run_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Send approved drafts from the run files (email_reporting.smtp_delivery):
+        pooled SMTP sessions, per-domain rate limit, retries, idempotent state.
+        A configured send_email_fn is used as the transport instead of SMTP.
+        """
+        from email_reporting.smtp_delivery import deliver_approved, iter_approved_drafts, run_files_for
+
+        send_fn = None
+        if self.send_email_fn is not None:
+            def send_fn(msg, _sender, rcpts):
+                to = [a.strip() for a in (msg["To"] or "").split(",") if a.strip()]
+                cc = [a.strip() for a in (msg["Cc"] or "").split(",") if a.strip()]
+                bcc = [r for r in rcpts if r not in to and r not in cc]
+                self.send_email_fn(msg["Subject"], to, msg.get_content(), cc, bcc)
+
+        files = [p for p in run_files_for(run_id, DRAFT_RUNS_DIR) if p.exists()]
+        return deliver_approved(iter_approved_drafts(files), send_fn=send_fn)
+
+    # ---------------- Owner digests ----------------
+    def draft_owner_digest(self, owner: str, recs: List[Dict[str, Any]], *, llm_mode: Optional[str] = None) -> Dict[str, Any]:
+        """
+        One GENERAL_REPORT_TEMPLATE email covering all of an owner's assets.
+        Findings come from the status/staleness rules; the LLM is called once,
+        with a compact table, only when rules do not cover the records
+        (llm_mode / ASSET_DIGEST_LLM: auto | always | never).
+        """
+        mode = (llm_mode or os.getenv("ASSET_DIGEST_LLM", "auto")).lower()
+        use_llm = mode == "always" or (mode == "auto" and not rules_cover(recs))
+        findings = asset_table(recs)
+        if use_llm:
+            try:
+                result = self.qa_chain.invoke({"input": DIGEST_PROMPT.format(table=asset_table(recs, with_findings=False))})
+                notes = self._extract_answer_text(result).strip()
+                if notes:
+                    findings = f"{findings}\n\n{notes}"
+            except Exception as e:
+                print(f"[asset_digest] LLM findings failed for {owner}, using rule findings: {e}")
+                use_llm = False
+
+        flagged = sum(1 for r in recs if needs_attention(r))
+        subject = f"Asset Digest: {owner} ({len(recs)} assets)"
+        corrective, preventive = digest_actions(recs)
+        body = GENERAL_REPORT_TEMPLATE.format(
+            recipient_name=owner if owner != "unassigned" else "Team",
+            subject=subject,
+            findings=findings,
+            root_cause="Investigation ongoing.",
+            impact_assessment=(
+                f"{flagged} of {len(recs)} assets are offline or stale." if flagged
+                else "No direct impact reported."
+            ),
+            corrective_actions=corrective,
+            preventive_measures=preventive,
+            sender_name="SOC Automation Agent",
+            sender_title="Automated Incident Coordination System",
+            sender_contact="soc-team@yourorg.com",
+        )
+        return {"answer": body, "subject": subject, "llm_used": use_llm}
+
     # ---------------- Template helpers ----------------
     def _render_general_report_email(
         self,
@@ -233,15 +529,7 @@ class Asset_Discovery_Agent:
         )
 
     def _recommended_actions_sections(self, rec: Dict[str, Any]) -> Tuple[str, str]:
-        status = str(rec.get("status", "")).lower()
-        last_seen = str(rec.get("last_seen") or "")
-        is_stale = False
-        try:
-            if last_seen:
-                dt = datetime.fromisoformat(last_seen.replace("Z", "+00:00"))
-                is_stale = (datetime.now(timezone.utc) - dt).days >= 14
-        except Exception:
-            pass
+        status, is_stale, _days = asset_health(rec)
 
         offline_or_stale_advice = (
             "- For any offline or stale agents, ensure the endpoint agent is updated and maintains an online status "
@@ -257,6 +545,32 @@ class Asset_Discovery_Agent:
         preventive = "\n".join(preventive_items) if preventive_items else "- Maintain standard monitoring cadence."
         return corrective, preventive
 
+    # ---------------- Memory ----------------
+    def _remember(self, data: Dict[str, Any], subject: str, findings: str) -> None:
+        """Store a compact summary of the exchange (not the full email) and trim old turns."""
+        summary = f"{subject}\n{(findings or '').strip()[:600]}"
+        self.memory.chat_memory.add_user_message(json.dumps(dict(data), ensure_ascii=False, separators=(",", ":")))
+        self.memory.chat_memory.add_ai_message(summary)
+        try:
+            msgs = self.memory.chat_memory.messages
+            keep = max(self.history_turns, 0) * 2
+            if len(msgs) > keep:
+                del msgs[:len(msgs) - keep]
+        except Exception:
+            pass
+
+    def _bounded_history(self) -> str:
+        """Last `history_turns` records; oldest lines dropped until under `history_max_tokens`."""
+        if self.history_turns <= 0:
+            return ""
+        history = self.memory.load_memory_variables({}).get("history", "")
+        if not isinstance(history, list):
+            return self._format_history_for_prompt(history)[-self.history_max_tokens * 4:]
+        lines = self._format_history_for_prompt(history[-self.history_turns * 2:]).split("\n")
+        while lines and approx_tokens("\n".join(lines)) > self.history_max_tokens:
+            lines.pop(0)
+        return "\n".join(lines)
+
     # ---------------- Internals ----------------
     def _format_history_for_prompt(self, history: Any) -> str:
         try:
@@ -298,12 +612,52 @@ class Asset_Discovery_Agent:
             return "Asset Review"
 
     def _load_excel_index(self, path: str):
+        """
+        Read the ownership sheet once and build hash indexes, so recipient
+        resolution is O(1) per record instead of a DataFrame scan per key:
+          - per match column: exact value -> first row, case-folded str -> first row
+          - per row: emails pre-extracted from every *email column
+        """
+        self._key_indexes = {}
+        self._row_emails = []
         if not path:
             self._recipient_index = None
             return
-        df = pd.read_excel(path)
+        df = read_excel_cached(path)
         df.columns = [str(c).strip() for c in df.columns]
         self._recipient_index = df
+        self._column_lookup = {c.lower(): c for c in df.columns}
+        email_cols = [c for c in df.columns if str(c).lower().endswith("email")]
+        cells = zip(*(df[c].tolist() for c in email_cols)) if email_cols else ([] for _ in range(len(df)))
+        self._row_emails = [
+            self._unique_emails(e for cell in row for e in self._extract_emails_from_cell(cell))
+            for row in cells
+        ]
+        for key in self.recipient_match_keys:
+            self._key_index(key)
+
+    def _key_index(self, key: str) -> Optional[Tuple[Dict[Any, int], Dict[str, int]]]:
+        """(exact, case-folded) value -> first row position for one column; built once, on demand."""
+        df = self._recipient_index
+        if df is None:
+            return None
+        col = key if key in df.columns else self._column_lookup.get(key.lower())
+        if col is None:
+            return None
+        idx = self._key_indexes.get(col)
+        if idx is None:
+            exact: Dict[Any, int] = {}
+            folded: Dict[str, int] = {}
+            for pos, v in enumerate(df[col].tolist()):
+                if v is None or v != v:  # blank / NaN cells never match
+                    continue
+                folded.setdefault(str(v).lower(), pos)
+                try:
+                    exact.setdefault(v, pos)
+                except TypeError:
+                    pass
+            idx = self._key_indexes[col] = (exact, folded)
+        return idx
 
     def _lookup_recipients(self, rec: Dict[str, Any]) -> Tuple[List[str], Dict[str, Any]]:
         emails: List[str] = []
@@ -314,41 +668,47 @@ class Asset_Discovery_Agent:
             value = rec.get(key)
             if value is None:
                 continue
-            row = self._find_excel_row(key, value)
-            if row is not None:
+            pos = self._find_excel_pos(key, value)
+            if pos is not None:
                 meta["match_key"] = key
                 meta["match_value"] = value
-                email_cols = [c for c in self._recipient_index.columns if str(c).lower().endswith("email")]
-                for c in email_cols:
-                    emails.extend(self._extract_emails_from_cell(row.get(c)))
                 meta["cc"] = []
                 meta["bcc"] = []
-                return self._unique_emails(emails), meta
+                return list(self._row_emails[pos]), meta
         return self._unique_emails(emails), meta
 
-    def _find_excel_row(self, key: str, value: Any) -> Optional[Dict[str, Any]]:
-        df = self._recipient_index
-        if df is None:
+    def _find_excel_pos(self, key: str, value: Any) -> Optional[int]:
+        """Row position matching value: exact, then any list element (first row wins), then case-insensitive."""
+        idx = self._key_index(key)
+        if idx is None:
             return None
-        if key not in df.columns:
-            lower_map = {c.lower(): c for c in df.columns}
-            if key.lower() in lower_map:
-                key = lower_map[key.lower()]
-            else:
-                return None
-        exact = df[df[key] == value]
-        if not exact.empty:
-            return exact.iloc[0].to_dict()
+        exact, folded = idx
+        try:
+            pos = exact.get(value)
+        except TypeError:  # unhashable (list / dict)
+            pos = None
+        if pos is not None:
+            return pos
         if isinstance(value, (list, tuple)) and value:
-            any_match = df[df[key].isin(value)]
-            if not any_match.empty:
-                return any_match.iloc[0].to_dict()
+            hits = []
+            for v in value:
+                try:
+                    if v in exact:
+                        hits.append(exact[v])
+                except TypeError:
+                    continue
+            if hits:
+                return min(hits)
         if isinstance(value, str):
-            ci = df[df[key].astype(str).str.lower() == value.lower()]
-            if not ci.empty:
-                return ci.iloc[0].to_dict()
+            return folded.get(value.lower())
         return None
 
+    def _find_excel_row(self, key: str, value: Any) -> Optional[Dict[str, Any]]:
+        pos = self._find_excel_pos(key, value)
+        if pos is None:
+            return None
+        return self._recipient_index.iloc[pos].to_dict()
+
     def _extract_emails_from_cell(self, cell: Any) -> List[str]:
         if cell is None:
             return []
@@ -367,9 +727,6 @@ class Asset_Discovery_Agent:
         return out
 
     def _make_draft_id(self, rec: Dict[str, Any]) -> str:
+        """<host>:<BLAKE2b of canonical JSON>; stable across processes and restarts."""
         host = str(rec.get("hostname") or rec.get("asset_id") or rec.get("ip") or "asset")
-        try:
-            s = json.dumps(rec, sort_keys=True)
-        except Exception:
-            s = str(rec)
-        return f"{host}:{abs(hash(s)) % (10**8)}"
+        return f"{host}:{content_id(dict(rec))}"
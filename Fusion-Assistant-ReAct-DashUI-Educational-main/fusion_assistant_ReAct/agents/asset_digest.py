@@ -0,0 +1,151 @@
+# fusion_assistant_ReAct/agents/asset_digest.py
+"""
+Owner-grouped digest helpers for Asset_Discovery_Agent.
+
+One digest email per owner instead of one LLM-drafted email per asset:
+  - status/staleness findings come from the same rules as the per-asset
+    "recommended actions" sections (no LLM needed)
+  - only when some asset carries a risk field the rules cannot assess
+    (notes, vulnerabilities, ...) is the LLM called, once per owner, with a
+    compact pipe-separated table of that owner's assets; other extra fields
+    (secondary_owner, tags, ...) are descriptive and do not need it
+
+Env:
+  ASSET_DIGEST_LLM          auto | always | never   (default auto)
+  ASSET_DIGEST_RISK_FIELDS  fields that need the LLM when non-empty (comma list)
+  ASSET_DIGEST_RULE_FIELDS  optional strict mode: any non-empty field outside
+                            this comma list also needs the LLM (default unset)
+  ASSET_STALE_DAYS          staleness threshold in days (default 14)
+"""
+
+from __future__ import annotations
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import os
+
+
+DIGEST_PROMPT = (
+    "You write the findings section of an asset-owner digest email.\n"
+    "For EACH row below write one line '<hostname>: <finding>' covering status, risk and the action needed.\n"
+    "Be concise; do not add greetings or a subject.\n\n"
+    "{table}"
+)
+
+_DEFAULT_RISK_FIELDS = "notes,comments,vulnerabilities,vulns,cves,alerts,findings,incidents,risk,risk_score"
+
+
+def stale_days() -> int:
+    return int(os.getenv("ASSET_STALE_DAYS", "14"))
+
+
+def _field_list(raw: str) -> List[str]:
+    return [f.strip() for f in raw.split(",") if f.strip()]
+
+
+def risk_fields() -> List[str]:
+    return _field_list(os.getenv("ASSET_DIGEST_RISK_FIELDS", _DEFAULT_RISK_FIELDS))
+
+
+def rule_fields() -> Optional[List[str]]:
+    """Strict allow-list, only when ASSET_DIGEST_RULE_FIELDS is set."""
+    raw = os.getenv("ASSET_DIGEST_RULE_FIELDS")
+    return _field_list(raw) if raw else None
+
+
+def owner_of(rec: Dict[str, Any]) -> str:
+    return str(rec.get("resource_owner") or rec.get("owner") or "unassigned")
+
+
+def asset_health(rec: Dict[str, Any], now: Optional[datetime] = None) -> Tuple[str, bool, Optional[int]]:
+    """(status lowercased, is_stale, days since last_seen or None)."""
+    status = str(rec.get("status", "")).lower()
+    last_seen = str(rec.get("last_seen") or "")
+    days: Optional[int] = None
+    try:
+        if last_seen:
+            dt = datetime.fromisoformat(last_seen.replace("Z", "+00:00"))
+            if dt.tzinfo is None:
+                dt = dt.replace(tzinfo=timezone.utc)
+            days = ((now or datetime.now(timezone.utc)) - dt).days
+    except Exception:
+        pass
+    return status, days is not None and days >= stale_days(), days
+
+
+def needs_attention(rec: Dict[str, Any]) -> bool:
+    status, is_stale, _ = asset_health(rec)
+    return status != "online" or is_stale
+
+
+def rule_finding(rec: Dict[str, Any]) -> str:
+    status, is_stale, days = asset_health(rec)
+    if status != "online" and is_stale:
+        return f"{status or 'unknown status'}, no check-in for {days} days"
+    if status != "online":
+        return f"{status or 'unknown status'}"
+    if is_stale:
+        return f"online but stale, no check-in for {days} days"
+    return "online, healthy"
+
+
+def uncovered_fields(rec: Dict[str, Any], fields: Optional[Sequence[str]] = None) -> List[str]:
+    """Non-empty fields of `rec` the rules cannot assess: risk fields, plus (strict mode) anything not allow-listed."""
+    risk = set(risk_fields())
+    allowed = fields if fields is not None else rule_fields()
+    allowed = set(allowed) if allowed is not None else None
+    return [
+        k for k, v in rec.items()
+        if v not in (None, "", [], {}) and (k in risk or (allowed is not None and k not in allowed))
+    ]
+
+
+def rules_cover(recs: Iterable[Dict[str, Any]], fields: Optional[Sequence[str]] = None) -> bool:
+    """True when no record carries a field the rules cannot assess (see uncovered_fields)."""
+    return not any(uncovered_fields(rec, fields) for rec in recs)
+
+
+def _cell(v: Any) -> str:
+    s = "" if v is None else (", ".join(map(str, v)) if isinstance(v, (list, tuple)) else str(v))
+    return s.replace("|", "/").replace("\n", " ").strip()[:120]
+
+
+def asset_table(recs: Sequence[Dict[str, Any]], *, with_findings: bool = True) -> str:
+    """Markdown table; columns are the union of non-empty fields (hostname/ip/status/last_seen first)."""
+    lead = ["hostname", "ip", "status", "last_seen"]
+    cols = [c for c in lead if any(r.get(c) not in (None, "") for r in recs)]
+    skip = set(lead) | {"owner", "resource_owner"}
+    for r in recs:
+        for k, v in r.items():
+            if k not in skip and k not in cols and v not in (None, "", [], {}):
+                cols.append(k)
+    header = cols + (["finding"] if with_findings else [])
+    lines = ["| " + " | ".join(header) + " |", "|" + "---|" * len(header)]
+    for r in recs:
+        row = [_cell(r.get(c)) for c in cols] + ([rule_finding(r)] if with_findings else [])
+        lines.append("| " + " | ".join(row) + " |")
+    return "\n".join(lines)
+
+
+def digest_actions(recs: Sequence[Dict[str, Any]]) -> Tuple[str, str]:
+    """Corrective/preventive sections for a whole owner group, listing affected hosts."""
+    flagged = [r for r in recs if needs_attention(r)]
+    if flagged:
+        hosts = ", ".join(_cell(r.get("hostname") or r.get("ip") or r.get("asset_id")) for r in flagged[:50])
+        more = f" (+{len(flagged) - 50} more)" if len(flagged) > 50 else ""
+        corrective = (
+            f"- For the offline or stale agents ({hosts}{more}), ensure the endpoint agent is updated and "
+            "maintains an online status to reduce monitoring blind spots."
+        )
+        preventive = "- Implement a weekly stale-heartbeat check with automatic owner notification."
+    else:
+        corrective = "- No immediate corrective actions required."
+        preventive = "- Continue routine patching and agent health checks."
+    return corrective, preventive
+
+
+def group_by_owner(items: Iterable[Tuple[Any, Dict[str, Any], Any]]) -> Dict[str, List[Tuple[Any, Dict[str, Any], Any]]]:
+    """Group reader items (draft_id, record, snapshot) by owner, keeping first-seen order."""
+    groups: Dict[str, List[Tuple[Any, Dict[str, Any], Any]]] = {}
+    for item in items:
+        groups.setdefault(owner_of(item[1]), []).append(item)
+    return groups
@@ -0,0 +1,206 @@
+# fusion_assistant_ReAct/agents/asset_jobs.py
+"""
+Multi-process asset drafting on top of persistence/job_queue.
+
+  submit  shard the inventory into leases (after the same triage pre-filter
+          run_from_config applies, done once for the whole inventory)
+  work    claim leases until the job is finished; each lease is drafted by
+          Asset_Discovery_Agent.run_from_config(only_lines=..., run_file=...)
+          while a heartbeat thread keeps the lease alive
+  merge   combine all lease results into drafts/runs/<run_id>.drafts.jsonl
+  status  lease counts per state
+
+Workers share the checkpoint index and change-detection snapshot (both
+SQLite), so a retried lease skips records a killed worker already drafted.
+A killed worker loses at most the leases it held; they expire after
+`lease_seconds` and are re-claimed.
+
+CLI (run as many `work` processes as you like, on any host sharing the queue
+file; --ollama-url points each one at its own backend):
+  python -m fusion_assistant_ReAct.agents.asset_jobs submit --run-id R --asset-dir assets/
+  python -m fusion_assistant_ReAct.agents.asset_jobs work   --run-id R --ollama-url http://gpu2:11434
+  python -m fusion_assistant_ReAct.agents.asset_jobs merge  --run-id R
+
+Env:
+  ASSET_JOB_QUEUE          queue database (default drafts/asset_jobs.sqlite)
+  ASSET_JOB_LEASE_SIZE     records per lease (default 500)
+  ASSET_JOB_LEASE_SECONDS  lease duration before a silent worker loses it (default 300)
+  ASSET_JOB_MAX_ATTEMPTS   claims per lease before it is marked failed (default 3)
+"""
+
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import argparse
+import os
+import socket
+import threading
+import time
+import uuid
+
+from fusion_assistant_ReAct.io.paths import ASSET_DIR, ASSET_JOB_QUEUE, DRAFT_CHECKPOINT, DRAFT_RUNS_DIR
+from fusion_assistant_ReAct.persistence.job_queue import JobQueue, Lease, result_path
+from fusion_assistant_ReAct.agents.asset_triage import run_triage
+
+
+def default_lease_seconds() -> float:
+    return float(os.getenv("ASSET_JOB_LEASE_SECONDS", "300"))
+
+
+def asset_files(asset_dir: str) -> List[Path]:
+    """Same input resolution as run_from_config: one .jsonl file, or every *.jsonl under a directory."""
+    root = Path(asset_dir)
+    if root.is_file() and root.suffix.lower() == ".jsonl":
+        return [root]
+    if root.is_dir():
+        return list(root.glob("**/*.jsonl"))
+    return []
+
+
+def submit_job(
+    queue: JobQueue,
+    run_id: str,
+    asset_dir: str = ASSET_DIR,
+    *,
+    lease_size: Optional[int] = None,
+    triage: Optional[bool] = None,
+) -> Dict[str, Any]:
+    files = asset_files(asset_dir)
+    if not files:
+        raise FileNotFoundError(f"No .jsonl input under {asset_dir}")
+    if triage is None:
+        triage = os.getenv("ASSET_TRIAGE", "1").lower() not in ("0", "false", "no")
+    info: Dict[str, Any] = {}
+    skip = set()
+    if triage:
+        _flags, info, skip = run_triage(files)
+    lease_size = lease_size or int(os.getenv("ASSET_JOB_LEASE_SIZE", "500"))
+    leases = queue.submit(run_id, files, lease_size=lease_size, skip=skip)
+    return {"run_id": run_id, "leases": leases, "lease_size": lease_size, "triage": info}
+
+
+class _Heartbeat(threading.Thread):
+    """Extends a lease every lease_seconds/3 until stopped; flags `lost` if it was taken over."""
+
+    def __init__(self, queue: JobQueue, lease: Lease, worker_id: str, lease_seconds: float):
+        super().__init__(daemon=True, name=f"lease-{lease.seq}-heartbeat")
+        self.queue, self.lease, self.worker_id, self.lease_seconds = queue, lease, worker_id, lease_seconds
+        self.lost = False
+        self._stop_evt = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_evt.wait(max(self.lease_seconds / 3, 1.0)):
+            if not self.queue.heartbeat(self.lease, self.worker_id, self.lease_seconds):
+                self.lost = True
+                print(f"[asset_jobs] Lost lease {self.lease.run_id}#{self.lease.seq} (expired and re-claimed)")
+                return
+
+    def stop(self) -> None:
+        self._stop_evt.set()
+        self.join()
+
+
+def run_worker(
+    agent,
+    queue: JobQueue,
+    run_id: str,
+    *,
+    worker_id: Optional[str] = None,
+    lease_seconds: Optional[float] = None,
+    checkpoint_path: str = DRAFT_CHECKPOINT,
+    runs_dir: str = DRAFT_RUNS_DIR,
+    workers: Optional[int] = None,
+    poll_s: float = 5.0,
+) -> Dict[str, int]:
+    """
+    Claim and draft leases until none are pending or held by others.
+    While other workers hold unexpired leases this one waits, so it can
+    take over any of them that expire. Returns per-worker counts.
+    """
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+    lease_seconds = lease_seconds or default_lease_seconds()
+    stats = {"completed": 0, "failed": 0, "lost": 0}
+    while True:
+        lease = queue.claim(run_id, worker_id, lease_seconds)
+        if lease is None:
+            if queue.is_finished(run_id):
+                break
+            nxt = queue.next_expiry(run_id)
+            time.sleep(min(poll_s, max((nxt or 0) - time.time(), 0.1)))
+            continue
+
+        print(f"[asset_jobs] {worker_id} drafting {run_id}#{lease.seq} ({len(lease.lines)} records, attempt {lease.attempt})")
+        hb = _Heartbeat(queue, lease, worker_id, lease_seconds)
+        hb.start()
+        try:
+            agent.run_from_config(
+                asset_dir=lease.file,
+                checkpoint_path=checkpoint_path,
+                run_id=run_id,
+                workers=workers,
+                triage=False,  # applied once at submit time
+                only_lines={lease.file: lease.lines},
+                run_file=str(result_path(runs_dir, run_id, lease.seq, lease.attempt)),
+            )
+        except Exception as e:
+            hb.stop()
+            queue.fail(lease, worker_id, repr(e))
+            stats["failed"] += 1
+            print(f"[asset_jobs] Lease {run_id}#{lease.seq} failed: {e}")
+            continue
+        hb.stop()
+        if queue.complete(lease, worker_id):
+            stats["completed"] += 1
+        else:
+            stats["lost"] += 1  # results are still merged; duplicates are dropped by draft id
+    return stats
+
+
+def build_worker_agent(base_url: Optional[str] = None):
+    """Asset_Discovery_Agent with only the asset retrieval chain (no other indexes or agents)."""
+    from langchain import hub
+    from langchain.chains.combine_documents import create_stuff_documents_chain
+    from langchain.chains.retrieval import create_retrieval_chain
+
+    from fusion_assistant_ReAct.agents.asset_agent import Asset_Discovery_Agent
+    from fusion_assistant_ReAct.io.paths import DATASETS
+    from fusion_assistant_ReAct.llm.models import get_llm_for
+    from fusion_assistant_ReAct.retrieval.retrievers import mmr
+    from fusion_assistant_ReAct.retrieval.vectorstores import build_or_load_all
+
+    vs = build_or_load_all({"asset": DATASETS["asset"]})["asset"]
+    llm = get_llm_for("asset_docs", **({"base_url": base_url} if base_url else {}))
+    docs_chain = create_stuff_documents_chain(llm, hub.pull("langchain-ai/retrieval-qa-chat"))
+    chain = create_retrieval_chain(mmr(vs, k=4, fetch_k=20, lambda_mult=0.7), docs_chain)
+    return Asset_Discovery_Agent(chain)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Multi-process asset drafting job queue")
+    ap.add_argument("command", choices=("submit", "work", "merge", "status"))
+    ap.add_argument("--run-id", required=True)
+    ap.add_argument("--queue", default=ASSET_JOB_QUEUE)
+    ap.add_argument("--asset-dir", default=ASSET_DIR)
+    ap.add_argument("--lease-size", type=int, default=None)
+    ap.add_argument("--lease-seconds", type=float, default=None)
+    ap.add_argument("--workers", type=int, default=None, help="drafting threads per worker process")
+    ap.add_argument("--ollama-url", default=None, help="Ollama backend for this worker")
+    ap.add_argument("--checkpoint", default=DRAFT_CHECKPOINT)
+    args = ap.parse_args(argv)
+
+    with JobQueue(args.queue) as queue:
+        if args.command == "submit":
+            print(submit_job(queue, args.run_id, args.asset_dir, lease_size=args.lease_size))
+        elif args.command == "work":
+            agent = build_worker_agent(args.ollama_url)
+            print(run_worker(agent, queue, args.run_id, lease_seconds=args.lease_seconds,
+                             checkpoint_path=args.checkpoint, workers=args.workers))
+        elif args.command == "merge":
+            path, n = queue.merge(args.run_id, DRAFT_RUNS_DIR)
+            print(f"[asset_jobs] Merged {n} drafts into {path} ({queue.counts(args.run_id)})")
+        else:
+            print(queue.counts(args.run_id))
+
+
+if __name__ == "__main__":
+    main()
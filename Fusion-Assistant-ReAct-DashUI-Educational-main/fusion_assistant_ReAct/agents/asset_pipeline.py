@@ -0,0 +1,201 @@
+# fusion_assistant_ReAct/agents/asset_pipeline.py
+"""
+Pipelined execution for asset drafting runs.
+
+Three stages:
+  reader  - lazy generator over the input JSONL (nothing is read ahead of the pool)
+  workers - bounded thread pool running the LLM drafting calls concurrently;
+            at most `max_in_flight` records are submitted at any time
+  writer  - the calling thread; consumes results strictly in input order, so
+            checkpoint and run-file output is identical to a serial run
+
+Worker count defaults to ASSET_DRAFT_WORKERS, else OLLAMA_NUM_PARALLEL (the
+server's per-model concurrency), else 4.
+"""
+
+from __future__ import annotations
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple, TypeVar
+import json
+import os
+import time
+
+try:
+    import orjson
+
+    _loads = orjson.loads
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    _loads = json.loads
+
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def default_workers() -> int:
+    return max(1, int(os.getenv("ASSET_DRAFT_WORKERS") or os.getenv("OLLAMA_NUM_PARALLEL") or "4"))
+
+
+# ---------------------- reader ----------------------
+
+def count_records(files: Iterable[Path]) -> int:
+    """Non-empty lines across files (cheap pre-pass so progress can show an ETA)."""
+    n = 0
+    for file in files:
+        with Path(file).open("rb") as fh:
+            n += sum(1 for line in fh if line.strip())
+    return n
+
+
+def iter_jsonl_records(files: Iterable[Path]) -> Iterator[Tuple[Path, int, Dict[str, Any]]]:
+    """Yield (file, line_no, record); blank and malformed lines are skipped."""
+    for file in files:
+        with Path(file).open("r", encoding="utf-8") as f:
+            for i, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    rec = _loads(line)
+                except ValueError:
+                    continue
+                yield file, i, rec
+
+
+# ---------------------- progress ----------------------
+
+def _fmt_duration(seconds: float) -> str:
+    seconds = int(max(seconds, 0))
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    return f"{h}h{m:02d}m{s:02d}s" if h else f"{m}m{s:02d}s"
+
+
+class ProgressReporter:
+    """Prints done/total, records per second, in-flight count and ETA every `every_s` seconds."""
+
+    def __init__(self, total: Optional[int] = None, *, label: str = "asset_pipeline", every_s: Optional[float] = None):
+        self.total = total
+        self.label = label
+        self.every_s = every_s if every_s is not None else float(os.getenv("ASSET_PROGRESS_EVERY_S", "5"))
+        self.started = time.monotonic()
+        self._last = 0.0
+        self.done = 0
+        self.skipped = 0
+        self.in_flight = 0
+
+    def rate(self) -> float:
+        elapsed = time.monotonic() - self.started
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    def eta(self) -> Optional[float]:
+        r = self.rate()
+        if self.total is None or r <= 0:
+            return None
+        return max(self.total - self.done - self.skipped, 0) / r
+
+    def line(self) -> str:
+        total = f"/{self.total}" if self.total is not None else ""
+        eta = self.eta()
+        return (
+            f"[{self.label}] {self.done + self.skipped}{total} processed "
+            f"({self.done} drafted, {self.skipped} skipped) | {self.rate():.2f} rec/s | "
+            f"in-flight {self.in_flight} | ETA {_fmt_duration(eta) if eta is not None else '?'}"
+        )
+
+    def update(self, *, done: int = 0, skipped: int = 0, in_flight: Optional[int] = None, force: bool = False) -> None:
+        self.done += done
+        self.skipped += skipped
+        if in_flight is not None:
+            self.in_flight = in_flight
+        now = time.monotonic()
+        if force or now - self._last >= self.every_s:
+            self._last = now
+            print(self.line())
+
+    def summary(self) -> str:
+        return f"{self.done} drafted in {_fmt_duration(time.monotonic() - self.started)} ({self.rate():.2f} rec/s)"
+
+
+# ---------------------- engine ----------------------
+
+def run_ordered_pipeline(
+    items: Iterable[T],
+    work: Callable[[T], R],
+    sink: Callable[[T, R], None],
+    *,
+    workers: Optional[int] = None,
+    max_in_flight: Optional[int] = None,
+    progress: Optional[ProgressReporter] = None,
+) -> int:
+    """
+    Run work(item) on a bounded pool and call sink(item, result) in input
+    order from the calling thread. Returns the number of items processed.
+    A worker exception stops submission and is re-raised after the items
+    before it have been written.
+    """
+    workers = workers or default_workers()
+    max_in_flight = max(max_in_flight or workers * 2, workers)
+    pending: Dict[int, Tuple[T, "Future[R]"]] = {}
+    source = iter(items)
+    submitted = written = 0
+    exhausted = False
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="asset-draft") as pool:
+        try:
+            while True:
+                while not exhausted and len(pending) < max_in_flight:
+                    try:
+                        item = next(source)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    pending[submitted] = (item, pool.submit(work, item))
+                    submitted += 1
+                if not pending:
+                    break
+                item, fut = pending.pop(written)
+                result = fut.result()  # head-of-line wait keeps output ordered
+                sink(item, result)
+                written += 1
+                if progress is not None:
+                    progress.update(done=1, in_flight=len(pending))
+        except BaseException:
+            for _, f in pending.values():
+                f.cancel()
+            raise
+    return written
+
+
+class DurableAppender:
+    """Append-only JSONL writer: flush every line, fsync every `fsync_every` lines and on close."""
+
+    def __init__(self, path: Path, *, fsync_every: Optional[int] = None):
+        self.path = Path(path)
+        self.fsync_every = fsync_every if fsync_every is not None else int(os.getenv("ASSET_FSYNC_EVERY", "50"))
+        self._fh = self.path.open("a", encoding="utf-8")
+        self._since_sync = 0
+
+    def write(self, obj: Dict[str, Any]) -> None:
+        self._fh.write(json.dumps(obj, ensure_ascii=False) + "\n")
+        self._fh.flush()
+        self._since_sync += 1
+        if self.fsync_every and self._since_sync >= self.fsync_every:
+            self.sync()
+
+    def sync(self) -> None:
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+        self._since_sync = 0
+
+    def close(self) -> None:
+        if not self._fh.closed:
+            self.sync()
+            self._fh.close()
+
+    def __enter__(self) -> "DurableAppender":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
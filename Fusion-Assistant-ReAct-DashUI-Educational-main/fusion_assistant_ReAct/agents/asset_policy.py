@@ -0,0 +1,142 @@
+# fusion_assistant_ReAct/agents/asset_policy.py
+"""
+Policy engine deciding, per asset record, whether findings need the LLM.
+
+Classes (first match wins):
+  anomalous      risk fields the rules cannot assess (notes, vulnerabilities, ...;
+                 see asset_digest.uncovered_fields), or an unrecognised status
+  unknown_owner  no owner / resource_owner
+  unknown_os     os present but empty / "unknown"
+  offline        status != online
+  stale          online but last_seen older than stale_days
+  healthy        everything else
+
+Classes listed in `template_classes` get findings rendered from `templates`
+without calling qa_chain; the rest go to the LLM.
+
+Env:
+  ASSET_POLICY                    1/0 enable the rule-only path (default 1)
+  ASSET_POLICY_TEMPLATE_CLASSES   comma list (default healthy,offline,stale)
+  ASSET_POLICY_CONFIG             optional YAML with template_classes,
+                                  known_statuses and templates (overrides env)
+  ASSET_STALE_DAYS                staleness threshold, shared with asset_digest
+"""
+
+from __future__ import annotations
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import os
+
+import yaml
+
+from .asset_digest import asset_health, uncovered_fields
+
+
+CLASSES = ("anomalous", "unknown_owner", "unknown_os", "offline", "stale", "healthy")
+
+DEFAULT_TEMPLATES: Dict[str, str] = {
+    "healthy": (
+        "{asset} is online and last checked in {last_seen_ago}. "
+        "No issues were detected during this review."
+    ),
+    "offline": (
+        "{asset} is reporting status '{status}' (last check-in: {last_seen_ago}). "
+        "While offline, the asset is not visible to monitoring and may miss security updates."
+    ),
+    "stale": (
+        "{asset} reports status '{status}' but has not checked in for {days} days "
+        "(last seen {last_seen}). Its monitoring data may be outdated."
+    ),
+    "unknown_owner": (
+        "{asset} has no recorded owner. Please confirm ownership so future findings reach the right team."
+    ),
+    "unknown_os": (
+        "{asset} has no recorded operating system, so patch and vulnerability coverage cannot be confirmed."
+    ),
+}
+
+_UNKNOWN = ("", "unknown", "n/a", "none", "null")
+
+
+def _text(v: Any) -> str:
+    """Template value: lists (e.g. "ip": ["10.0.0.1"]) joined, everything else str()."""
+    return ", ".join(map(str, v)) if isinstance(v, (list, tuple)) else str(v)
+
+
+def policy_enabled() -> bool:
+    return os.getenv("ASSET_POLICY", "1").lower() in ("1", "true", "yes")
+
+
+def _load_yaml(path: Optional[str]) -> Dict[str, Any]:
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, "r") as f:
+        return yaml.safe_load(f) or {}
+
+
+class AssetPolicy:
+    def __init__(
+        self,
+        *,
+        template_classes: Optional[Iterable[str]] = None,
+        known_statuses: Optional[Iterable[str]] = None,
+        templates: Optional[Dict[str, str]] = None,
+        config_path: Optional[str] = None,
+    ):
+        cfg = _load_yaml(config_path or os.getenv("ASSET_POLICY_CONFIG"))
+        if template_classes is None:
+            template_classes = cfg.get("template_classes") or [
+                c.strip() for c in os.getenv("ASSET_POLICY_TEMPLATE_CLASSES", "healthy,offline,stale").split(",")
+                if c.strip()
+            ]
+        self.template_classes = set(template_classes)
+        self.known_statuses = {s.lower() for s in (known_statuses or cfg.get("known_statuses") or ("online", "offline"))}
+        self.templates = {**DEFAULT_TEMPLATES, **(cfg.get("templates") or {}), **(templates or {})}
+
+    def classify(self, rec: Dict[str, Any]) -> Tuple[str, List[str]]:
+        """(class, reasons)."""
+        status, is_stale, days = asset_health(rec)
+        extra = uncovered_fields(rec)
+        if extra:
+            return "anomalous", [f"fields outside rule coverage: {', '.join(extra)}"]
+        if status not in self.known_statuses:
+            return "anomalous", [f"unrecognised status '{status}'"]
+        if str(rec.get("resource_owner") or rec.get("owner") or "").strip().lower() in _UNKNOWN:
+            return "unknown_owner", ["no owner"]
+        if "os" in rec and str(rec.get("os") or "").strip().lower() in _UNKNOWN:
+            return "unknown_os", ["no os"]
+        if status != "online":
+            return "offline", [f"status '{status}'"]
+        if is_stale:
+            return "stale", [f"last seen {days} days ago"]
+        return "healthy", []
+
+    def needs_llm(self, rec: Dict[str, Any]) -> bool:
+        return self.classify(rec)[0] not in self.template_classes
+
+    def render_findings(self, rec: Dict[str, Any], cls: Optional[str] = None) -> str:
+        cls = cls or self.classify(rec)[0]
+        status, _is_stale, days = asset_health(rec)
+        values: Dict[str, Any] = defaultdict(
+            lambda: "n/a", {k: _text(v) for k, v in rec.items() if v not in (None, "", [], {})}
+        )
+        values["status"] = status or "unknown"
+        values["days"] = days if days is not None else "n/a"
+        values["last_seen_ago"] = (
+            "today" if days == 0 else f"{days} day{'s' if days != 1 else ''} ago" if days is not None else "unknown"
+        )
+        ip = _text(rec.get("ip")) if rec.get("ip") not in (None, "", []) else ""
+        host = _text(rec.get("hostname") or rec.get("asset_id")) or ip or "The asset"
+        values["asset"] = f"{host} ({ip})" if ip and ip != host else host
+        return self.templates.get(cls, DEFAULT_TEMPLATES["healthy"]).format_map(values)
+
+
+def policy_summary(counts: Dict[str, int], template_classes: Iterable[str]) -> str:
+    """'template 12 (healthy 9, offline 3); LLM 2 (anomalous 2)' for run reports."""
+    tmpl = set(template_classes)
+    def _part(keys):
+        items = [(c, counts.get(c, 0)) for c in CLASSES if c in keys and counts.get(c)]
+        return sum(n for _, n in items), ", ".join(f"{c} {n}" for c, n in items)
+    t_n, t_s = _part(tmpl)
+    l_n, l_s = _part(set(CLASSES) - tmpl)
+    return f"template {t_n}" + (f" ({t_s})" if t_s else "") + f"; LLM {l_n}" + (f" ({l_s})" if l_s else "")
@@ -0,0 +1,168 @@
+# fusion_assistant_ReAct/agents/asset_record.py
+"""
+Compact asset record for batch runs.
+
+AssetRecord is a read-only Mapping over __slots__ storage:
+  - well-known fields live in fixed slots; anything else goes to `extra`
+  - low-cardinality strings (status, os, owner, ...) are sys.intern'ed, so
+    100k records with status "online" share one string object
+  - the key order tuple is shared by every record with the same layout
+  - `source` remembers (file, line) so run files can store a reference
+    instead of a second full copy of the record; the reference carries the
+    absolute path and the record's content id, so it still resolves from
+    another working directory and never silently returns a different record
+    after the input file was edited
+
+It behaves like the dict it was built from (get / items / ** / dict(rec)),
+so rules, prompts and draft IDs see exactly the same data.
+"""
+
+from __future__ import annotations
+from array import array
+from collections import OrderedDict
+from collections.abc import Mapping
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple, Union
+import json
+import os
+import sys
+import threading
+
+from fusion_assistant_ReAct.util.misc import content_id
+
+
+FIELDS = (
+    "asset_id", "hostname", "ip", "mac", "status", "os", "os_version",
+    "owner", "resource_owner", "last_seen", "first_seen", "type", "location",
+)
+_FIELD_SET = frozenset(FIELDS)
+_INTERNED = frozenset(("status", "os", "os_version", "owner", "resource_owner", "type", "location"))
+_SUMMARY_FIELDS = ("hostname", "ip", "asset_id", "owner", "resource_owner", "status")
+
+_layouts: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+
+@lru_cache(maxsize=1024)
+def _abs_path(path: str) -> str:
+    return str(Path(path).resolve())
+
+
+def _layout(keys: Tuple[str, ...]) -> Tuple[str, ...]:
+    return _layouts.setdefault(keys, keys)
+
+
+class AssetRecord(Mapping):
+    __slots__ = FIELDS + ("extra", "source", "_keys")
+
+    def __init__(self, data: Dict[str, Any], source: Optional[Tuple[str, int]] = None):
+        for f in FIELDS:
+            setattr(self, f, None)
+        extra: Dict[str, Any] = {}
+        for k, v in data.items():
+            if k in _FIELD_SET:
+                if k in _INTERNED and isinstance(v, str):
+                    v = sys.intern(v)
+                setattr(self, k, v)
+            else:
+                extra[k] = v
+        self.extra = extra or None
+        self.source = source
+        self._keys = _layout(tuple(sys.intern(str(k)) for k in data))
+
+    @classmethod
+    def from_dict(cls, data: Any, source: Optional[Tuple[str, int]] = None) -> "AssetRecord":
+        return data if isinstance(data, cls) else cls(data, source)
+
+    # ---- Mapping ----
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._keys:
+            raise KeyError(key)
+        return getattr(self, key) if key in _FIELD_SET else self.extra[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._keys
+
+    def __repr__(self) -> str:
+        return f"AssetRecord({self.to_dict()!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {k: self[k] for k in self._keys}
+
+    # ---- references ----
+    @property
+    def ref(self) -> Optional[str]:
+        """'<absolute file>:<line>' of the input line this record was read from."""
+        return f"{_abs_path(str(self.source[0]))}:{self.source[1]}" if self.source else None
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        What run files keep instead of the full record: a few display fields
+        plus the source ref and ref_id (content id of the full record, the
+        same digest the draft id ends with).
+        """
+        out = {f: self[f] for f in _SUMMARY_FIELDS if f in self._keys and self[f] not in (None, "")}
+        if self.source:
+            out["ref"] = self.ref
+            out["ref_id"] = content_id(self.to_dict())
+        return out
+
+
+# ---- line-offset index: one pass per input file, then one seek per ref ----
+_INDEX_FILES = 8
+_line_index: "OrderedDict[str, Tuple[Tuple[int, int], array]]" = OrderedDict()
+_index_lock = threading.Lock()
+
+
+def _line_offsets(path: str) -> array:
+    """Byte offset of every line start in `path` (rebuilt when the file's mtime/size change)."""
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    with _index_lock:
+        hit = _line_index.get(path)
+        if hit is not None and hit[0] == stamp:
+            _line_index.move_to_end(path)
+            return hit[1]
+    offsets = array("q")
+    pos = 0
+    with open(path, "rb") as fh:
+        for raw in fh:
+            offsets.append(pos)
+            pos += len(raw)
+    with _index_lock:
+        _line_index[path] = (stamp, offsets)
+        while len(_line_index) > _INDEX_FILES:
+            _line_index.popitem(last=False)
+    return offsets
+
+
+def resolve_record(ref: Union[str, Dict[str, Any]], ref_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Load the full record behind a '<file>:<line>' reference, or behind a
+    run-file summary ({"ref", "ref_id", ...}). None if the file/line is gone
+    or the line no longer holds the record the ref was taken from.
+    The first lookup in a file indexes its line offsets, so resolving every
+    ref of a run costs one pass over each input file.
+    """
+    if isinstance(ref, dict):
+        ref, ref_id = ref.get("ref"), ref_id or ref.get("ref_id")
+    path, _, line_no = str(ref or "").rpartition(":")
+    try:
+        target = int(line_no)
+        offsets = _line_offsets(path)
+        if not 1 <= target <= len(offsets):
+            return None
+        with open(path, "rb") as fh:
+            fh.seek(offsets[target - 1])
+            rec = json.loads(fh.readline())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(rec, dict) or (ref_id is not None and content_id(rec) != ref_id):
+        return None
+    return rec
@@ -0,0 +1,164 @@
+# fusion_assistant_ReAct/agents/asset_triage.py
+"""
+Vectorized inventory triage for asset drafting runs.
+
+load_inventory() parses the input JSONL in bulk (orjson when installed) into
+a columnar frame that holds only the fields triage needs plus each record's
+(file, line) position. triage() then computes, across the whole inventory
+at once:
+  offline        status != online (missing status counts as offline)
+  stale          last_seen older than ASSET_STALE_DAYS
+  owner_missing  neither resource_owner nor owner set
+  duplicate      asset key (asset_id / mac / hostname / ip) seen again later
+                 in the inventory; the last occurrence is the one kept
+  flagged        offline | stale | owner_missing
+
+run_from_config uses the result as a pre-filter: duplicates are never
+drafted, and with ASSET_TRIAGE_SCOPE=flagged only flagged hosts are.
+
+Env:
+  ASSET_TRIAGE         1/0 (default 1)
+  ASSET_TRIAGE_SCOPE   all | flagged (default all)
+"""
+
+from __future__ import annotations
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from .asset_digest import stale_days as default_stale_days
+from ..util.misc import scalar_value
+
+try:
+    import orjson
+
+    _loads = orjson.loads
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    import json
+
+    _loads = json.loads
+
+
+TRIAGE_COLUMNS = ("asset_id", "mac", "hostname", "ip", "status", "last_seen", "owner", "resource_owner")
+_KEY_FIELDS = ("asset_id", "mac", "hostname", "ip")  # same order as persistence/asset_snapshot.asset_key
+
+
+def load_inventory(files: Iterable[Path], columns: Iterable[str] = TRIAGE_COLUMNS) -> pd.DataFrame:
+    """One row per parseable record: triage columns + _file / _line (matching iter_jsonl_records)."""
+    columns = list(columns)
+    data: Dict[str, list] = {c: [] for c in columns}
+    pos_file, pos_line = [], []
+    for file in files:
+        name = str(file)
+        with Path(file).open("rb") as fh:
+            for i, line in enumerate(fh, 1):
+                if not line.strip():
+                    continue
+                try:
+                    rec = _loads(line)
+                except ValueError:
+                    continue
+                if not isinstance(rec, dict):
+                    continue
+                for c in columns:
+                    data[c].append(rec.get(c))
+                pos_file.append(name)
+                pos_line.append(i)
+    df = pd.DataFrame(data, columns=columns)
+    df["_file"] = pos_file
+    df["_line"] = pos_line
+    return df
+
+
+def _hashable(s: pd.Series) -> pd.Series:
+    if s.dtype != object:
+        return s
+    containers = s.map(lambda v: isinstance(v, (list, tuple, set, dict))).to_numpy(dtype=bool)
+    if not containers.any():
+        return s
+    s = s.copy()
+    s[containers] = s[containers].map(scalar_value)
+    return s
+
+
+def _text(s: pd.Series) -> pd.Series:
+    """
+    Lower-cased stripped strings (object dtype); null / blank -> None.
+    List values are joined first (see util.misc.scalar_value). String ops run once per
+    distinct value (factorize), not once per row.
+    """
+    codes, uniques = pd.factorize(_hashable(s), use_na_sentinel=True)
+    norm = np.asarray(pd.Index(uniques).astype(str).str.strip().str.lower(), dtype=object)
+    norm[norm == ""] = None
+    out = np.full(len(s), None, dtype=object)
+    present = codes >= 0
+    out[present] = norm[codes[present]]
+    return pd.Series(out, index=s.index)
+
+
+def triage(df: pd.DataFrame, *, now: Optional[datetime] = None, stale_days: Optional[int] = None) -> pd.DataFrame:
+    """Add offline / stale / owner_missing / duplicate / flagged (bool) and days_since_seen columns."""
+    now = now or datetime.now(timezone.utc)
+    threshold = stale_days if stale_days is not None else default_stale_days()
+    out = df.copy()
+
+    out["offline"] = (_text(out["status"]) != "online").to_numpy()
+
+    seen = pd.to_datetime(out["last_seen"], utc=True, errors="coerce", format="ISO8601")
+    out["days_since_seen"] = (pd.Timestamp(now) - seen).dt.days
+    out["stale"] = (out["days_since_seen"] >= threshold).fillna(False).astype(bool)
+
+    out["owner_missing"] = _text(out["resource_owner"]).isna() & _text(out["owner"]).isna()
+
+    key = pd.Series(None, index=out.index, dtype=object)
+    for field in _KEY_FIELDS:
+        todo = key.isna() & out[field].notna()
+        if not todo.any():
+            continue
+        part = _text(out.loc[todo, field]).dropna()
+        if field == "mac":
+            part = part.str.replace("-", ":", regex=False).str.replace(".", "", regex=False)
+        key[part.index] = field + ":" + part
+    out["duplicate"] = key.notna() & key.duplicated(keep="last")
+
+    out["flagged"] = out["offline"] | out["stale"] | out["owner_missing"]
+    return out
+
+
+def triage_summary(flags: pd.DataFrame) -> Dict[str, int]:
+    return {
+        "hosts": int(len(flags)),
+        "offline": int(flags["offline"].sum()),
+        "stale": int(flags["stale"].sum()),
+        "owner_missing": int(flags["owner_missing"].sum()),
+        "duplicate": int(flags["duplicate"].sum()),
+        "flagged": int(flags["flagged"].sum()),
+    }
+
+
+def triage_scope() -> str:
+    return os.getenv("ASSET_TRIAGE_SCOPE", "all").lower()
+
+
+def skip_positions(flags: pd.DataFrame, scope: Optional[str] = None) -> Set[Tuple[str, int]]:
+    """(file, line) of records the pre-filter drops: duplicates, plus unflagged ones when scope == 'flagged'."""
+    drop = flags["duplicate"]
+    if (scope or triage_scope()) == "flagged":
+        drop = drop | ~flags["flagged"]
+    hit = flags.loc[drop, ["_file", "_line"]]
+    return set(zip(hit["_file"].tolist(), hit["_line"].tolist()))
+
+
+def run_triage(files: Iterable[Path], *, scope: Optional[str] = None) -> Tuple[pd.DataFrame, Dict[str, Any], Set[Tuple[str, int]]]:
+    """load_inventory + triage + skip set; summary carries the elapsed seconds."""
+    t0 = time.monotonic()
+    flags = triage(load_inventory(files))
+    summary: Dict[str, Any] = triage_summary(flags)
+    skip = skip_positions(flags, scope)
+    summary["seconds"] = round(time.monotonic() - t0, 2)
+    return flags, summary, skip
@@ -1,13 +1,16 @@
 # fusion_assistant_ReAct/agents/lcel_agent.py
 from __future__ import annotations
-from typing import Any, Optional
-import os, re, json
+from typing import Any, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+import os, re, json, threading, time
 
 from langchain.memory import ConversationBufferMemory
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.output_parsers import StrOutputParser
 
-from ..llm.models import get_default_doc_llm
+from ..llm.models import get_llm_for
+from ..persistence.session_memory import SessionMemoryStore
+from ..lqel.repair import repair_lqel
 
 try:
     from prompts import LCEL_Query_Prompt as DEFAULT_LCEL_TEMPLATE
@@ -117,9 +120,18 @@ def _build_repair_chain(llm):
 class LCELQueryAgent:
     """
     Decides per query whether to use retrieval:
-      - If gate says YES -> call retrieval chain (self.qa_chain)
+      - A local embedding gate (retrieval_gate) answers when it is confident
+      - Otherwise the LLM gate is asked; if it says YES -> call retrieval chain (self.qa_chain)
       - Else -> call direct chain (self.direct_chain)
-    Enforces final output to be a single ```lqel``` block (auto-repairs SQL).
+    Speculative mode (optional) starts fetching LQEL examples from `retriever`
+    while the gate decides; the docs are fed to `combine_docs_chain` on YES and
+    discarded on NO. If they are not in within `speculative_deadline` (or the
+    fetch fails) the answer comes from direct_chain; retrieval is never run a
+    second time. A fetch that has already started cannot be cancelled: it
+    finishes on its pool thread and the result is dropped.
+    Enforces final output to be a single ```lqel``` block: output is validated
+    with the local LQEL parser and mechanically repaired where possible; only
+    what cannot be fixed locally goes through repair_chain.
     """
 
     def __init__(
@@ -127,13 +139,26 @@ class LCELQueryAgent:
         qa_chain: Any,
         memory: Optional[ConversationBufferMemory] = None,
         prompt_template: Optional[str] = None,
+        retrieval_gate: Optional[Any] = None,
+        retriever: Optional[Any] = None,
+        combine_docs_chain: Optional[Any] = None,
+        speculative: Optional[bool] = None,
+        speculative_deadline: Optional[float] = None,
+        session_memory: Optional[SessionMemoryStore] = None,
     ):
         self.qa_chain = qa_chain
+        self.retrieval_gate = retrieval_gate
+        self.retriever = retriever
+        self.combine_docs_chain = combine_docs_chain
         self.memory = memory or ConversationBufferMemory(return_messages=True)
+        # Inside a UI request, chat_history is that session's bounded window instead of self.memory
+        self.session_memory = session_memory
+        self.history_turns = int(os.getenv("LCEL_HISTORY_TURNS", "3"))
         self.prompt_template = prompt_template or DEFAULT_LCEL_TEMPLATE
 
         # IMPORTANT: do NOT bind temperature; some clients reject it.
-        llm = get_default_doc_llm()
+        # Each chain gets its own profile (see `chains` in model_config.yaml).
+        llm = get_llm_for("lcel_direct")
 
         # Direct (strict) LQEL chain
         direct_prompt = ChatPromptTemplate.from_messages(
@@ -167,15 +192,33 @@ class LCELQueryAgent:
                 ("human", "Query: {query}"),
             ]
         )
-        self.gate_chain = (gate_prompt | llm | StrOutputParser())
+        self.gate_chain = (gate_prompt | get_llm_for("lcel_gate") | StrOutputParser())
 
         # Repair chain (to convert any non-LQEL/SQL to LQEL)
-        self.repair_chain = _build_repair_chain(llm)
+        self.repair_chain = _build_repair_chain(get_llm_for("lcel_repair"))
 
         # Env overrides (optional)
         self.always_retrieve = os.getenv("LCEL_ALWAYS_RETRIEVE", "").lower() in ("1", "true", "yes")
         self.never_retrieve  = os.getenv("LCEL_NEVER_RETRIEVE",  "").lower() in ("1", "true", "yes")
 
+        # Speculative retrieval (needs the retriever + combine chain split out of qa_chain)
+        if speculative is None:
+            speculative = os.getenv("LCEL_SPECULATIVE", "").lower() in ("1", "true", "yes")
+        self.speculative = bool(speculative) and retriever is not None and combine_docs_chain is not None
+        self.speculative_deadline = (
+            speculative_deadline if speculative_deadline is not None
+            else float(os.getenv("LCEL_SPECULATIVE_DEADLINE", "10"))
+        )
+        self._spec_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="lcel-spec") if self.speculative else None
+        # Counters are shared by every UI session using this agent
+        self._stats_lock = threading.Lock()
+        self._spec_stats: Dict[str, int] = {"used": 0, "discarded": 0, "timeout": 0, "error": 0}
+        self._repair_stats: Dict[str, int] = {"local_ok": 0, "local_fixed": 0, "llm": 0}
+
+    def _count(self, stats: Dict[str, int], key: str) -> None:
+        with self._stats_lock:
+            stats[key] += 1
+
     # ---------------------- decision logic ----------------------
 
     def _should_retrieve(self, query: str) -> bool:
@@ -191,24 +234,73 @@ class LCELQueryAgent:
         if has_tokens and mentions_edit:
             return False
 
+        # Local classifier first; the LLM gate only runs when it is unsure
+        if self.retrieval_gate is not None:
+            decision = self.retrieval_gate.decide(q)
+            if decision is not None:
+                return decision
+
         try:
             ans = (self.gate_chain.invoke({"query": q}) or "").strip().upper()
             return ans.startswith("Y")
         except Exception:
             return not (has_tokens and len(q) > 40)
 
+    def _speculative_candidate(self, query: str, hist_msgs) -> str:
+        """
+        Run the gate and the example fetch concurrently; the fetch result is
+        used only if the gate says YES and it lands before the deadline,
+        otherwise direct_chain answers without examples.
+        """
+        started = time.monotonic()
+        fut = self._spec_pool.submit(self.retriever.invoke, query)
+
+        if not self._should_retrieve(query):
+            fut.cancel()  # only stops a fetch still queued behind another one
+            self._count(self._spec_stats, "discarded")
+            return self.direct_chain.invoke({"input": query, "chat_history": hist_msgs})
+
+        remaining = max(0.0, self.speculative_deadline - (time.monotonic() - started))
+        try:
+            docs = fut.result(timeout=remaining)
+        except FutureTimeout:
+            fut.cancel()
+            self._count(self._spec_stats, "timeout")
+            print(f"[lcel] Speculative retrieval missed the {self.speculative_deadline}s deadline; answering without examples.")
+            return self.direct_chain.invoke({"input": query, "chat_history": hist_msgs})
+        except Exception as e:
+            self._count(self._spec_stats, "error")
+            print(f"[lcel] Speculative retrieval failed ({e}); answering without examples.")
+            return self.direct_chain.invoke({"input": query, "chat_history": hist_msgs})
+
+        self._count(self._spec_stats, "used")
+        raw = self.combine_docs_chain.invoke({"input": query, "chat_history": hist_msgs, "context": docs})
+        return as_text(raw)
+
+    def speculative_stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return dict(self._spec_stats)
+
+    def repair_stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return dict(self._repair_stats)
+
     # ---------------------- enforcement -------------------------
 
     def _enforce_lqel_once(self, text: str, history=None) -> str:
-        # Already OK?
-        if _looks_like_lqel(text) and not _looks_like_sql(text):
-            block = _extract_lqel_block(text) or text
-            return _wrap_as_lqel(block)
-
-        # Try repair
+        # Local grammar check + mechanical repairs (fences, parens, simple SQL)
+        body, fixes = repair_lqel(as_text(text))
+        if body:
+            self._count(self._repair_stats, "local_fixed" if fixes else "local_ok")
+            if fixes:
+                print(f"[lcel] Repaired LQEL locally: {', '.join(fixes)}")
+            return _wrap_as_lqel(body)
+
+        # Only output the local repairer cannot fix goes back to the model
+        self._count(self._repair_stats, "llm")
         repaired = self.repair_chain.invoke({"bad_text": as_text(text)})
-        block = _extract_lqel_block(repaired)
-        if block and not _looks_like_sql(block):
+        block, _ = repair_lqel(repaired)
+        if block:
             return _wrap_as_lqel(block)
 
         # Last resort: salvage
@@ -219,37 +311,51 @@ class LCELQueryAgent:
 
         return "```lqel\n```"
 
+    # ---------------------- memory -------------------------
+
+    def _history(self):
+        window = self.session_memory.current_window("#lcel") if self.session_memory is not None else None
+        if window is not None:
+            return window.messages(self.history_turns, self.session_memory.max_tokens)
+        return list(self.memory.chat_memory.messages)
+
+    def _remember(self, query: str, text: str) -> None:
+        window = self.session_memory.current_window("#lcel") if self.session_memory is not None else None
+        if window is not None:
+            window.add(query, text)
+            return
+        self.memory.chat_memory.add_user_message(query)
+        self.memory.chat_memory.add_ai_message(text)
+
     # ---------------------- public APIs -------------------------
 
     def handle_query_direct(self, query: str):
         try:
-            hist = list(self.memory.chat_memory.messages)
+            hist = self._history()
             raw = self.direct_chain.invoke({"input": query, "chat_history": hist})
             text = self._enforce_lqel_once(raw, history=hist)
-            self.memory.chat_memory.add_user_message(query)
-            self.memory.chat_memory.add_ai_message(text)
+            self._remember(query, text)
             return {"text": text}
         except Exception as e:
             err = f"An error occurred while generating the query: {e}"
-            self.memory.chat_memory.add_user_message(query)
-            self.memory.chat_memory.add_ai_message(err)
+            self._remember(query, err)
             return {"text": err, "error": True}
 
     def handle_query(self, query: str):
         try:
-            hist_msgs = list(self.memory.chat_memory.messages)
-            if self._should_retrieve(query):
+            hist_msgs = self._history()
+            if self.speculative and not self.never_retrieve:
+                candidate = self._speculative_candidate(query, hist_msgs)
+            elif self._should_retrieve(query):
                 raw = self.qa_chain.invoke({"input": query, "chat_history": hist_msgs})
                 candidate = as_text(raw)
             else:
                 candidate = self.direct_chain.invoke({"input": query, "chat_history": hist_msgs})
 
             text = self._enforce_lqel_once(candidate, history=hist_msgs)
-            self.memory.chat_memory.add_user_message(query)
-            self.memory.chat_memory.add_ai_message(text)
+            self._remember(query, text)
             return {"text": text}
         except Exception as e:
             err = f"An error occurred while processing the query: {e}"
-            self.memory.chat_memory.add_user_message(query)
-            self.memory.chat_memory.add_ai_message(err)
+            self._remember(query, err)
             return {"text": err, "error": True}
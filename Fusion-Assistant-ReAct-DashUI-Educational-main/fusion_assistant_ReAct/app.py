@@ -1,6 +1,6 @@
 # fusion_assistant_ReAct/app.py
 import os
-from typing import Dict
+from typing import Dict, Optional
 from langchain import hub
 from langchain.chains.combine_documents import create_stuff_documents_chain
 from langchain.chains.retrieval import create_retrieval_chain
@@ -11,26 +11,42 @@ from .agents.lcel_agent import LCELQueryAgent
 from .agents.asset_agent import Asset_Discovery_Agent
 from .retrieval.vectorstores import build_or_load_all
 from .retrieval.retrievers import build_retrievers_from_vectorstores
-from .llm.models import get_default_doc_llm
+from .retrieval.gate import LocalRetrievalGate
+from .llm.models import get_llm_for
 from .react_agent import build_react_agent_executor
-from .io.paths import DATASETS
+from .router import FastPathRouter
+from .io.paths import DATASETS, QUERY_DS_XLSX
+from .persistence.session_memory import SessionMemoryStore
 from embeddings_oss import embeddings
 from prompts import Doc_Analysis_prompt
 
 
+# Per-session, bounded conversation windows shared by every GroupChatSystem
+session_memory = SessionMemoryStore()
+
+
 def _build_chains_and_agents() -> Dict[str, object]:
     vs_map = build_or_load_all(DATASETS)
     retrievers = build_retrievers_from_vectorstores(vs_map)
 
     retrieval_qa_chat_prompt = hub.pull("langchain-ai/retrieval-qa-chat")
-    doc_llm = get_default_doc_llm()
+    doc_llm = get_llm_for("react")
 
-    combine_docs_chain = create_stuff_documents_chain(doc_llm, retrieval_qa_chat_prompt)
+    combine_docs_chain = create_stuff_documents_chain(get_llm_for("lcel_docs"), retrieval_qa_chat_prompt)
+    asset_docs_chain   = create_stuff_documents_chain(get_llm_for("asset_docs"), retrieval_qa_chat_prompt)
 
     lcel_chain  = create_retrieval_chain(retrievers["lcel"],  combine_docs_chain)
-    asset_chain = create_retrieval_chain(retrievers["asset"], combine_docs_chain)
+    asset_chain = create_retrieval_chain(retrievers["asset"], asset_docs_chain)
 
-    lcel_agent    = LCELQueryAgent(lcel_chain, memory=ConversationBufferMemory(return_messages=True))
+    lcel_gate     = LocalRetrievalGate(embeddings, examples_path=QUERY_DS_XLSX)
+    lcel_agent    = LCELQueryAgent(
+        lcel_chain,
+        memory=ConversationBufferMemory(return_messages=True),
+        retrieval_gate=lcel_gate,
+        retriever=retrievers["lcel"],
+        combine_docs_chain=combine_docs_chain,
+        session_memory=session_memory,
+    )
     asset_agent   = Asset_Discovery_Agent(asset_chain, memory=ConversationBufferMemory(return_messages=True))
 
     return {
@@ -41,18 +57,20 @@ def _build_chains_and_agents() -> Dict[str, object]:
 
 _objs = _build_chains_and_agents()
 
-react_executor = build_react_agent_executor(
+_react = build_react_agent_executor(
     _objs["doc_llm"],
     # sigma_agent=_objs["sigma"],
     # log_agent=_objs["log"],
     # document_agent=_objs["summary"],
     lcel_agent=_objs["lcel"],
     asset_agent=_objs["asset"],
-    memory=ConversationBufferMemory(return_messages=True),
 )
 
-def make_group() -> GroupChatSystem:
-    return GroupChatSystem(react_executor)
+# Rule/embedding pre-router; ambiguous messages still go through the ReAct LLM
+react_executor = FastPathRouter(_react, embeddings=embeddings, examples_path=QUERY_DS_XLSX)
+
+def make_group(session_id: Optional[str] = None, conversation: str = "default") -> GroupChatSystem:
+    return GroupChatSystem(react_executor, session_id=session_id, conversation=conversation, memory=session_memory)
 
 def simulate_group_chat_and_store(group_chat: GroupChatSystem, json_file_path: str, query: str, fn=None, content=None):
     group_chat.add_message("User1", query)
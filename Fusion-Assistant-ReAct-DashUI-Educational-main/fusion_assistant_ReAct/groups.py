@@ -1,8 +1,10 @@
 # fusion_assistant_ReAct/groups.py
 from typing import Any, Dict, List, Optional
 import json
+import os
 from langchain.schema import Document
 from .persistence.chat_history import store_chatHist, documents_to_json_serializable
+from .persistence.session_memory import SessionMemoryStore, current_session
 
 def _as_text(resp: Any) -> str:
     if resp is None:
@@ -20,30 +22,68 @@ def _as_text(resp: Any) -> str:
     return str(resp)
 
 class GroupChatSystem:
-    def __init__(self, executor):
+    def __init__(
+        self,
+        executor,
+        *,
+        session_id: Optional[str] = None,
+        conversation: str = "default",
+        memory: Optional[SessionMemoryStore] = None,
+    ):
         """
         executor: LangChain AgentExecutor (ReAct) that decides which tool to call.
+        memory: per-session store; prompt history then comes from this session's
+                bounded window for `conversation` instead of chat_history
+                (which is the full transcript kept for display).
         """
         self.executor = executor
+        self.session_id = session_id
+        self.conversation = conversation
+        self.memory = memory
         self.chat_history: List[Dict[str, Any]] = []
 
     def add_message(self, user, message):
         self.chat_history.append({"user": user, "message": message})
         print(f"{user}: {message}")
 
+    def _recent_history(self, message: str) -> str:
+        """Last REACT_HISTORY_TURNS exchanges (excluding the current message), oldest first."""
+        turns = int(os.getenv("REACT_HISTORY_TURNS", "2"))
+        max_chars = int(os.getenv("REACT_HISTORY_MAX_CHARS", "500"))
+        if turns <= 0:
+            return ""
+        if self.memory is not None and self.session_id:
+            window = self.memory.window(self.session_id, self.conversation)
+            return window.render(turns, self.memory.max_tokens, max_chars)
+        entries: List[Dict[str, Any]] = []
+        for e in self.chat_history:
+            if not entries or entries[-1] != e:  # add_message may record the same message twice
+                entries.append(e)
+        if entries and entries[-1].get("message") == message:
+            entries = entries[:-1]
+        lines = [
+            f"{'Assistant' if e.get('user') == 'Assistant' else 'User'}: {str(e.get('message', ''))[:max_chars]}"
+            for e in entries[-2 * turns:]
+        ]
+        return "\n".join(lines)
+
     def _pack_input(self, message: str, content: Optional[str], fn: Optional[str]) -> str:
         """
         Provide the active document to the ReAct agent in a structured way so it
         can include it in tool calls as JSON.
+        Segments go from most to least stable (document, history, new query) so
+        follow-up questions about the same document share a cacheable prefix.
         """
         doc_name = fn or "None"
         doc_text = (content or "").strip()
+        history = self._recent_history(message)
         packed = (
-            "User query:\n"
-            f"{message}\n\n"
             f"Active document filename: {doc_name}\n"
             "Active document text (may be empty below):\n"
-            f"{doc_text}"
+            f"{doc_text}\n\n"
+            + (f"Recent conversation:\n{history}\n\n" if history else "")
+            + "User query:\n"
+            f"{message}"
         )
         return packed
 
@@ -53,7 +93,16 @@ class GroupChatSystem:
 
         # 2) call ReAct agent (returns dict like {"output": "...", ...})
         packed_input = self._pack_input(message, content, fn)
-        result = self.executor.invoke({"input": packed_input})
+        inputs: Dict[str, Any] = {"input": packed_input}
+        if hasattr(self.executor, "route"):
+            # FastPathRouter decides on the raw fields and forwards only "input" to ReAct
+            inputs.update(query=message, context=content, filename=fn)
+        token = current_session.set((self.session_id, self.conversation)) if self.session_id else None
+        try:
+            result = self.executor.invoke(inputs)
+        finally:
+            if token is not None:
+                current_session.reset(token)
         # DEBUG: dump the ReAct scratchpad / steps
         steps = result.get("intermediate_steps", [])
         if steps:
@@ -80,6 +129,8 @@ class GroupChatSystem:
             meta_doc = documents_to_json_serializable([Document(page_content=content or "", metadata={"filename": fn or ""})])
             store_chatHist(message, response_text, meta_doc, store_path)
 
-        # 4) append assistant message
+        # 4) append assistant message (transcript + this session's prompt window)
         self.chat_history.append({"user": "Assistant", "message": response_text})
+        if self.memory is not None and self.session_id:
+            self.memory.window(self.session_id, self.conversation).add(message, response_text)
         print(f"Assistant: {response_text}")
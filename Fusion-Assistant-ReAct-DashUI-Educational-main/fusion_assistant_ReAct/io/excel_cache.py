@@ -0,0 +1,101 @@
+# fusion_assistant_ReAct/io/excel_cache.py
+"""
+Cached columnar copies of Excel inputs.
+
+openpyxl takes seconds to parse a large workbook; every start used to pay
+that again. read_excel_cached() converts a sheet once to an Arrow IPC file
+under EXCEL_CACHE_DIR and later loads read that file instead (memory-mapped
+for the read, but to_pandas() still builds an ordinary in-memory frame, so
+the saving is parse time, not memory; pass usecols to keep it small). The
+cache directory is git-ignored. The cache file name
+is keyed by source path + read options (sheet, header, usecols) and the
+source's mtime/size, so editing the workbook triggers a fresh conversion and
+the outdated copy is removed.
+
+Frames Arrow cannot represent (mixed-type object columns, e.g. header=None
+reads of sheets with title rows) and installs without pyarrow fall back to a
+pickle cache, which still skips the XLSX parse.
+
+Env:
+  EXCEL_CACHE       1/0 (default 1)
+  EXCEL_CACHE_DIR   cache directory (default .excel_cache)
+"""
+
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, Optional
+import os
+
+import pandas as pd
+
+from .paths import EXCEL_CACHE_DIR
+from ..util.misc import content_id
+
+
+def _cache_enabled() -> bool:
+    return os.getenv("EXCEL_CACHE", "1").lower() in ("1", "true", "yes")
+
+
+def _cache_prefix(path: Path, options: dict, cache_dir: Path) -> str:
+    return str(cache_dir / f"{path.stem}.{content_id({'path': str(path.resolve()), **options}, 6)}")
+
+
+def _read_arrow(cache_file: str) -> pd.DataFrame:
+    """Arrow file -> DataFrame; the mapped buffers are copied into pandas blocks."""
+    import pyarrow as pa
+    with pa.memory_map(cache_file, "r") as source:
+        return pa.ipc.open_file(source).read_all().to_pandas()
+
+
+def _write_arrow(df: pd.DataFrame, cache_file: str) -> None:
+    import pyarrow as pa
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with pa.OSFile(cache_file, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def read_excel_cached(
+    path: str,
+    *,
+    sheet_name: Any = 0,
+    header: Optional[int] = 0,
+    usecols: Any = None,
+    engine: Optional[str] = None,
+    cache_dir: Optional[str] = None,
+) -> pd.DataFrame:
+    """pd.read_excel(path, ...) with a per-(path, mtime, sheet, options) columnar cache."""
+    src = Path(path)
+    if not _cache_enabled():
+        return pd.read_excel(src, sheet_name=sheet_name, header=header, usecols=usecols, engine=engine)
+
+    st = src.stat()
+    options = {"sheet": sheet_name, "header": header, "usecols": usecols}
+    cdir = Path(cache_dir or EXCEL_CACHE_DIR)
+    prefix = _cache_prefix(src, options, cdir)
+    stamp = content_id([st.st_mtime_ns, st.st_size], 6)
+    arrow_file, pickle_file = f"{prefix}.{stamp}.arrow", f"{prefix}.{stamp}.pkl"
+
+    try:
+        if os.path.exists(arrow_file):
+            return _read_arrow(arrow_file)
+        if os.path.exists(pickle_file):
+            return pd.read_pickle(pickle_file)
+    except Exception as e:
+        print(f"[excel_cache] Discarding unreadable cache for {src}: {e}")
+
+    df = pd.read_excel(src, sheet_name=sheet_name, header=header, usecols=usecols, engine=engine)
+    try:
+        cdir.mkdir(parents=True, exist_ok=True)
+        for stale in cdir.glob(f"{Path(prefix).name}.*"):
+            stale.unlink(missing_ok=True)
+        try:
+            target = arrow_file
+            _write_arrow(df, f"{target}.tmp")
+        except Exception:
+            target = pickle_file
+            df.to_pickle(f"{target}.tmp")
+        os.replace(f"{target}.tmp", target)
+        print(f"[excel_cache] Cached {src} -> {target}")
+    except Exception as e:
+        print(f"[excel_cache] Could not write cache for {src}: {e}")
+    return df
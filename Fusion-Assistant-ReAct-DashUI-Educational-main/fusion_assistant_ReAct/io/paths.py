@@ -23,6 +23,7 @@ CAPEC_DIR     = os.getenv("CAPEC_DIR", "stix_data/capec_latest/attack_documents"
 ICS_DIR       = os.getenv("ICS_DIR", "stix_data/cti-master/ics-attack/processed-attack-pattern")
 ASSET_DIR     = os.getenv("ASSET_DIR", "assets_test/sample_assets.jsonl")
 QUERY_DIR     = os.getenv("QUERY_DIR", "query_examples")
+QUERY_DS_XLSX = os.getenv("QUERY_DS_XLSX", "query_DS.xlsx")
 
 # === FAISS index dirs ===
 SCENARIO1_INDEX = os.getenv("SCENARIO1_INDEX", "scenario1_faiss_index")
@@ -44,6 +45,13 @@ DRAFTS_DIR        = os.getenv("DRAFTS_DIR", "drafts")
 DRAFT_CHECKPOINT  = os.getenv("DRAFT_CHECKPOINT", os.path.join(DRAFTS_DIR, "asset_drafts.checkpoint.jsonl"))
 DRAFT_RUNS_DIR    = os.getenv("DRAFT_RUNS_DIR", os.path.join(DRAFTS_DIR, "runs"))
 RETRIEVAL_LOG     = os.getenv("RETRIEVAL_LOG", os.path.join(DRAFTS_DIR, "retrieval.log.jsonl"))
+DRAFT_BODY_STORE_DB = os.getenv("DRAFT_BODY_STORE_DB", os.path.join(DRAFT_RUNS_DIR, "bodies.sqlite"))
+DRAFT_INDEX_DB    = os.getenv("DRAFT_INDEX_DB", os.path.join(DRAFTS_DIR, "draft_index.sqlite"))
+DELIVERY_DB       = os.getenv("DELIVERY_DB", os.path.join(DRAFTS_DIR, "delivery.sqlite"))
+ASSET_JOB_QUEUE   = os.getenv("ASSET_JOB_QUEUE", os.path.join(DRAFTS_DIR, "asset_jobs.sqlite"))
+
+# === columnar cache of parsed Excel inputs (see io/excel_cache.py) ===
+EXCEL_CACHE_DIR   = os.getenv("EXCEL_CACHE_DIR", ".excel_cache")
 
 # === consolidated maps (handy for loops) ===
 DATASETS = {
@@ -62,7 +70,7 @@ __all__ = [
     "STORAGE_PATH",
     "SCENARIO1_DIR", "SIGMA_DIR", "LCEL_DIR", "CVE_DIR", "CWE_DIR", "CAPEC_DIR", "ICS_DIR", "ASSET_DIR",
     "SCENARIO1_INDEX", "SIGMA_INDEX", "CVE_INDEX", "CWE_INDEX", "CAPEC_INDEX", "ICS_INDEX", "LCEL_INDEX", "ASSET_INDEX",
-    "EMPLOYEE_XLSX", "NETWORK_CSV", "QUERY_DIR", "QUERY_INDEX",
+    "EMPLOYEE_XLSX", "NETWORK_CSV", "QUERY_DIR", "QUERY_INDEX", "QUERY_DS_XLSX",
     "DRAFTS_DIR", "DRAFT_CHECKPOINT", "DRAFT_RUNS_DIR", "RETRIEVAL_LOG",
     "DATASETS",
 ]
@@ -0,0 +1,45 @@
+# fusion_assistant_ReAct/io/query_ds.py
+"""
+Reader for labeled query sheets such as query_DS.xlsx
+(columns: Query / Expected Tool Call / Expected Result, optional extras).
+"""
+
+from __future__ import annotations
+from typing import Any, Dict, List
+import os
+
+from .excel_cache import read_excel_cached
+from .paths import QUERY_DS_XLSX
+
+
+def read_labeled_queries(path: str = QUERY_DS_XLSX) -> List[Dict[str, Any]]:
+    """
+    Return one dict per data row with lower-cased column names.
+    The header row is located by its 'Query' cell, since the sheet may start
+    with a title row. Returns [] when the file is missing or unreadable.
+    """
+    if not path or not os.path.exists(path):
+        return []
+    try:
+        raw = read_excel_cached(path, header=None)
+    except Exception as e:
+        print(f"[query_ds] Could not read {path}: {e}")
+        return []
+
+    header_idx = None
+    for i, row in raw.iterrows():
+        if any(str(c).strip().lower() == "query" for c in row.tolist()):
+            header_idx = i
+            break
+    if header_idx is None:
+        return []
+
+    cols = [str(c).strip().lower() for c in raw.iloc[header_idx].tolist()]
+    rows: List[Dict[str, Any]] = []
+    for _, row in raw.iloc[header_idx + 1:].iterrows():
+        rec = {c: v for c, v in zip(cols, row.tolist()) if not (isinstance(v, float) and v != v)}
+        q = rec.get("query")
+        if isinstance(q, str) and q.strip():
+            rec["query"] = q.strip()
+            rows.append(rec)
+    return rows
@@ -0,0 +1,103 @@
+# fusion_assistant_ReAct/llm/early_stop.py
+"""
+Streaming early-stop for ReAct generations.
+
+The ReAct prompt asks the model to stop after `Action Input: {...}`, but
+generation only ends on a stop token or num_predict. EarlyStopLLM streams
+the reply and closes the stream (which aborts the Ollama request) as soon as:
+  - Action Input holds a syntactically complete JSON object
+    (or a plain-text input line has ended), or
+  - a Final Answer is followed by a new ReAct keyword line.
+
+Tradeoff: an aborted stream never gets Ollama's final chunk, so its
+prompt_eval_count is unknown; telemetry/prompt_eval logs such calls as
+"early_stopped" records instead.
+"""
+
+from __future__ import annotations
+from typing import Any, Dict, Iterator, Optional
+import re
+import threading
+
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.runnables import Runnable, RunnableConfig
+
+from ..react_parser import balanced_json_object
+
+
+_INPUT_RE = re.compile(r"Action\s*\d*\s*Input\s*\d*\s*:[ \t]*", flags=re.IGNORECASE)
+_FINAL_RE = re.compile(r"Final\s*Answer\s*:", flags=re.IGNORECASE)
+_NEXT_STEP_RE = re.compile(r"\n[ \t]*(Thought|Action|Observation|Question)\s*\d*\s*:", flags=re.IGNORECASE)
+
+
+def completion_point(text: str) -> Optional[int]:
+    """Index where the ReAct step in `text` is complete, or None to keep streaming."""
+    m = _INPUT_RE.search(text)
+    if m:
+        rest = text[m.end():]
+        lead = len(rest) - len(rest.lstrip())
+        if rest.lstrip().startswith("{"):
+            snippet, complete = balanced_json_object(rest)
+            if complete and snippet is not None:
+                return m.end() + rest.find(snippet) + len(snippet)
+            return None
+        nl = rest.find("\n", lead)
+        return m.end() + nl if nl > lead else None
+    m = _FINAL_RE.search(text)
+    if m:
+        nxt = _NEXT_STEP_RE.search(text, m.end())
+        if nxt:
+            return nxt.start()
+    return None
+
+
+_stats_lock = threading.Lock()
+_STATS: Dict[str, int] = {"calls": 0, "early_stopped": 0, "chars_kept": 0, "chars_dropped": 0}
+
+
+def early_stop_stats() -> Dict[str, int]:
+    with _stats_lock:
+        return dict(_STATS)
+
+
+class EarlyStopLLM(Runnable):
+    """Wraps a chat model; stream()/invoke() end at the first completed ReAct step."""
+
+    def __init__(self, llm: Any):
+        self.llm = llm
+
+    def stream(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Iterator[AIMessageChunk]:
+        text = ""
+        cut: Optional[int] = None
+        gen = self.llm.stream(input, config, **kwargs)
+        try:
+            for chunk in gen:
+                piece = chunk.content if isinstance(chunk.content, str) else str(chunk.content)
+                cut = completion_point(text + piece)
+                if cut is None:
+                    text += piece
+                    yield chunk
+                    continue
+                keep = piece[:max(cut - len(text), 0)]
+                dropped = len(text) + len(piece) - cut
+                text += keep
+                if keep:
+                    yield AIMessageChunk(content=keep, id=getattr(chunk, "id", None))
+                with _stats_lock:
+                    _STATS["early_stopped"] += 1
+                    _STATS["chars_dropped"] += dropped
+                print(f"[early-stop] ReAct step complete after {len(text)} chars; closing stream.")
+                break
+        finally:
+            gen.close()  # stops reading -> Ollama aborts the generation
+            with _stats_lock:
+                _STATS["calls"] += 1
+                _STATS["chars_kept"] += len(text)
+
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> AIMessage:
+        out: Optional[AIMessageChunk] = None
+        for chunk in self.stream(input, config, **kwargs):
+            out = chunk if out is None else out + chunk
+        if out is None:
+            return AIMessage(content="")
+        return AIMessage(content=out.content, response_metadata=out.response_metadata, id=out.id)
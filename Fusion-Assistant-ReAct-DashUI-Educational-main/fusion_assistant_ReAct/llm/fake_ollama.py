@@ -0,0 +1,369 @@
+# fusion_assistant_ReAct/llm/fake_ollama.py
+"""
+Offline Ollama stand-in for benchmarks and CI.
+
+Implements the parts of the Ollama HTTP API that ChatOllama uses
+(/api/chat, /api/generate, /api/tags, /api/show, /api/version) with
+NDJSON streaming, so the whole pipeline can run without a model.
+
+Response modes:
+  canned  - always return `response`
+  script  - return `script` entries (or lines of `script_path`) in order, cycling
+  react   - seeded, prompt-aware replies: ReAct Thought/Action/Action Input for the
+            agent prompt, "Final Answer" after an Observation, YES/NO for the gate,
+            an ```lqel``` block for LQEL prompts, a short findings text otherwise
+
+Knobs: latency_ms (before first token), tokens_per_second (0 = unthrottled),
+failure_rate / fail_every (HTTP 500 injection), trailing_chatter (extra tokens a
+chatty model emits after the Action Input), seed.
+
+prompt_eval_count simulates Ollama's prefix cache: only tokens after the prefix
+shared with the previous prompt for the same model are counted.
+
+Run standalone:
+  python -m fusion_assistant_ReAct.llm.fake_ollama --port 11434 --mode react
+or set `fake_ollama.enabled: true` in model_config.yaml (see llm/models.py).
+"""
+
+from __future__ import annotations
+from typing import Any, Dict, Iterator, List, Optional
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from datetime import datetime, timezone
+import argparse
+import itertools
+import json
+import random
+import re
+import threading
+import time
+
+
+_TOKEN_RE = re.compile(r"\S+\s*|\s+")
+_TOOLS_RE = re.compile(r"tool names you can choose from are:\s*(.+?)\.?\s*$", flags=re.MULTILINE)
+_LQEL_HINT_RE = re.compile(r"\b(lqel|leql|lcel)\b|where\(|groupby\(|calculate\(", flags=re.IGNORECASE)
+
+DEFAULT_CONFIG: Dict[str, Any] = {
+    "host": "127.0.0.1",
+    "port": 0,
+    "mode": "react",
+    "response": "Final Answer: OK",
+    "script": [],
+    "script_path": None,
+    "latency_ms": 0,
+    "tokens_per_second": 0,
+    "failure_rate": 0.0,
+    "fail_every": 0,
+    "trailing_chatter": 0,
+    "seed": 0,
+    "model": "fake-ollama",
+}
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def _tokens(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text or "")
+
+
+def _apply_stop(text: str, stop: Optional[List[str]]) -> str:
+    cut = len(text)
+    for s in stop or []:
+        if s:
+            idx = text.find(s)
+            if idx != -1:
+                cut = min(cut, idx)
+    return text[:cut]
+
+
+class FakeOllamaBackend:
+    """Response generation + counters; shared by all request threads."""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        self.config = {**DEFAULT_CONFIG, **(config or {})}
+        self._rng = random.Random(self.config["seed"])
+        self._lock = threading.Lock()
+        self._calls = 0
+        self._last_prompt: Dict[str, List[str]] = {}
+        self.stats: Dict[str, int] = {
+            "requests": 0, "failures": 0, "aborted": 0,
+            "prompt_tokens": 0, "prompt_tokens_cached": 0, "eval_tokens": 0,
+        }
+        script = list(self.config.get("script") or [])
+        if self.config.get("script_path"):
+            with open(self.config["script_path"], "r", encoding="utf-8") as fh:
+                for line in fh:
+                    line = line.rstrip("\n")
+                    if not line:
+                        continue
+                    try:
+                        obj = json.loads(line)
+                        script.append(obj if isinstance(obj, str) else obj.get("response", ""))
+                    except json.JSONDecodeError:
+                        script.append(line.replace("\\n", "\n"))
+        self._script = itertools.cycle(script) if script else None
+
+    # ---------------------- failure / cache ----------------------
+    def should_fail(self) -> bool:
+        with self._lock:
+            self._calls += 1
+            self.stats["requests"] += 1
+            n = self._calls
+            every = int(self.config.get("fail_every") or 0)
+            fail = (every > 0 and n % every == 0) or self._rng.random() < float(self.config.get("failure_rate") or 0)
+            if fail:
+                self.stats["failures"] += 1
+            return fail
+
+    def prompt_eval(self, model: str, prompt: str) -> int:
+        toks = _tokens(prompt)
+        with self._lock:
+            prev = self._last_prompt.get(model, [])
+            shared = 0
+            for a, b in zip(prev, toks):
+                if a != b:
+                    break
+                shared += 1
+            self._last_prompt[model] = toks
+            evaluated = max(1, len(toks) - shared)
+            self.stats["prompt_tokens"] += evaluated
+            self.stats["prompt_tokens_cached"] += len(toks) - evaluated
+        return evaluated
+
+    # ---------------------- responses ----------------------
+    def respond(self, prompt: str) -> str:
+        mode = self.config.get("mode", "react")
+        if mode == "canned":
+            return str(self.config.get("response", ""))
+        if mode == "script" and self._script is not None:
+            with self._lock:
+                return next(self._script)
+        return self._react_reply(prompt)
+
+    def _react_reply(self, prompt: str) -> str:
+        with self._lock:
+            rng = random.Random(f"{self.config['seed']}:{prompt}")
+        tail = prompt[-4000:]
+
+        if "decision gate" in prompt and "YES" in prompt:
+            return "YES" if rng.random() < 0.5 else "NO"
+
+        m = _TOOLS_RE.search(prompt)
+        if m:
+            # ReAct agent prompt
+            if re.search(r"Observation:\s*\S", tail):
+                obs = tail.rsplit("Observation:", 1)[1].strip().splitlines()[0]
+                return f"Thought: I have the tool result.\nFinal Answer: {obs}"
+            tools = [t.strip() for t in m.group(1).split(",") if t.strip()]
+            query = ""
+            qms = re.findall(r"User query:\s*\n(.+)", prompt)
+            if qms:
+                query = qms[-1].strip()
+            lqel_tools = [t for t in tools if "lcel" in t or "lqel" in t]
+            tool = lqel_tools[0] if (lqel_tools and _LQEL_HINT_RE.search(query)) else rng.choice(tools)
+            action_input = json.dumps({"query": query, "context": None, "filename": None})
+            out = f"Thought: {tool} fits this request.\nAction: {tool}\nAction Input: {action_input}"
+            chatter = int(self.config.get("trailing_chatter") or 0)
+            if chatter:
+                out += "\n" + " ".join(rng.choice(["also", "note", "that", "the", "query", "might"]) for _ in range(chatter))
+            return out
+
+        if _LQEL_HINT_RE.search(tail) or "Convert this to LQEL" in prompt:
+            field = rng.choice(["destination_user", "source_asset", "result"])
+            return f'```lqel\nwhere(result ISTARTS-WITH "FAILED")groupby({field})calculate(count)\n```'
+
+        return "The asset was reviewed. Status and last-seen time were checked against policy."
+
+    def stream_tokens(self, text: str, num_predict: Optional[int]) -> Iterator[str]:
+        toks = _tokens(text)
+        if num_predict is not None and num_predict >= 0:
+            toks = toks[:num_predict]
+        tps = float(self.config.get("tokens_per_second") or 0)
+        for t in toks:
+            if tps > 0:
+                time.sleep(1.0 / tps)
+            yield t
+
+
+# ------------------------------ HTTP ------------------------------
+
+def _chat_prompt(messages: List[Dict[str, Any]]) -> str:
+    return "\n".join(f"{m.get('role', 'user')}: {m.get('content', '')}" for m in messages or [])
+
+
+class _Handler(BaseHTTPRequestHandler):
+    backend: FakeOllamaBackend  # set on the subclass built by make_server()
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, fmt, *args):  # keep test/bench output quiet
+        pass
+
+    def _send_json(self, obj: Dict[str, Any], status: int = 200) -> None:
+        data = json.dumps(obj).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_json(self) -> Dict[str, Any]:
+        n = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(n) if n else b"{}"
+        try:
+            return json.loads(raw or b"{}")
+        except json.JSONDecodeError:
+            return {}
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        if self.path in ("/", ""):
+            data = b"Ollama is running"
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        elif self.path == "/api/version":
+            self._send_json({"version": "0.0.0-fake"})
+        elif self.path == "/api/tags":
+            self._send_json({"models": [{"name": self.backend.config["model"], "model": self.backend.config["model"],
+                                         "modified_at": _now(), "size": 0, "digest": "fake", "details": {}}]})
+        elif self.path == "/_fake/stats":
+            self._send_json(dict(self.backend.stats))
+        else:
+            self._send_json({"error": "not found"}, status=404)
+
+    def do_POST(self):
+        body = self._read_json()
+        if self.path == "/api/show":
+            self._send_json({"modelfile": "", "parameters": "", "template": "", "details": {}, "model_info": {}})
+            return
+        if self.path not in ("/api/chat", "/api/generate"):
+            self._send_json({"error": "not found"}, status=404)
+            return
+
+        chat = self.path == "/api/chat"
+        model = body.get("model") or self.backend.config["model"]
+        opts = body.get("options") or {}
+        prompt = _chat_prompt(body.get("messages")) if chat else str(body.get("prompt") or "")
+
+        started = time.monotonic()
+        latency = float(self.backend.config.get("latency_ms") or 0) / 1000.0
+        if latency:
+            time.sleep(latency)
+        if self.backend.should_fail():
+            self._send_json({"error": "injected failure"}, status=500)
+            return
+
+        prompt_eval = self.backend.prompt_eval(model, prompt)
+        text = _apply_stop(self.backend.respond(prompt), opts.get("stop"))
+        num_predict = opts.get("num_predict")
+
+        def _chunk(piece: str, done: bool, **extra) -> Dict[str, Any]:
+            out: Dict[str, Any] = {"model": model, "created_at": _now(), "done": done}
+            if chat:
+                out["message"] = {"role": "assistant", "content": piece}
+            else:
+                out["response"] = piece
+            out.update(extra)
+            return out
+
+        def _final(n_eval: int, reason: str) -> Dict[str, Any]:
+            total = int((time.monotonic() - started) * 1e9)
+            return _chunk("", True, done_reason=reason, total_duration=total, load_duration=0,
+                          prompt_eval_count=prompt_eval, prompt_eval_duration=0,
+                          eval_count=n_eval, eval_duration=total)
+
+        tokens_cap = num_predict if isinstance(num_predict, int) and num_predict >= 0 else None
+        reason = "length" if tokens_cap is not None and len(_tokens(text)) > tokens_cap else "stop"
+
+        if body.get("stream", True) is False:
+            pieces = list(self.backend.stream_tokens(text, tokens_cap))
+            self.backend.stats["eval_tokens"] += len(pieces)
+            final = _final(len(pieces), reason)
+            if chat:
+                final["message"]["content"] = "".join(pieces)
+            else:
+                final["response"] = "".join(pieces)
+            self._send_json(final)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        sent = 0
+        try:
+            for piece in self.backend.stream_tokens(text, tokens_cap):
+                self._write_chunk(_chunk(piece, False))
+                sent += 1
+            self._write_chunk(_final(sent, reason))
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # Client stopped reading (e.g. early-stop); like Ollama, abandon the generation
+            self.backend.stats["aborted"] += 1
+        finally:
+            self.backend.stats["eval_tokens"] += sent
+
+    def _write_chunk(self, obj: Dict[str, Any]) -> None:
+        data = (json.dumps(obj) + "\n").encode("utf-8")
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+
+def make_server(config: Optional[Dict[str, Any]] = None) -> ThreadingHTTPServer:
+    backend = FakeOllamaBackend(config)
+    handler = type("FakeOllamaHandler", (_Handler,), {"backend": backend})
+    server = ThreadingHTTPServer((backend.config["host"], int(backend.config["port"])), handler)
+    server.daemon_threads = True
+    server.backend = backend  # type: ignore[attr-defined]
+    return server
+
+
+_running: Optional[ThreadingHTTPServer] = None
+_running_lock = threading.Lock()
+
+
+def ensure_background_server(config: Optional[Dict[str, Any]] = None) -> str:
+    """Start (once per process) an in-process server on a daemon thread; return its base_url."""
+    global _running
+    with _running_lock:
+        if _running is None:
+            _running = make_server(config)
+            threading.Thread(target=_running.serve_forever, name="fake-ollama", daemon=True).start()
+            host, port = _running.server_address[:2]
+            print(f"[fake-ollama] Serving on http://{host}:{port} (mode={_running.backend.config['mode']})")
+        host, port = _running.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Offline Ollama stand-in")
+    ap.add_argument("--host", default=DEFAULT_CONFIG["host"])
+    ap.add_argument("--port", type=int, default=11434)
+    ap.add_argument("--mode", choices=("canned", "script", "react"), default="react")
+    ap.add_argument("--response", default=DEFAULT_CONFIG["response"])
+    ap.add_argument("--script-path", default=None)
+    ap.add_argument("--latency-ms", type=float, default=0)
+    ap.add_argument("--tokens-per-second", type=float, default=0)
+    ap.add_argument("--failure-rate", type=float, default=0.0)
+    ap.add_argument("--fail-every", type=int, default=0)
+    ap.add_argument("--trailing-chatter", type=int, default=0)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args(argv)
+    cfg = {k.replace("-", "_"): v for k, v in vars(args).items()}
+    server = make_server(cfg)
+    print(f"[fake-ollama] Serving on http://{args.host}:{server.server_address[1]} (mode={args.mode})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
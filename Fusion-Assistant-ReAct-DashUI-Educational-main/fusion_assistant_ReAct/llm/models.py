@@ -1,31 +1,138 @@
 """
 LLM factories and configuration with config-file support.
+
+model_config.yaml holds top-level defaults plus optional named `profiles`
+(model, context size, generation budget, stop sequences) and a `chains`
+map assigning a profile to each chain/agent:
+
+    profiles:
+      gate: {model_name: "tinyllama", num_predict: 4, num_ctx: 1024}
+    chains:
+      lcel_gate: gate
+
+get_llm_for("lcel_gate") returns a runnable that re-reads the config file
+when it changes (hot reload), so budgets can be tuned without a restart.
 """
 
 from __future__ import annotations
 import os
+import threading
 import yaml
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterator, List, Tuple
 
+from langchain_core.runnables import Runnable, RunnableConfig
 from langchain_ollama import ChatOllama
 
+from ..telemetry.prompt_eval import PromptEvalLogger
+
+
+# ChatOllama fields a profile may set (everything else in a profile is ignored)
+_OLLAMA_FIELDS = (
+    "num_ctx", "num_keep", "num_predict", "num_gpu", "num_thread", "keep_alive", "seed",
+    "top_k", "top_p", "repeat_penalty", "repeat_last_n", "mirostat",
+    "mirostat_eta", "mirostat_tau", "tfs_z", "format", "reasoning",
+)
+# Non-model sections of the config file
+_SECTIONS = ("profiles", "chains", "fake_ollama")
+
+
+class CachedChatOllama(ChatOllama):
+    """
+    ChatOllama plus `num_keep` (tokens of the prompt prefix Ollama keeps when
+    the context window shifts), which the upstream class does not forward.
+    Pair with keep_alive so the model, and its KV cache, stays loaded.
+    """
+
+    num_keep: Optional[int] = None
+
+    def _chat_params(self, messages, stop=None, **kwargs):
+        params = super()._chat_params(messages, stop, **kwargs)
+        if self.num_keep is not None and params.get("options") is not None:
+            params["options"].setdefault("num_keep", self.num_keep)
+        return params
+
 
 # ---------------- Load from config ----------------
+def _config_path() -> str:
+    return os.getenv("CHAT_CONFIG", "fusion_assistant_ReAct/config/model_config.yaml")
+
+
 def _load_config() -> Dict[str, Any]:
-    config_path = os.getenv("CHAT_CONFIG", "fusion_assistant_ReAct/config/model_config.yaml")
+    config_path = _config_path()
     if os.path.exists(config_path):
         with open(config_path, "r") as f:
             return yaml.safe_load(f) or {}
     return {}
 
 
+def _config_mtime() -> Optional[float]:
+    try:
+        return os.stat(_config_path()).st_mtime
+    except OSError:
+        return None
+
+
 _config = _load_config()
+_config_stamp = _config_mtime()
+_config_version = 0
+_reload_lock = threading.Lock()
+
+
+def reload_config_if_changed() -> bool:
+    """Re-read model_config.yaml when its mtime changed. Returns True on reload."""
+    global _config, _config_stamp, _config_version
+    if os.getenv("CHAT_CONFIG_HOT_RELOAD", "1").lower() in ("0", "false", "no"):
+        return False
+    stamp = _config_mtime()
+    if stamp == _config_stamp:
+        return False
+    with _reload_lock:
+        if stamp == _config_stamp:
+            return False
+        try:
+            new_config = _load_config()
+        except Exception as e:
+            print(f"[LLM] Config reload failed, keeping previous config: {e}")
+            _config_stamp = stamp
+            return False
+        _config, _config_stamp = new_config, stamp
+        _config_version += 1
+        print(f"[LLM] Reloaded {_config_path()} (version {_config_version})")
+        return True
+
+
+def _fake_ollama_config() -> Optional[Dict[str, Any]]:
+    """`fake_ollama` section (or FAKE_OLLAMA=1) -> config for the offline stand-in, else None."""
+    cfg = dict(_config.get("fake_ollama") or {})
+    env = os.getenv("FAKE_OLLAMA")
+    enabled = cfg.pop("enabled", False)
+    if env is not None:
+        enabled = env.lower() in ("1", "true", "yes")
+    return cfg if enabled else None
+
+
+def profile_for(chain: str) -> str:
+    """Profile name assigned to `chain` in the `chains` section ('default' if none)."""
+    return str((_config.get("chains") or {}).get(chain) or "default")
+
+
+def get_profile(name: Optional[str] = None) -> Dict[str, Any]:
+    """Top-level defaults overlaid with `profiles[name]`."""
+    base = {k: v for k, v in _config.items() if k not in _SECTIONS}
+    if name and name != "default":
+        prof = (_config.get("profiles") or {}).get(name)
+        if prof is None:
+            print(f"[LLM] Unknown profile '{name}', using defaults.")
+        else:
+            base.update(prof)
+    return base
 
 
 def build_chat_model(
     name: Optional[str] = None,
     *,
     temperature: Optional[float] = None,
+    profile: Optional[str] = None,
     **kwargs,
 ):
     """
@@ -33,45 +140,118 @@ def build_chat_model(
     Precedence order:
       1. Direct kwargs
       2. Explicit args (name, temperature)
-      3. Config file values
-      4. Environment variables
-      5. Defaults
+      3. Profile values (profiles[profile])
+      4. Config file top-level values
+      5. Environment variables
+      6. Defaults
+    Stop sequences are not set on the model (call-level stop would then be
+    rejected); use stop_sequences_for() and pass them at call time.
     """
+    cfg = get_profile(profile)
     model_name = (
         name
         or kwargs.pop("model_name", None)
-        or _config.get("model_name")
+        or cfg.get("model_name")
         or os.getenv("CHAT_MODEL_NAME", "gpt-oss:20b")
     )
     temp = (
         temperature
         if temperature is not None
         else kwargs.pop("temperature", None)
-        or _config.get("temperature")
+        or cfg.get("temperature")
         or float(os.getenv("CHAT_TEMPERATURE", "0.0"))
     )
 
-    # Collect model_kwargs from config
-    model_kwargs = dict(_config)
-    for drop in ["model_name", "temperature", "base_url"]:
-        model_kwargs.pop(drop, None)
-
-    # Merge with passed kwargs (explicit > config)
-    if "model_kwargs" in kwargs:
-        model_kwargs.update(kwargs.pop("model_kwargs"))
+    # Backend (a worker's override wins); taken out before kwargs are forwarded
+    base_url = kwargs.pop("base_url", None) or cfg.get("base_url", os.getenv("OLLAMA_BASE_URL", "http://localhost:11434"))
 
+    # Generation settings from config (explicit kwargs win)
+    model_kwargs = {k: cfg[k] for k in _OLLAMA_FIELDS if cfg.get(k) is not None}
+    model_kwargs.update(kwargs.pop("model_kwargs", None) or {})
+    model_kwargs.pop("base_url", None)
     merged_kwargs = {**model_kwargs, **kwargs}
-    print(f"[LLM] Using model: {model_name}, temp={temp}, kwargs={merged_kwargs}")
+    print(f"[LLM] Using model: {model_name}, temp={temp}, profile={profile or 'default'}, base_url={base_url}, kwargs={merged_kwargs}")
 
-    return ChatOllama(
+    fake_cfg = _fake_ollama_config()
+    if fake_cfg is not None:
+        from .fake_ollama import ensure_background_server
+        base_url = ensure_background_server(fake_cfg)
+
+    if os.getenv("OLLAMA_PROMPT_EVAL_LOG", "1").lower() not in ("0", "false", "no"):
+        merged_kwargs["callbacks"] = list(merged_kwargs.get("callbacks") or []) + [
+            PromptEvalLogger(label=profile or "default")
+        ]
+
+    return CachedChatOllama(
         model=model_name,
         temperature=float(temp),
-        # num_predict=256,
-        base_url=_config.get("base_url", os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")),
-        model_kwargs=model_kwargs or None,
-        **kwargs,
+        base_url=base_url,
+        **merged_kwargs,
     )
 
 
+def stop_sequences_for(profile: Optional[str] = None) -> List[str]:
+    return list(get_profile(profile).get("stop") or [])
+
+
+def _merge_stop(a: Optional[List[str]], b: Optional[List[str]]) -> Optional[List[str]]:
+    out = list(a or [])
+    out += [s for s in (b or []) if s not in out]
+    return out or None
+
+
+class ProfiledChatModel(Runnable):
+    """
+    Chat model bound to a chain name. Resolves chains[chain] -> profile on
+    each call and rebuilds the underlying ChatOllama after a config reload.
+    Profile stop sequences are merged with call-level ones (e.g. ReAct's).
+    """
+
+    def __init__(self, chain: str, **overrides: Any):
+        self.chain = chain
+        self.overrides = overrides  # passed to build_chat_model, e.g. base_url for a worker's backend
+        self._lock = threading.Lock()
+        self._built: Optional[Tuple[int, ChatOllama, Optional[List[str]]]] = None
+
+    def _current(self) -> Tuple[ChatOllama, Optional[List[str]]]:
+        reload_config_if_changed()
+        built = self._built
+        if built is None or built[0] != _config_version:
+            with self._lock:
+                built = self._built
+                if built is None or built[0] != _config_version:
+                    prof = profile_for(self.chain)
+                    built = (_config_version, build_chat_model(profile=prof, **self.overrides), stop_sequences_for(prof) or None)
+                    self._built = built
+        return built[1], built[2]
+
+    @property
+    def model(self) -> ChatOllama:
+        return self._current()[0]
+
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        llm, stop = self._current()
+        kwargs["stop"] = _merge_stop(stop, kwargs.get("stop"))
+        return llm.invoke(input, config, **kwargs)
+
+    async def ainvoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        llm, stop = self._current()
+        kwargs["stop"] = _merge_stop(stop, kwargs.get("stop"))
+        return await llm.ainvoke(input, config, **kwargs)
+
+    def stream(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Iterator[Any]:
+        llm, stop = self._current()
+        kwargs["stop"] = _merge_stop(stop, kwargs.get("stop"))
+        yield from llm.stream(input, config, **kwargs)
+
+    def __repr__(self) -> str:
+        return f"ProfiledChatModel(chain={self.chain!r}, profile={profile_for(self.chain)!r})"
+
+
+def get_llm_for(chain: str, **overrides: Any) -> ProfiledChatModel:
+    """Chat model for a named chain/agent, using the profile assigned in `chains`."""
+    return ProfiledChatModel(chain, **overrides)
+
+
 def get_default_doc_llm():
     return build_chat_model()
@@ -0,0 +1,347 @@
+# fusion_assistant_ReAct/lqel/parser.py
+"""
+Tokenizer, grammar check and validator for LQEL (Log Query Expression Language).
+
+Covers the subset used by our examples (query_examples/*.md):
+
+  query      := [search terms] clause+
+  clause     := where(expr) | groupby(field, ...) | calculate(fn[:field])
+              | limit(n) | timeslice(n[unit]) | having(fn[:field] op n) | sort(asc|desc)
+  expr       := and_expr (OR and_expr)*
+  and_expr   := unary (AND unary)*
+  unary      := NOT unary | '(' expr ')' | /regex/flags | operand [[NOT] op value]
+  op         := = != > >= < <= | IN IIN CONTAINS ICONTAINS STARTS-WITH ISTARTS-WITH ...-ANY/-ALL
+  value      := "string" | word | number | /regex/ | NOCASE(value) | IP(cidr) | <placeholder> | [value, ...]
+
+validate_lqel() only checks structure; it does not rewrite the query.
+"""
+
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Tuple
+import re
+
+
+CLAUSES = ("where", "groupby", "calculate", "limit", "timeslice", "having", "sort")
+
+_CMP_OPS = ("=", "==", "!=", ">", ">=", "<", "<=")
+_KW_OPS = {
+    "IN", "IIN", "CONTAINS", "ICONTAINS", "STARTS-WITH", "ISTARTS-WITH",
+    "CONTAINS-ANY", "ICONTAINS-ANY", "CONTAINS-ALL", "ICONTAINS-ALL",
+    "STARTS-WITH-ANY", "ISTARTS-WITH-ANY",
+}
+_LIST_OPS = {"IN", "IIN"} | {op for op in _KW_OPS if op.endswith(("-ANY", "-ALL"))}
+_BOOL_WORDS = {"AND", "OR", "NOT"}
+_CALC_FUNCS = {"count", "sum", "average", "max", "min", "unique", "median", "bytes", "percentile"}
+_CALC_NEEDS_FIELD = {"sum", "average", "max", "min", "unique", "median", "percentile"}
+
+_TIMESLICE_RE = re.compile(r"^\d+(ms|s|m|h|d|w)?$", re.IGNORECASE)
+_INT_RE = re.compile(r"^\d+$")
+_NUM_RE = re.compile(r"^-?\d+(\.\d+)?$")
+_PLACEHOLDER_RE = re.compile(r"<[A-Za-z_][A-Za-z0-9_ .\-]*>")
+_WORD_STOP = set(" \t\r\n()[],\"=<>")
+
+# token = (kind, value, start, end); kinds: word string regex op punct placeholder
+Token = Tuple[str, str, int, int]
+
+
+class LqelSyntaxError(ValueError):
+    def __init__(self, message: str, pos: int):
+        super().__init__(f"{message} (at {pos})")
+        self.pos = pos
+
+
+# ----------------------------- tokenizer -----------------------------
+
+def _regex_allowed(prev: Optional[Token]) -> bool:
+    if prev is None:
+        return True
+    kind, val = prev[0], prev[1]
+    if kind in ("op",):
+        return True
+    if kind == "punct" and val in ("(", "[", ","):
+        return True
+    return kind == "word" and (val.upper() in _BOOL_WORDS or val.upper() in _KW_OPS)
+
+
+def tokenize(text: str) -> List[Token]:
+    toks: List[Token] = []
+    i, n = 0, len(text or "")
+    while i < n:
+        c = text[i]
+        prev = toks[-1] if toks else None
+        if c.isspace():
+            i += 1
+            continue
+        if c == '"':
+            j = i + 1
+            while j < n and text[j] != '"':
+                j += 2 if text[j] == "\\" else 1
+            if j >= n:
+                raise LqelSyntaxError("unterminated string", i)
+            toks.append(("string", text[i:j + 1], i, j + 1))
+            i = j + 1
+            continue
+        if c == "/" and _regex_allowed(prev):
+            j = i + 1
+            while j < n and text[j] != "/":
+                j += 2 if text[j] == "\\" else 1
+            if j >= n:
+                raise LqelSyntaxError("unterminated regex", i)
+            j += 1
+            while j < n and text[j].isalpha():
+                j += 1
+            toks.append(("regex", text[i:j], i, j))
+            i = j
+            continue
+        if c == "<" and (prev is None or prev[0] == "op" or (prev[0] == "punct" and prev[1] in "([,")):
+            m = _PLACEHOLDER_RE.match(text, i)
+            if m:
+                toks.append(("placeholder", m.group(0), i, m.end()))
+                i = m.end()
+                continue
+        two = text[i:i + 2]
+        if two in ("!=", ">=", "<=", "=="):
+            toks.append(("op", two, i, i + 2))
+            i += 2
+            continue
+        if c in "=<>":
+            toks.append(("op", c, i, i + 1))
+            i += 1
+            continue
+        if c in "()[],":
+            toks.append(("punct", c, i, i + 1))
+            i += 1
+            continue
+        j = i
+        while j < n and text[j] not in _WORD_STOP and not (text[j] == "!" and text[j + 1:j + 2] == "="):
+            j += 1
+        if j == i:
+            raise LqelSyntaxError(f"unexpected character {c!r}", i)
+        toks.append(("word", text[i:j], i, j))
+        i = j
+    return toks
+
+
+# ------------------------------ parser -------------------------------
+
+class _Parser:
+    def __init__(self, text: str):
+        self.text = text
+        self.toks = tokenize(text)
+        self.i = 0
+
+    # -- token helpers --
+    def peek(self, k: int = 0) -> Optional[Token]:
+        j = self.i + k
+        return self.toks[j] if j < len(self.toks) else None
+
+    def next(self) -> Token:
+        tok = self.peek()
+        if tok is None:
+            raise LqelSyntaxError("unexpected end of query", len(self.text))
+        self.i += 1
+        return tok
+
+    def expect(self, kind: str, val: Optional[str] = None) -> Token:
+        tok = self.next()
+        if tok[0] != kind or (val is not None and tok[1] != val):
+            want = val or kind
+            raise LqelSyntaxError(f"expected {want!r}, got {tok[1]!r}", tok[2])
+        return tok
+
+    def at(self, kind: str, val: Optional[str] = None, k: int = 0) -> bool:
+        tok = self.peek(k)
+        return tok is not None and tok[0] == kind and (val is None or tok[1] == val)
+
+    def at_word(self, *words: str) -> bool:
+        tok = self.peek()
+        return tok is not None and tok[0] == "word" and tok[1].upper() in words
+
+    def at_clause(self) -> bool:
+        tok = self.peek()
+        return (
+            tok is not None and tok[0] == "word" and tok[1].lower() in CLAUSES
+            and self.at("punct", "(", 1)
+        )
+
+    # -- top level --
+    def parse(self) -> Dict[str, Any]:
+        search: List[str] = []
+        while self.peek() is not None and not self.at_clause():
+            tok = self.next()
+            if tok[0] not in ("word", "string", "regex"):
+                raise LqelSyntaxError(f"unexpected {tok[1]!r} before first clause", tok[2])
+            search.append(tok[1])
+
+        clauses: List[Dict[str, Any]] = []
+        seen = set()
+        end = 0
+        while self.peek() is not None:
+            if not self.at_clause():
+                tok = self.peek()
+                raise LqelSyntaxError(f"unexpected {tok[1]!r} after clause", tok[2])
+            name_tok = self.next()
+            name = name_tok[1].lower()
+            if name in seen:
+                raise LqelSyntaxError(f"duplicate {name}() clause", name_tok[2])
+            seen.add(name)
+            self.expect("punct", "(")
+            getattr(self, f"_clause_{name}")()
+            close = self.expect("punct", ")")
+            clauses.append({"name": name, "text": self.text[name_tok[2]:close[3]]})
+            end = close[3]
+        return {"search": search, "clauses": clauses, "end": end}
+
+    # -- clauses --
+    def _clause_where(self) -> None:
+        if self.at("punct", ")"):
+            raise LqelSyntaxError("empty where()", self.peek()[2])
+        self._expr()
+
+    def _clause_groupby(self) -> None:
+        self._field()
+        while self.at("punct", ","):
+            self.next()
+            self._field()
+
+    def _calc_fn(self) -> None:
+        tok = self.expect("word")
+        fn, _, field = tok[1].partition(":")
+        if fn.lower() not in _CALC_FUNCS:
+            raise LqelSyntaxError(f"unknown calculate function {fn!r}", tok[2])
+        if fn.lower() in _CALC_NEEDS_FIELD and not field:
+            raise LqelSyntaxError(f"{fn}: needs a field ({fn}:<field>)", tok[2])
+
+    def _clause_calculate(self) -> None:
+        self._calc_fn()
+
+    def _clause_having(self) -> None:
+        self._calc_fn()
+        op = self.expect("op")
+        if op[1] not in _CMP_OPS:
+            raise LqelSyntaxError(f"bad having() operator {op[1]!r}", op[2])
+        num = self.expect("word")
+        if not _NUM_RE.match(num[1]):
+            raise LqelSyntaxError(f"having() needs a number, got {num[1]!r}", num[2])
+
+    def _clause_limit(self) -> None:
+        tok = self.expect("word")
+        if not _INT_RE.match(tok[1]):
+            raise LqelSyntaxError(f"limit() needs an integer, got {tok[1]!r}", tok[2])
+
+    def _clause_timeslice(self) -> None:
+        tok = self.expect("word")
+        if not _TIMESLICE_RE.match(tok[1]):
+            raise LqelSyntaxError(f"bad timeslice {tok[1]!r}", tok[2])
+
+    def _clause_sort(self) -> None:
+        tok = self.expect("word")
+        if tok[1].lower() not in ("asc", "desc"):
+            raise LqelSyntaxError(f"sort() takes asc or desc, got {tok[1]!r}", tok[2])
+
+    # -- expressions --
+    def _field(self) -> None:
+        tok = self.next()
+        if tok[0] not in ("word", "string") or tok[1].upper() in _BOOL_WORDS:
+            raise LqelSyntaxError(f"expected a field name, got {tok[1]!r}", tok[2])
+
+    def _expr(self) -> None:
+        self._and_expr()
+        while self.at_word("OR"):
+            self.next()
+            self._and_expr()
+
+    def _and_expr(self) -> None:
+        self._unary()
+        while self.at_word("AND"):
+            self.next()
+            self._unary()
+
+    def _unary(self) -> None:
+        if self.at_word("NOT"):
+            self.next()
+            self._unary()
+            return
+        if self.at("punct", "("):
+            self.next()
+            self._expr()
+            self.expect("punct", ")")
+            return
+        if self.at("regex"):
+            self.next()
+            return
+        tok = self.next()
+        if tok[0] not in ("word", "string", "placeholder") or tok[1].upper() in _BOOL_WORDS | _KW_OPS:
+            raise LqelSyntaxError(f"expected a field or search term, got {tok[1]!r}", tok[2])
+        self._predicate_tail()
+
+    def _predicate_tail(self) -> None:
+        negated = False
+        if self.at_word("NOT") and self.peek(1) is not None and self.peek(1)[1].upper() in _KW_OPS:
+            self.next()
+            negated = True
+        if self.at("op"):
+            op = self.next()
+            if negated:
+                raise LqelSyntaxError("NOT cannot precede a comparison operator", op[2])
+            self._value()
+            return
+        if self.at_word(*_KW_OPS):
+            op = self.next()[1].upper()
+            if op in _LIST_OPS and self.at("punct", "["):
+                self._list()
+            else:
+                self._value()
+            return
+        if negated:
+            tok = self.peek()
+            raise LqelSyntaxError("dangling NOT", tok[2] if tok else len(self.text))
+        # bare field / keyword term, e.g. where(result AND ...)
+
+    def _list(self) -> None:
+        self.expect("punct", "[")
+        self._value()
+        while self.at("punct", ","):
+            self.next()
+            self._value()
+        self.expect("punct", "]")
+
+    def _value(self) -> None:
+        tok = self.next()
+        if tok[0] in ("string", "regex", "placeholder"):
+            return
+        if tok[0] != "word" or tok[1].upper() in _BOOL_WORDS:
+            raise LqelSyntaxError(f"expected a value, got {tok[1]!r}", tok[2])
+        if tok[1].upper() in ("NOCASE", "IP") and self.at("punct", "("):
+            self.next()
+            self._value()
+            self.expect("punct", ")")
+
+
+# ------------------------------ public -------------------------------
+
+def parse_lqel(text: str) -> Dict[str, Any]:
+    """Parse an LQEL query; raises LqelSyntaxError on malformed input."""
+    return _Parser((text or "").strip()).parse()
+
+
+def validate_lqel(text: str, *, require_clause: bool = True) -> List[str]:
+    """
+    Return a list of problems (empty when valid). With require_clause=True a
+    bare keyword search (no where/groupby/...) is rejected, which keeps plain
+    prose from passing as a query.
+    """
+    body = (text or "").strip()
+    if not body:
+        return ["empty query"]
+    try:
+        parsed = _Parser(body).parse()
+    except LqelSyntaxError as e:
+        return [str(e)]
+    if require_clause and not parsed["clauses"]:
+        return ["no LQEL clause found (where/groupby/calculate/limit/timeslice)"]
+    return []
+
+
+def is_valid_lqel(text: str, *, require_clause: bool = True) -> bool:
+    return not validate_lqel(text, require_clause=require_clause)
@@ -0,0 +1,314 @@
+# fusion_assistant_ReAct/lqel/repair.py
+"""
+Mechanical (model-free) repairs for LQEL output.
+
+repair_lqel() tries, in order, on every candidate snippet of the model output:
+  1) cleanup: fence/label stripping, smart quotes, bullets, trailing ';', newlines
+  2) doubled quotes (""United States"" -> "United States")
+  3) unbalanced parens/brackets
+  4) trailing prose after the last complete clause
+  5) simple SQL -> LQEL rewrite (SELECT ... WHERE ... GROUP BY ... LIMIT n)
+and returns the first body that passes validate_lqel(). Anything it cannot
+fix is left for the LLM repair chain.
+"""
+
+from __future__ import annotations
+from typing import List, Optional, Tuple
+import re
+
+from .parser import CLAUSES, LqelSyntaxError, tokenize, parse_lqel, validate_lqel
+
+
+_FENCE_RE = re.compile(r"```([a-zA-Z0-9_+-]*)[ \t]*\n?(.*?)```", flags=re.DOTALL)
+_LABEL_RE = re.compile(r"^\s*(?:lqel|leql|lcel|query|final query|answer)\s*:\s*", flags=re.IGNORECASE)
+_CLAUSE_START_RE = re.compile(r"\b(?:%s)\s*\(" % "|".join(CLAUSES), flags=re.IGNORECASE)
+# text before the first clause that reads as a lead-in sentence rather than search terms
+_PROSE_RE = re.compile(r"\n|[!?:,;]|\.(?:\s|$)|^\s*(?:sure|here|ok(?:ay)?|certainly|of course)\b", flags=re.IGNORECASE)
+_SMART = str.maketrans({"“": '"', "”": '"', "‘": "'", "’": "'", " ": " "})
+
+
+# ----------------------------- candidates -----------------------------
+
+def _candidates(text: str) -> List[str]:
+    """
+    Snippets worth validating, most specific first (lqel fences, other
+    fences, raw, clause tail). When the text before the first clause reads
+    as prose ("Sure! ...", "Here is your query:"), the clause tail goes
+    before the raw text; plain leading search terms are kept.
+    """
+    text = (text or "").translate(_SMART)
+    fenced = [(m.group(1).lower(), m.group(2)) for m in _FENCE_RE.finditer(text)]
+    out = [body for lang, body in fenced if lang in ("lqel", "leql", "lcel")]
+    out += [body for lang, body in fenced if lang not in ("lqel", "leql", "lcel")]
+    # Unterminated fence (model stopped early)
+    if not fenced and "```" in text:
+        tail = text.split("```", 1)[1]
+        out.append(tail.split("\n", 1)[1] if "\n" in tail else tail)
+    m = _CLAUSE_START_RE.search(text)
+    clause_tail = re.split(r"\n\s*\n", text[m.start():], maxsplit=1)[0] if m else None
+    lead = re.sub(r'"[^"]*"|/[^/]*/', "", text[:m.start()]) if m else ""
+    if clause_tail and _PROSE_RE.search(lead):
+        out.append(clause_tail)
+    out.append(text)
+    if clause_tail:
+        out.append(clause_tail)
+    seen, uniq = set(), []
+    for c in out:
+        c = c.strip()
+        if c and c not in seen:
+            seen.add(c)
+            uniq.append(c)
+    return uniq
+
+
+def _cleanup(body: str) -> str:
+    lines = []
+    for line in (body or "").splitlines():
+        line = _LABEL_RE.sub("", line.strip())
+        line = re.sub(r"^(?:[-*•]|\d+[.)])\s+", "", line)
+        if line:
+            lines.append(line)
+    s = " ".join(lines).strip().strip("`").strip()
+    return s.rstrip(";").strip()
+
+
+# ----------------------------- fixers -----------------------------
+
+def fix_doubled_quotes(body: str) -> str:
+    return re.sub(r'""([^"]+)""', r'"\1"', body)
+
+
+def truncate_trailing_text(body: str) -> str:
+    """Drop prose that follows the last complete clause."""
+    try:
+        parse_lqel(body)
+        return body
+    except LqelSyntaxError as e:
+        pos = e.pos
+    if not _CLAUSE_START_RE.search(body[:pos]):
+        return body
+    head = body[:pos].rstrip()
+    return head if head.endswith(")") else body
+
+
+def balance_brackets(body: str) -> str:
+    """
+    Close parens/brackets the model forgot and drop stray closers. An
+    unclosed clause is closed right before the next clause keyword.
+    """
+    try:
+        toks = tokenize(body)
+    except LqelSyntaxError:
+        return body
+    out: List[str] = []
+    stack: List[str] = []
+    last = 0
+    pairs = {")": "(", "]": "["}
+    closer = {"(": ")", "[": "]"}
+    for idx, (kind, val, start, end) in enumerate(toks):
+        nxt = toks[idx + 1] if idx + 1 < len(toks) else None
+        starts_clause = (
+            kind == "word" and val.lower() in CLAUSES and nxt is not None
+            and nxt[0] == "punct" and nxt[1] == "("
+        )
+        if starts_clause and stack:
+            out.append(body[last:start].rstrip())
+            out.append("".join(closer[b] for b in reversed(stack)))
+            stack.clear()
+            last = start
+        if kind == "punct" and val in "([":
+            stack.append(val)
+        elif kind == "punct" and val in ")]":
+            if stack and stack[-1] == pairs[val]:
+                stack.pop()
+            elif stack and pairs[val] in stack:
+                # e.g. "[a, b)" -> close the inner bracket first
+                while stack and stack[-1] != pairs[val]:
+                    out.append(body[last:start].rstrip() + closer[stack.pop()])
+                    last = start
+                stack.pop()
+            else:
+                out.append(body[last:start])  # stray closer: drop it
+                last = end
+    out.append(body[last:])
+    out.append("".join(closer[b] for b in reversed(stack)))
+    return "".join(out)
+
+
+# ----------------------------- SQL -> LQEL -----------------------------
+
+_SQL_RE = re.compile(
+    r"^\s*(?:select\s+(?P<select>.+?)\s+from\s+\S+(?:\s+(?:as\s+)?(?!where\b|group\b|having\b|order\b|limit\b)\w+)?\s*)?"
+    r"(?:\bwhere\s+(?P<where>.+?))?"
+    r"(?:\s*\bgroup\s+by\s+(?P<group>.+?))?"
+    r"(?:\s*\bhaving\s+(?P<having>.+?))?"
+    r"(?:\s*\border\s+by\s+(?P<order>.+?))?"
+    r"(?:\s*\blimit\s+(?P<limit>\d+))?\s*;?\s*$",
+    flags=re.IGNORECASE | re.DOTALL,
+)
+_SQL_TOKEN_RE = re.compile(
+    r"'(?:[^']|'')*'|\"[^\"]*\"|<>|!=|>=|<=|=|<|>|\(|\)|,|[^\s'\"(),=<>!]+",
+)
+_AGG_RE = re.compile(r"(count|sum|avg|average|max|min)\s*\(\s*(distinct\s+)?([^)]*)\)", flags=re.IGNORECASE)
+_LQEL_AGG = {"sum": "sum", "avg": "average", "average": "average", "max": "max", "min": "min"}
+
+
+def _sql_str(tok: str) -> str:
+    if tok.startswith("'"):
+        inner = tok[1:-1].replace("''", "'").replace('"', '\\"')
+        return f'"{inner}"'
+    return tok
+
+
+def _like_to_lqel(field: str, pattern: str, *, ci: bool, negate: bool) -> str:
+    p = pattern[1:-1].replace("''", "'") if pattern.startswith("'") else pattern.strip('"')
+    core = p.strip("%")
+    prefix = "NOT " if negate else ""
+    plain = "%" not in core and "_" not in core
+    if plain and p.startswith("%") and p.endswith("%") and core:
+        return f'{field} {prefix}{"ICONTAINS" if ci else "CONTAINS"} "{core}"'
+    if plain and p.endswith("%") and not p.startswith("%") and core:
+        return f'{field} {prefix}{"ISTARTS-WITH" if ci else "STARTS-WITH"} "{core}"'
+    rx = "^" + re.escape(p).replace("%", ".*").replace("_", ".") + "$"
+    rx = rx.replace("/", "\\/")
+    return f'{field}{"!=" if negate else "="}/{rx}/{"i" if ci else ""}'
+
+
+def _sql_condition_to_lqel(cond: str) -> Optional[str]:
+    toks = _SQL_TOKEN_RE.findall(cond or "")
+
+    def tok(k: int) -> str:
+        return toks[k] if k < len(toks) else ""
+
+    out: List[str] = []
+    i = 0
+    while i < len(toks):
+        t, up = toks[i], toks[i].upper()
+        # lower(field) = 'x'  ->  field=NOCASE("x")
+        if up in ("LOWER", "UPPER") and tok(i + 1) == "(" and tok(i + 3) == ")":
+            field = tok(i + 2)
+            if tok(i + 4) == "=" and tok(i + 5):
+                out.append(f"{field}=NOCASE({_sql_str(tok(i + 5))})")
+                i += 6
+            else:
+                out.append(field)
+                i += 4
+            continue
+        if up == "IS":
+            if tok(i + 1).upper() == "NOT" and tok(i + 2).upper() == "NULL":
+                out.append("!=null")
+                i += 3
+                continue
+            if tok(i + 1).upper() == "NULL":
+                out.append("=null")
+                i += 2
+                continue
+            return None
+        neg = up == "NOT" and tok(i + 1).upper() in ("LIKE", "ILIKE", "IN")
+        if neg:
+            i += 1
+            t, up = toks[i], toks[i].upper()
+        if up in ("LIKE", "ILIKE"):
+            if not out or not tok(i + 1):
+                return None
+            out[-1] = _like_to_lqel(out[-1], tok(i + 1), ci=up == "ILIKE", negate=neg)
+            i += 2
+            continue
+        if up == "IN":
+            if not out or tok(i + 1) != "(":
+                return None
+            k, vals = i + 2, []
+            while k < len(toks) and toks[k] != ")":
+                if toks[k] != ",":
+                    vals.append(_sql_str(toks[k]))
+                k += 1
+            if k >= len(toks):
+                return None
+            out[-1] = f"{out[-1]} {'NOT IN' if neg else 'IN'} [{', '.join(vals)}]"
+            i = k + 1
+            continue
+        if up == "BETWEEN":
+            if not out or tok(i + 2).upper() != "AND" or not tok(i + 3):
+                return None
+            field = out.pop()
+            out.append(f"({field}>={_sql_str(tok(i + 1))} AND {field}<={_sql_str(tok(i + 3))})")
+            i += 4
+            continue
+        if up in ("AND", "OR", "NOT"):
+            out.append(up)
+        elif t == "<>":
+            out.append("!=")
+        else:
+            out.append(_sql_str(t))
+        i += 1
+
+    s = " ".join(out)
+    s = re.sub(r"\s*(!=|>=|<=|=|<|>)\s*", r"\1", s)
+    s = re.sub(r"\(\s+", "(", s)
+    s = re.sub(r"\s+\)", ")", s)
+    s = re.sub(r"\s+,", ",", s)
+    return s.strip() or None
+
+
+def sql_to_lqel(text: str) -> Optional[str]:
+    """Rewrite a simple SELECT/WHERE/GROUP BY/HAVING/LIMIT statement as LQEL."""
+    m = _SQL_RE.match((text or "").strip())
+    if not m or not (m.group("select") or m.group("where")):
+        return None
+    parts: List[str] = []
+    if m.group("where"):
+        cond = _sql_condition_to_lqel(m.group("where"))
+        if not cond:
+            return None
+        parts.append(f"where({cond})")
+    if m.group("group"):
+        cols = [c.strip() for c in m.group("group").split(",") if c.strip()]
+        parts.append(f"groupby({', '.join(cols)})")
+    calc = None
+    agg = _AGG_RE.search(m.group("select") or "")
+    if agg:
+        fn, distinct, arg = agg.group(1).lower(), agg.group(2), agg.group(3).strip()
+        if fn == "count":
+            calc = f"unique:{arg}" if distinct and arg != "*" else "count"
+        else:
+            calc = f"{_LQEL_AGG[fn]}:{arg}"
+        parts.append(f"calculate({calc})")
+    if m.group("having") and calc:
+        hv = re.match(r"\s*\w+\s*\([^)]*\)\s*(>=|<=|!=|=|>|<)\s*(\d+(?:\.\d+)?)\s*$", m.group("having"))
+        if hv:
+            parts.append(f"having({calc}{hv.group(1)}{hv.group(2)})")
+    if m.group("limit"):
+        parts.append(f"limit({m.group('limit')})")
+    return " ".join(parts) or None
+
+
+# ----------------------------- entry point -----------------------------
+
+def repair_lqel(text: str) -> Tuple[Optional[str], List[str]]:
+    """
+    Return (valid LQEL body or None, list of fixes applied).
+    An already-valid query comes back with fixes == [].
+    """
+    fixers = (
+        ("doubled-quotes", fix_doubled_quotes),
+        ("balance", balance_brackets),
+        ("trailing-text", truncate_trailing_text),
+    )
+    for cand in _candidates(text):
+        body = _cleanup(cand)
+        if not body:
+            continue
+        applied: List[str] = [] if body == cand.strip() else ["cleanup"]
+        if not validate_lqel(body):
+            return body, applied
+        for name, fn in fixers:
+            fixed = fn(body)
+            if fixed != body:
+                body = fixed
+                applied.append(name)
+                if not validate_lqel(body):
+                    return body, applied
+        sql = sql_to_lqel(_cleanup(cand))
+        if sql and not validate_lqel(sql):
+            return sql, applied + ["sql-rewrite"]
+    return None, []
@@ -0,0 +1,184 @@
+# fusion_assistant_ReAct/persistence/asset_snapshot.py
+"""
+Per-asset state snapshot for change-detection drafting.
+
+Each asset is keyed by asset_id, MAC or hostname (first present) and
+reduced to its *significant* state: a configurable set of fields plus a
+staleness bucket derived from last_seen. Only assets whose significant
+state differs from the last drafted snapshot need a new LLM draft; a bumped
+last_seen that stays in the same bucket does not.
+
+Env:
+  ASSET_SIGNIFICANT_FIELDS       comma list (default status,os,owner,resource_owner)
+  ASSET_STALENESS_BUCKETS_DAYS   ascending day boundaries (default 1,7,14,30)
+"""
+
+from __future__ import annotations
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import json
+import os
+import sqlite3
+import threading
+
+from ..util.misc import content_id, scalar_value
+
+
+_KEY_FIELDS = ("asset_id", "mac", "hostname", "ip")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS asset_state (
+    asset_key   TEXT PRIMARY KEY,
+    fingerprint TEXT NOT NULL,
+    state       TEXT NOT NULL,
+    draft_id    TEXT,
+    run_id      TEXT,
+    updated     TEXT
+) WITHOUT ROWID;
+"""
+
+
+def snapshot_path_for(checkpoint_path: str) -> str:
+    """drafts/asset_drafts.checkpoint.jsonl -> drafts/asset_drafts.snapshot.sqlite"""
+    p = Path(checkpoint_path)
+    stem = p.stem[: -len(".checkpoint")] if p.stem.endswith(".checkpoint") else p.stem
+    return str(p.with_name(f"{stem}.snapshot.sqlite"))
+
+
+def significant_fields() -> List[str]:
+    raw = os.getenv("ASSET_SIGNIFICANT_FIELDS", "status,os,owner,resource_owner")
+    return [f.strip() for f in raw.split(",") if f.strip()]
+
+
+def staleness_buckets() -> List[int]:
+    raw = os.getenv("ASSET_STALENESS_BUCKETS_DAYS", "1,7,14,30")
+    return sorted(int(x) for x in raw.split(",") if x.strip())
+
+
+def asset_key(rec: Dict[str, Any]) -> Optional[str]:
+    """
+    'asset_id:…' / 'mac:…' / 'hostname:…' / 'ip:…', normalised like the triage
+    duplicate key (lists sorted and joined, empty values skipped); None if the
+    record has no identity.
+    """
+    for field in _KEY_FIELDS:
+        v = scalar_value(rec.get(field))
+        if v is None or str(v).strip() == "":
+            continue
+        s = str(v).strip().lower()
+        if field == "mac":
+            s = s.replace("-", ":").replace(".", "")
+        return f"{field}:{s}"
+    return None
+
+
+def staleness_bucket(last_seen: Any, bounds: Sequence[int], now: Optional[datetime] = None) -> str:
+    if not last_seen:
+        return "unknown"
+    try:
+        dt = datetime.fromisoformat(str(last_seen).replace("Z", "+00:00"))
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+    except Exception:
+        return "unknown"
+    days = ((now or datetime.now(timezone.utc)) - dt).total_seconds() / 86400
+    lower = 0
+    for b in bounds:
+        if days < b:
+            return f"{lower}-{b}d"
+        lower = b
+    return f">={lower}d"
+
+
+def significant_state(
+    rec: Dict[str, Any],
+    fields: Optional[Sequence[str]] = None,
+    bounds: Optional[Sequence[int]] = None,
+) -> Dict[str, Any]:
+    fields = fields if fields is not None else significant_fields()
+    state = {f: rec.get(f) for f in fields}
+    state["staleness"] = staleness_bucket(rec.get("last_seen"), bounds if bounds is not None else staleness_buckets())
+    return state
+
+
+def diff_states(old: Dict[str, Any], new: Dict[str, Any]) -> List[str]:
+    """Human-readable 'field: old -> new' lines."""
+    return [
+        f"{k}: {old.get(k)!r} -> {new.get(k)!r}"
+        for k in sorted(set(old) | set(new))
+        if old.get(k) != new.get(k)
+    ]
+
+
+class AssetSnapshotStore:
+    """SQLite-backed map asset_key -> (fingerprint, significant state) of the last drafted version."""
+
+    def __init__(self, db_path: str, *, fields: Optional[Sequence[str]] = None, bounds: Optional[Sequence[int]] = None):
+        self.db_path = db_path
+        self.fields = list(fields) if fields is not None else significant_fields()
+        self.bounds = list(bounds) if bounds is not None else staleness_buckets()
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._pending = 0
+
+    def state_of(self, rec: Dict[str, Any]) -> Tuple[Dict[str, Any], str]:
+        state = significant_state(rec, self.fields, self.bounds)
+        return state, content_id(state)
+
+    def get(self, key: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT fingerprint, state FROM asset_state WHERE asset_key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def classify(self, rec: Dict[str, Any]) -> Tuple[str, Optional[str], Dict[str, Any], str, List[str]]:
+        """
+        Returns (kind, key, state, fingerprint, changes) where kind is
+        'untracked' (no identity), 'new', 'changed' or 'unchanged'.
+        """
+        state, fp = self.state_of(rec)
+        key = asset_key(rec)
+        if key is None:
+            return "untracked", None, state, fp, []
+        prev = self.get(key)
+        if prev is None:
+            return "new", key, state, fp, []
+        if prev[0] == fp:
+            return "unchanged", key, state, fp, []
+        return "changed", key, state, fp, diff_states(prev[1], state)
+
+    def update(self, key: str, state: Dict[str, Any], fingerprint: str, *, draft_id: Optional[str] = None,
+               run_id: Optional[str] = None, updated: Optional[str] = None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO asset_state (asset_key, fingerprint, state, draft_id, run_id, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, fingerprint, json.dumps(state, ensure_ascii=False, default=str), draft_id, run_id, updated),
+            )
+            self._pending += 1
+            if self._pending >= 50:
+                self._conn.commit()
+                self._pending = 0
+
+    def commit(self) -> None:
+        with self._lock:
+            self._conn.commit()
+            self._pending = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+    def __enter__(self) -> "AssetSnapshotStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
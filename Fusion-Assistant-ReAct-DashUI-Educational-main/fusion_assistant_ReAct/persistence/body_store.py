@@ -0,0 +1,230 @@
+# fusion_assistant_ReAct/persistence/body_store.py
+"""
+Content-addressed store for draft bodies.
+
+Asset emails are mostly the same template text with a different hostname.
+Instead of a full "body" per run-file line, pack() splits the body into
+sections (on blank lines), replaces the record's hostname / ip / asset_id /
+owner inside each section with placeholders, and stores every distinct
+section once under its hash, compressed (zstd when `zstandard` is
+installed, zlib otherwise). The ordered list of section hashes is itself
+stored once under a layout hash, so the draft line keeps only
+
+  "body_ref": "<layout hash>"
+
+The placeholder values come back from the draft's own "record" summary,
+so nothing per-host is stored twice. expand() rebuilds the exact original
+body; readers (drafts viewer, draft queue, search index, SMTP delivery)
+call it on every line they load, and lines that still carry a plain
+"body" pass through unchanged. A body that cannot be rebuilt (store moved
+or missing, zstd section without zstandard) comes back with
+body_missing=True and body_error set; it is never sent or indexed. Run files and the store belong together:
+the store sits in the runs directory and is shared by every run.
+
+Env:
+  DRAFT_BODY_STORE         1/0 write body_ref lines instead of full bodies (default 1)
+  DRAFT_BODY_STORE_DB      section store (default drafts/runs/bodies.sqlite)
+  DRAFT_BODY_ZSTD_LEVEL    zstd level (default 10)
+"""
+
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import zlib
+
+from ..io.paths import DRAFT_BODY_STORE_DB
+
+try:
+    import zstandard as _zstd
+except ImportError:  # optional; zlib keeps the format readable without it
+    _zstd = None
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sections (
+    hash TEXT PRIMARY KEY,
+    data BLOB NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS layouts (
+    hash     TEXT PRIMARY KEY,
+    sections TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+# record fields templated out of section text; placeholder i stands for _VAR_FIELDS[i]
+_VAR_FIELDS = ("hostname", "ip", "asset_id", "owner", "resource_owner")
+_MARK = "\x1e"
+_SEP = "\n\n"
+
+
+def body_store_enabled() -> bool:
+    return os.getenv("DRAFT_BODY_STORE", "1").lower() in ("1", "true", "yes")
+
+
+def _hash(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=12).hexdigest()
+
+
+def _values(draft: Dict[str, Any]) -> List[Optional[str]]:
+    rec = draft.get("record") or {}
+    out = []
+    for f in _VAR_FIELDS:
+        v = rec.get(f)
+        v = str(v) if v not in (None, "") else ""
+        out.append(v if len(v) >= 3 and _MARK not in v else None)
+    return out
+
+
+def _template(section: str, values: List[Optional[str]]) -> Tuple[str, bool]:
+    """Replace record values with placeholders; (text, templated). Longest value first."""
+    if _MARK in section:
+        return section, False  # can't tell our markers from the text's own; store verbatim
+    order = sorted((i for i, v in enumerate(values) if v), key=lambda i: -len(values[i]))
+    for i in order:
+        section = section.replace(values[i], f"{_MARK}{i}{_MARK}")
+    return section, True
+
+
+def _fill(section: str, values: List[Optional[str]]) -> str:
+    for i, v in enumerate(values):
+        if v:
+            section = section.replace(f"{_MARK}{i}{_MARK}", v)
+    return section
+
+
+class BodyStore:
+    def __init__(self, db_path: str = DRAFT_BODY_STORE_DB, *, level: Optional[int] = None, cache_size: int = 4096):
+        self.db_path = db_path
+        self.level = level if level is not None else int(os.getenv("DRAFT_BODY_ZSTD_LEVEL", "10"))
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._known: set = set()  # hashes written (or seen) by this process
+        self._cache: Dict[str, Any] = {}
+        self._cache_size = cache_size
+        self._compressor = _zstd.ZstdCompressor(level=self.level) if _zstd else None
+        self._decompressor = _zstd.ZstdDecompressor() if _zstd else None
+
+    # ---------------------- encoding ----------------------
+    def _encode(self, text: str, templated: bool) -> bytes:
+        raw = (b"T" if templated else b"R") + text.encode("utf-8")
+        if self._compressor is not None:
+            return b"z" + self._compressor.compress(raw)
+        return b"d" + zlib.compress(raw, 9)
+
+    def _decode(self, blob: bytes) -> Tuple[str, bool]:
+        codec, payload = blob[:1], blob[1:]
+        if codec == b"z":
+            if self._decompressor is None:
+                raise RuntimeError("section was stored with zstd; install zstandard to read it")
+            raw = self._decompressor.decompress(payload)
+        else:
+            raw = zlib.decompress(payload)
+        return raw[1:].decode("utf-8"), raw[:1] == b"T"
+
+    # ---------------------- write ----------------------
+    def _put(self, table: str, column: str, h: str, value: Any) -> None:
+        if h in self._known:
+            return
+        with self._lock:
+            self._conn.execute(f"INSERT OR IGNORE INTO {table} (hash, {column}) VALUES (?, ?)", (h, value))
+            self._conn.commit()
+            self._known.add(h)
+
+    def pack(self, draft: Dict[str, Any]) -> Dict[str, Any]:
+        """Copy of `draft` with "body" replaced by a body_ref into this store."""
+        body = draft.get("body")
+        if not isinstance(body, str):
+            return draft
+        values = _values(draft)
+        hashes = []
+        for section in body.split(_SEP):
+            text, templated = _template(section, values)
+            h = _hash(("T" if templated else "R") + text)
+            self._put("sections", "data", h, self._encode(text, templated))
+            hashes.append(h)
+        layout = json.dumps(hashes, separators=(",", ":"))
+        ref = _hash(layout)
+        self._put("layouts", "sections", ref, layout)
+        out = {k: v for k, v in draft.items() if k != "body"}
+        out["body_ref"] = ref
+        return out
+
+    # ---------------------- read ----------------------
+    def _get(self, table: str, column: str, h: str) -> Any:
+        hit = self._cache.get(h)
+        if hit is not None:
+            return hit
+        with self._lock:
+            row = self._conn.execute(f"SELECT {column} FROM {table} WHERE hash = ?", (h,)).fetchone()
+        if row is None:
+            raise KeyError(f"{table[:-1]} {h} not in {self.db_path}")
+        hit = self._decode(row[0]) if table == "sections" else json.loads(row[0])
+        if len(self._cache) >= self._cache_size:
+            self._cache.clear()
+        self._cache[h] = hit
+        return hit
+
+    def unpack(self, ref: str, draft: Dict[str, Any]) -> str:
+        """Body behind `ref`, with placeholders filled from `draft`'s record."""
+        values = _values(draft)
+        parts = []
+        for h in self._get("layouts", "sections", ref):
+            text, templated = self._get("sections", "data", h)
+            parts.append(_fill(text, values) if templated else text)
+        return _SEP.join(parts)
+
+    def size(self) -> Tuple[int, int, int]:
+        """(sections, layouts, stored bytes)"""
+        with self._lock:
+            s, sb = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0) FROM sections").fetchone()
+            l, lb = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(LENGTH(sections)), 0) FROM layouts").fetchone()
+        return s, l, sb + lb
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> "BodyStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# ---------------------- readers ----------------------
+_open_stores: Dict[str, BodyStore] = {}
+_open_lock = threading.Lock()
+
+
+def _store_for(path: str = DRAFT_BODY_STORE_DB) -> BodyStore:
+    with _open_lock:
+        store = _open_stores.get(path)
+        if store is None:
+            store = _open_stores[path] = BodyStore(path)
+        return store
+
+
+def expand(draft: Dict[str, Any]) -> Dict[str, Any]:
+    """Run-file line -> draft with its full "body" (lines without body_ref are returned as-is)."""
+    ref = draft.get("body_ref") if isinstance(draft, dict) else None
+    if not ref:
+        return draft
+    out = {k: v for k, v in draft.items() if k != "body_ref"}
+    try:
+        out["body"] = _store_for().unpack(ref, draft)
+    except (KeyError, RuntimeError, ValueError, sqlite3.Error, zlib.error) as e:
+        # never hand out a silently blank body: senders and the index must check body_missing
+        print(f"[body_store] Could not rebuild body of draft {draft.get('id')}: {e}")
+        out["body"] = ""
+        out["body_missing"] = True
+        out["body_error"] = str(e)
+    return out
@@ -0,0 +1,240 @@
+# fusion_assistant_ReAct/persistence/checkpoint_store.py
+"""
+Indexed checkpoint store for asset drafting runs.
+
+SQLite table keyed by draft id, so resume checks are primary-key lookups
+instead of re-reading the whole append-only checkpoint JSONL into a set.
+The JSONL is still appended as a human-readable audit log; it is imported
+once when the database is first created, and compact() rewrites it with one
+line per id.
+
+The JSONL is the source of truth: every mark is committed by default (the
+audit line is flushed first), and on open the store replays the JSONL past
+the offset recorded at the last clean close, so ids a crashed run logged
+but never committed are not drafted again.
+
+CLI (run while no drafting run is writing the checkpoint):
+  python -m fusion_assistant_ReAct.persistence.checkpoint_store compact [--checkpoint PATH]
+
+Env:
+  CHECKPOINT_COMMIT_EVERY  marks per SQLite commit (default 1; larger batches
+                           rely on the replay after a crash)
+"""
+
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+import argparse
+import json
+import os
+import sqlite3
+import threading
+
+
+_COLUMNS = ("id", "status", "run_id", "timestamp", "hostname", "ip", "owner", "resource_owner", "subject")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    id             TEXT PRIMARY KEY,
+    status         TEXT NOT NULL,
+    run_id         TEXT,
+    timestamp      TEXT,
+    hostname       TEXT,
+    ip             TEXT,
+    owner          TEXT,
+    resource_owner TEXT,
+    subject        TEXT
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS checkpoints_run ON checkpoints(run_id);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+) WITHOUT ROWID;
+"""
+
+
+def db_path_for(checkpoint_path: str) -> str:
+    """drafts/asset_drafts.checkpoint.jsonl -> drafts/asset_drafts.checkpoint.sqlite"""
+    return str(Path(checkpoint_path).with_suffix(".sqlite"))
+
+
+def _complete_size(path: str, chunk: int = 65536) -> int:
+    """Byte length of `path` up to and including its last newline (a torn last line is excluded)."""
+    with open(path, "rb") as fh:
+        end = fh.seek(0, os.SEEK_END)
+        pos = end
+        while pos > 0:
+            step = min(chunk, pos)
+            fh.seek(pos - step)
+            nl = fh.read(step).rfind(b"\n")
+            if nl != -1:
+                return pos - step + nl + 1
+            pos -= step
+    return 0
+
+
+class CheckpointStore:
+    """
+    has(id) / mark(record) / iter_records(); writes are committed every
+    `commit_every` marks and on close(). `jsonl_path` is the audit log the
+    store is rebuilt from (imported when fresh, tail replayed on open).
+    Safe to share between threads.
+    """
+
+    def __init__(self, db_path: str, *, jsonl_path: Optional[str] = None, commit_every: Optional[int] = None):
+        self.db_path = db_path
+        self.jsonl_path = jsonl_path
+        self.commit_every = commit_every if commit_every is not None else int(os.getenv("CHECKPOINT_COMMIT_EVERY", "1"))
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        fresh = not Path(db_path).exists()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._pending = 0
+        if jsonl_path and Path(jsonl_path).exists():
+            start = 0 if fresh else self._synced_offset()
+            n = self.import_jsonl(jsonl_path, start=start)
+            if fresh:
+                print(f"[checkpoint] Imported {n} entries from {jsonl_path} into {db_path}")
+            elif n:
+                print(f"[checkpoint] Replayed {n} entries from {jsonl_path} not in {db_path} at last close")
+
+    # ---------------------- reads ----------------------
+    def has(self, draft_id: str, status: str = "drafted") -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM checkpoints WHERE id = ? AND status = ?", (draft_id, status)
+            ).fetchone()
+        return row is not None
+
+    def __contains__(self, draft_id: str) -> bool:
+        return self.has(draft_id)
+
+    def count(self, status: Optional[str] = None) -> int:
+        with self._lock:
+            if status is None:
+                return self._conn.execute("SELECT COUNT(*) FROM checkpoints").fetchone()[0]
+            return self._conn.execute("SELECT COUNT(*) FROM checkpoints WHERE status = ?", (status,)).fetchone()[0]
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM checkpoints ORDER BY timestamp, id").fetchall()
+        for row in rows:
+            yield dict(zip(_COLUMNS, row))
+
+    # ---------------------- writes ----------------------
+    def mark(self, record: Dict[str, Any]) -> None:
+        """Upsert one checkpoint record (must carry 'id' and 'status')."""
+        with self._lock:
+            self._upsert(record)
+            self._pending += 1
+            if self.commit_every and self._pending >= self.commit_every:
+                self._conn.commit()
+                self._pending = 0
+
+    def _upsert(self, record: Dict[str, Any]) -> None:
+        values = tuple(
+            None if record.get(c) is None else str(record.get(c)) for c in _COLUMNS
+        )
+        self._conn.execute(
+            f"INSERT OR REPLACE INTO checkpoints ({', '.join(_COLUMNS)}) VALUES ({', '.join('?' * len(_COLUMNS))})",
+            values,
+        )
+
+    def commit(self) -> None:
+        with self._lock:
+            self._conn.commit()
+            self._pending = 0
+
+    def import_jsonl(self, path: str, *, start: int = 0) -> int:
+        """Mark every complete line of `path` from byte `start` on; a torn last line is left for later."""
+        if start > Path(path).stat().st_size:
+            start = 0  # log was replaced (e.g. compacted elsewhere): replay all of it
+        n = 0
+        offset = start
+        with open(path, "rb") as fh:
+            fh.seek(start)
+            for raw in fh:
+                if not raw.endswith(b"\n"):
+                    break
+                offset += len(raw)
+                try:
+                    rec = json.loads(raw)
+                except ValueError:
+                    continue
+                if isinstance(rec, dict) and rec.get("id") and rec.get("status"):
+                    with self._lock:
+                        self._upsert(rec)  # one commit for the whole import
+                    n += 1
+        self._set_synced_offset(offset)
+        self.commit()
+        return n
+
+    # JSONL byte offset up to which the database is known to be complete
+    def _synced_offset(self) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'jsonl_offset'").fetchone()
+        return int(row[0]) if row else 0
+
+    def _set_synced_offset(self, offset: int) -> None:
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('jsonl_offset', ?)", (str(offset),))
+
+    # ---------------------- maintenance ----------------------
+    def compact(self, jsonl_path: Optional[str] = None) -> Dict[str, int]:
+        """
+        VACUUM the database and, if given, rewrite the audit JSONL with one
+        line per id (latest state), atomically via a temp file.
+        """
+        self.commit()
+        stats = {"ids": self.count(), "jsonl_before": 0, "jsonl_after": 0}
+        if jsonl_path and Path(jsonl_path).exists():
+            with open(jsonl_path, "r", encoding="utf-8") as fh:
+                stats["jsonl_before"] = sum(1 for _ in fh)
+            tmp = f"{jsonl_path}.compact.tmp"
+            with open(tmp, "w", encoding="utf-8") as out:
+                for rec in self.iter_records():
+                    out.write(json.dumps({k: v for k, v in rec.items() if v is not None}, ensure_ascii=False) + "\n")
+                    stats["jsonl_after"] += 1
+                out.flush()
+                os.fsync(out.fileno())
+            os.replace(tmp, jsonl_path)
+            if jsonl_path == self.jsonl_path:
+                self._set_synced_offset(_complete_size(jsonl_path))
+                self.commit()
+        with self._lock:
+            self._conn.execute("VACUUM")
+        return stats
+
+    def close(self) -> None:
+        if self.jsonl_path and Path(self.jsonl_path).exists():
+            # every line logged so far was marked by the time the run closes the store
+            self._set_synced_offset(_complete_size(self.jsonl_path))
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+    def __enter__(self) -> "CheckpointStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from fusion_assistant_ReAct.io.paths import DRAFT_CHECKPOINT
+
+    ap = argparse.ArgumentParser(description="Asset drafting checkpoint maintenance")
+    ap.add_argument("command", choices=("compact",))
+    ap.add_argument("--checkpoint", default=DRAFT_CHECKPOINT, help="checkpoint JSONL (the index sits next to it)")
+    args = ap.parse_args(argv)
+
+    with CheckpointStore(db_path_for(args.checkpoint), jsonl_path=args.checkpoint) as store:
+        stats = store.compact(args.checkpoint)
+    print(f"[checkpoint] Compacted {args.checkpoint}: {stats['jsonl_before']} -> {stats['jsonl_after']} lines, {stats['ids']} ids")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+# fusion_assistant_ReAct/persistence/draft_index.py
+"""
+Cross-run search index over drafted emails.
+
+One SQLite database (drafts/draft_index.sqlite) holds a row per (run_id,
+draft id) with hostname, ip, owner, subject, timestamp and recipients, plus
+an FTS5 table over subject/body/hostname/owner. "When did we last email the
+owner of host X" is then one indexed query instead of a scan of every run
+file.
+
+Kept up to date two ways:
+  - run_from_config adds each draft as it is written (add())
+  - sync() tails every drafts/runs/*.drafts.jsonl from the byte offset it
+    reached last time, so files written elsewhere (job-queue merges, older
+    runs) are picked up incrementally; a file that shrank is re-read
+Both paths upsert on (run_id, draft id), so indexing a draft twice is harmless.
+
+Env:
+  DRAFT_INDEX      1/0 live indexing during runs (default 1)
+  DRAFT_INDEX_DB   index location (default drafts/draft_index.sqlite)
+"""
+
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import json
+import os
+import re
+import sqlite3
+import threading
+
+from ..io.paths import DRAFT_INDEX_DB, DRAFT_RUNS_DIR
+from .body_store import expand
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS drafts (
+    rowid      INTEGER PRIMARY KEY,
+    run_id     TEXT NOT NULL,
+    draft_id   TEXT NOT NULL,
+    hostname   TEXT,
+    ip         TEXT,
+    owner      TEXT,
+    subject    TEXT,
+    timestamp  TEXT,
+    recipients TEXT,
+    approved   INTEGER,
+    run_file   TEXT,
+    UNIQUE (run_id, draft_id)
+);
+CREATE INDEX IF NOT EXISTS idx_drafts_host  ON drafts (hostname COLLATE NOCASE, timestamp);
+CREATE INDEX IF NOT EXISTS idx_drafts_ip    ON drafts (ip, timestamp);
+CREATE INDEX IF NOT EXISTS idx_drafts_owner ON drafts (owner COLLATE NOCASE, timestamp);
+CREATE INDEX IF NOT EXISTS idx_drafts_ts    ON drafts (timestamp);
+CREATE VIRTUAL TABLE IF NOT EXISTS drafts_fts USING fts5 (subject, body, hostname, owner);
+CREATE TABLE IF NOT EXISTS indexed_files (
+    run_file TEXT PRIMARY KEY,
+    offset   INTEGER NOT NULL
+);
+"""
+
+
+def index_enabled() -> bool:
+    return os.getenv("DRAFT_INDEX", "1").lower() in ("1", "true", "yes")
+
+
+def _flat(value: Any) -> Optional[str]:
+    """Scalar column value: lists (e.g. "ip": ["10.0.0.1", ...]) become "a, b", dicts JSON."""
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple, set)):
+        return ", ".join(map(str, value))
+    if isinstance(value, dict):
+        return json.dumps(value, ensure_ascii=False, sort_keys=True)
+    return str(value)
+
+
+def _fts_query(text: str) -> str:
+    """User text -> FTS5 query: each word quoted (no syntax errors), prefix-matched, AND-ed."""
+    words = re.findall(r"[\w.@:-]+", text)
+    return " ".join('"' + w.replace('"', "") + '"*' for w in words)
+
+
+class DraftIndex:
+    def __init__(self, db_path: str = DRAFT_INDEX_DB, *, commit_every: int = 200):
+        self.db_path = db_path
+        self.commit_every = commit_every
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._pending = 0
+
+    # ---------------------- writes ----------------------
+    def _upsert(self, draft: Dict[str, Any], run_file: Optional[str]) -> None:
+        rec = draft.get("record") or {}
+        owner = _flat(rec.get("resource_owner") or rec.get("owner"))
+        hostname = _flat(rec.get("hostname"))
+        recipients = json.dumps({k: draft.get(k) or [] for k in ("to", "cc", "bcc")})
+        run_id, draft_id = str(draft.get("run_id") or ""), str(draft.get("id") or "")
+        row = self._conn.execute(
+            "SELECT rowid FROM drafts WHERE run_id = ? AND draft_id = ?", (run_id, draft_id)
+        ).fetchone()
+        if row is not None:
+            self._conn.execute("DELETE FROM drafts_fts WHERE rowid = ?", (row[0],))
+            self._conn.execute("DELETE FROM drafts WHERE rowid = ?", (row[0],))
+        cur = self._conn.execute(
+            "INSERT INTO drafts (run_id, draft_id, hostname, ip, owner, subject, timestamp, recipients, approved, run_file) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (run_id, draft_id, hostname, _flat(rec.get("ip")), owner, _flat(draft.get("subject")),
+             _flat(draft.get("timestamp")), recipients, int(bool(draft.get("approved"))), run_file),
+        )
+        self._conn.execute(
+            "INSERT INTO drafts_fts (rowid, subject, body, hostname, owner) VALUES (?, ?, ?, ?, ?)",
+            (cur.lastrowid, _flat(draft.get("subject")) or "", _flat(draft.get("body")) or "", hostname or "", owner or ""),
+        )
+        self._pending += 1
+        if self._pending >= self.commit_every:
+            self._conn.commit()
+            self._pending = 0
+
+    def add(self, draft: Dict[str, Any], run_file: Optional[str] = None) -> None:
+        with self._lock:
+            self._upsert(draft, str(run_file) if run_file else None)
+
+    def commit(self) -> None:
+        with self._lock:
+            self._conn.commit()
+            self._pending = 0
+
+    def sync_file(self, run_file: Path) -> int:
+        """Index lines appended to one run file since the last sync; returns drafts indexed."""
+        path = str(run_file)
+        size = run_file.stat().st_size
+        with self._lock:
+            row = self._conn.execute("SELECT offset FROM indexed_files WHERE run_file = ?", (path,)).fetchone()
+        offset = row[0] if row else 0
+        if offset > size:  # rewritten (e.g. a job-queue merge replaced it)
+            offset = 0
+        if offset == size:
+            return 0
+        n = 0
+        with run_file.open("rb") as fh, self._lock:
+            fh.seek(offset)
+            for raw in fh:
+                if not raw.endswith(b"\n"):
+                    break  # partial last line; picked up next time
+                line = raw.strip()
+                if line:
+                    try:
+                        draft = expand(json.loads(line))
+                        if draft.get("body_missing"):
+                            # don't index an empty body; retry this line once the body store is back
+                            print(f"[draft_index] Body of {draft.get('id')} unavailable; {path} resumes here next sync")
+                            break
+                        self._upsert(draft, path)
+                        n += 1
+                    except (ValueError, AttributeError, TypeError, sqlite3.Error) as e:
+                        print(f"[draft_index] Skipping unindexable line in {path}: {e}")
+                offset += len(raw)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO indexed_files (run_file, offset) VALUES (?, ?)", (path, offset)
+            )
+            self._conn.commit()
+            self._pending = 0
+        return n
+
+    def mark_synced(self, run_file: Path, start_offset: int) -> None:
+        """
+        After live add()s covered everything appended from `start_offset`, move
+        the file's sync offset to its end -- only if sync had reached start_offset,
+        otherwise the older lines still need a sync().
+        """
+        path = str(run_file)
+        size = Path(run_file).stat().st_size
+        with self._lock:
+            row = self._conn.execute("SELECT offset FROM indexed_files WHERE run_file = ?", (path,)).fetchone()
+            if (row[0] if row else 0) == start_offset:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO indexed_files (run_file, offset) VALUES (?, ?)", (path, size)
+                )
+            self._conn.commit()
+            self._pending = 0
+
+    def sync(self, runs_dir: str = DRAFT_RUNS_DIR) -> int:
+        root = Path(runs_dir)
+        if not root.exists():
+            return 0
+        return sum(self.sync_file(p) for p in sorted(root.glob("*.drafts.jsonl")))
+
+    # ---------------------- queries ----------------------
+    def search(
+        self,
+        text: Optional[str] = None,
+        *,
+        hostname: Optional[str] = None,
+        ip: Optional[str] = None,
+        owner: Optional[str] = None,
+        run_id: Optional[str] = None,
+        limit: int = 50,
+    ) -> List[Dict[str, Any]]:
+        """Newest first. `text` is full-text over subject/body/hostname/owner; the rest are exact (case-insensitive)."""
+        where, params = [], []
+        if text and _fts_query(text):
+            where.append("d.rowid IN (SELECT rowid FROM drafts_fts WHERE drafts_fts MATCH ?)")
+            params.append(_fts_query(text))
+        for col, val in (("hostname", hostname), ("owner", owner)):
+            if val:
+                where.append(f"d.{col} = ? COLLATE NOCASE")
+                params.append(val)
+        if ip:
+            # ip is stored joined ("10.0.0.1, 10.0.0.2"); match the whole value or any one address
+            where.append("(d.ip = ? OR ', ' || d.ip || ', ' LIKE ?)")
+            params.extend([_flat(ip), "%, " + _flat(ip) + ", %"])
+        if run_id:
+            where.append("d.run_id = ?")
+            params.append(run_id)
+        sql = (
+            "SELECT d.run_id, d.draft_id, d.hostname, d.ip, d.owner, d.subject, d.timestamp, d.recipients, "
+            "d.approved, d.run_file, f.body FROM drafts d JOIN drafts_fts f ON f.rowid = d.rowid"
+            + (" WHERE " + " AND ".join(where) if where else "")
+            + " ORDER BY d.timestamp DESC, d.rowid DESC LIMIT ?"
+        )
+        with self._lock:
+            rows = self._conn.execute(sql, (*params, int(limit))).fetchall()
+        out = []
+        for run_id_, draft_id, host, ip_, own, subj, ts, rcpts, approved, run_file, body in rows:
+            rc = json.loads(rcpts or "{}")
+            out.append({
+                "id": draft_id, "run_id": run_id_, "subject": subj, "timestamp": ts, "body": body,
+                "to": rc.get("to", []), "cc": rc.get("cc", []), "bcc": rc.get("bcc", []),
+                "approved": bool(approved), "run_file": run_file,
+                "record": {"hostname": host, "ip": ip_, "owner": own},
+            })
+        return out
+
+    def last_emailed(self, *, hostname: Optional[str] = None, owner: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        hits = self.search(hostname=hostname, owner=owner, limit=1)
+        return hits[0] if hits else None
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM drafts").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
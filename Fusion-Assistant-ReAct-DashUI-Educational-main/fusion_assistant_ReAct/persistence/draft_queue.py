@@ -0,0 +1,85 @@
+# fusion_assistant_ReAct/persistence/draft_queue.py
+"""
+Bounded draft queue backed by the on-disk run files.
+
+The agent is shared by every Dash session, so keeping each draft (record +
+full email body) in a list grew memory with every batch run. DraftQueue
+keeps only the newest `max_in_memory` drafts; everything else is read back
+lazily from drafts/runs/<run_id>.drafts.jsonl, which the batch writer
+persists *before* a draft is queued.
+
+Env:
+  ASSET_DRAFT_QUEUE_MAX    drafts kept in memory (default 200)
+  ASSET_DRAFT_QUEUE_RUNS   run files remembered for iteration (default 100)
+"""
+
+from __future__ import annotations
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional
+import json
+import os
+import threading
+
+from .body_store import expand
+
+
+class DraftQueue:
+    def __init__(self, max_in_memory: Optional[int] = None, max_runs: Optional[int] = None):
+        self.max_in_memory = max_in_memory if max_in_memory is not None else int(os.getenv("ASSET_DRAFT_QUEUE_MAX", "200"))
+        self.max_runs = max_runs if max_runs is not None else int(os.getenv("ASSET_DRAFT_QUEUE_RUNS", "100"))
+        self._recent: Deque[Dict[str, Any]] = deque(maxlen=max(self.max_in_memory, 0))
+        self._runs: "OrderedDict[str, Path]" = OrderedDict()  # run_id -> run file, oldest first
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def append(self, draft: Dict[str, Any], run_file: Optional[Path] = None) -> None:
+        """Queue a draft already written to `run_file`."""
+        with self._lock:
+            self._recent.append(draft)
+            self._total += 1
+            run_id = str(draft.get("run_id") or "")
+            if run_file is not None and run_id not in self._runs:
+                self._runs[run_id] = Path(run_file)
+                while len(self._runs) > self.max_runs:
+                    self._runs.popitem(last=False)
+
+    def __len__(self) -> int:
+        return self._total
+
+    def recent(self, n: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Newest drafts still held in memory (oldest first)."""
+        with self._lock:
+            items = list(self._recent)
+        return items if n is None else items[-n:]
+
+    def run_ids(self) -> List[str]:
+        with self._lock:
+            return list(self._runs)
+
+    def iter_drafts(self, run_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Stream queued drafts from the run files (all remembered runs, or one), in write order."""
+        with self._lock:
+            runs = [(rid, p) for rid, p in self._runs.items() if run_id is None or rid == run_id]
+        for _rid, path in runs:
+            if not path.exists():
+                continue
+            with path.open("r", encoding="utf-8") as fh:
+                for line in fh:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        draft = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    yield expand(draft)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self.iter_drafts()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._recent.clear()
+            self._runs.clear()
+            self._total = 0
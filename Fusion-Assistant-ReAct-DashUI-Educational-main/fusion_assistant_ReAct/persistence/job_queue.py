@@ -0,0 +1,267 @@
+# fusion_assistant_ReAct/persistence/job_queue.py
+"""
+Durable local job queue for multi-process asset drafting.
+
+A job (one run_id) is sharded into leases: lists of input line numbers from
+one JSONL file. Workers, in any number of processes or on any host that
+shares the queue file, claim a lease for `lease_seconds`, extend it with
+heartbeat() while drafting, and complete() it. A lease whose holder dies
+simply expires and is handed to the next claim(); after `max_attempts`
+claims it is marked failed. Claims run inside BEGIN IMMEDIATE, so two
+workers never hold the same unexpired lease.
+
+Every attempt writes its own result file (result_path), so a worker that
+was only slow cannot interleave with the one that took over; merge()
+concatenates all attempts in lease order and drops repeated draft IDs.
+"""
+
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    run_id     TEXT PRIMARY KEY,
+    created    REAL NOT NULL,
+    lease_size INTEGER NOT NULL,
+    records    INTEGER NOT NULL,
+    merged     TEXT
+);
+CREATE TABLE IF NOT EXISTS leases (
+    run_id   TEXT NOT NULL,
+    seq      INTEGER NOT NULL,
+    file     TEXT NOT NULL,
+    lines    TEXT NOT NULL,
+    status   TEXT NOT NULL DEFAULT 'pending',
+    owner    TEXT,
+    expires  REAL NOT NULL DEFAULT 0,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error    TEXT,
+    updated  REAL,
+    PRIMARY KEY (run_id, seq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_leases_claim ON leases (run_id, status, expires);
+"""
+
+
+class Lease(NamedTuple):
+    run_id: str
+    seq: int
+    file: str
+    lines: List[int]
+    attempt: int
+    expires: float
+
+
+def result_path(runs_dir: str, run_id: str, seq: int, attempt: int) -> Path:
+    """drafts/runs/<run_id>.parts/lease-00007.a2.drafts.jsonl"""
+    return Path(runs_dir) / f"{run_id}.parts" / f"lease-{seq:05d}.a{attempt}.drafts.jsonl"
+
+
+class JobQueue:
+    def __init__(self, db_path: str, *, max_attempts: Optional[int] = None):
+        self.db_path = db_path
+        self.max_attempts = max_attempts if max_attempts is not None else int(os.getenv("ASSET_JOB_MAX_ATTEMPTS", "3"))
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # autocommit mode; multi-statement updates use explicit BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    # ---------------------- producer ----------------------
+    def submit(
+        self,
+        run_id: str,
+        files: Iterable[Path],
+        *,
+        lease_size: int = 500,
+        skip: Optional[Set[Tuple[str, int]]] = None,
+    ) -> int:
+        """
+        Shard the non-empty lines of `files` (minus `skip` (file, line) positions)
+        into leases of `lease_size` records. Re-submitting an existing run_id is a
+        no-op, so a crashed producer can simply run again. Returns the lease count.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT COUNT(*) FROM leases WHERE run_id = ?", (run_id,)).fetchone()
+        if row[0]:
+            return row[0]
+
+        skip = skip or set()
+        batch: List[Tuple[Any, ...]] = []
+        seq = records = 0
+        for file in files:
+            name = str(file)
+            chunk: List[int] = []
+            with Path(file).open("rb") as fh:
+                for i, line in enumerate(fh, 1):
+                    if not line.strip() or (name, i) in skip:
+                        continue
+                    chunk.append(i)
+                    if len(chunk) >= lease_size:
+                        batch.append((run_id, seq, name, json.dumps(chunk)))
+                        seq, records, chunk = seq + 1, records + len(chunk), []
+            if chunk:
+                batch.append((run_id, seq, name, json.dumps(chunk)))
+                seq, records = seq + 1, records + len(chunk)
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO leases (run_id, seq, file, lines, updated) VALUES (?, ?, ?, ?, ?)",
+                    [b + (time.time(),) for b in batch],
+                )
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO jobs (run_id, created, lease_size, records) VALUES (?, ?, ?, ?)",
+                    (run_id, time.time(), lease_size, records),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return seq
+
+    # ---------------------- workers ----------------------
+    def claim(self, run_id: str, worker_id: str, lease_seconds: float) -> Optional[Lease]:
+        """Take the first pending or expired lease; None when nothing is claimable right now."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                while True:
+                    row = self._conn.execute(
+                        "SELECT seq, file, lines, attempts FROM leases "
+                        "WHERE run_id = ? AND (status = 'pending' OR (status = 'leased' AND expires < ?)) "
+                        "ORDER BY seq LIMIT 1",
+                        (run_id, now),
+                    ).fetchone()
+                    if row is None:
+                        self._conn.execute("COMMIT")
+                        return None
+                    seq, file, lines, attempts = row
+                    if attempts >= self.max_attempts:
+                        self._conn.execute(
+                            "UPDATE leases SET status = 'failed', owner = NULL, updated = ? WHERE run_id = ? AND seq = ?",
+                            (now, run_id, seq),
+                        )
+                        print(f"[job_queue] Lease {run_id}#{seq} failed after {attempts} attempts")
+                        continue
+                    expires = now + lease_seconds
+                    self._conn.execute(
+                        "UPDATE leases SET status = 'leased', owner = ?, expires = ?, attempts = attempts + 1, updated = ? "
+                        "WHERE run_id = ? AND seq = ?",
+                        (worker_id, expires, now, run_id, seq),
+                    )
+                    self._conn.execute("COMMIT")
+                    return Lease(run_id, seq, file, json.loads(lines), attempts + 1, expires)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _update_owned(self, sql: str, params: Tuple[Any, ...]) -> bool:
+        with self._lock:
+            cur = self._conn.execute(sql, params)
+        return cur.rowcount == 1
+
+    def heartbeat(self, lease: Lease, worker_id: str, lease_seconds: float) -> bool:
+        """Extend a held lease; False if it expired and was taken over."""
+        return self._update_owned(
+            "UPDATE leases SET expires = ?, updated = ? WHERE run_id = ? AND seq = ? AND owner = ? AND status = 'leased'",
+            (time.time() + lease_seconds, time.time(), lease.run_id, lease.seq, worker_id),
+        )
+
+    def complete(self, lease: Lease, worker_id: str) -> bool:
+        return self._update_owned(
+            "UPDATE leases SET status = 'done', expires = 0, error = NULL, updated = ? "
+            "WHERE run_id = ? AND seq = ? AND owner = ? AND status = 'leased'",
+            (time.time(), lease.run_id, lease.seq, worker_id),
+        )
+
+    def fail(self, lease: Lease, worker_id: str, error: str) -> bool:
+        """Hand the lease back for a retry (claim() marks it failed once attempts run out)."""
+        return self._update_owned(
+            "UPDATE leases SET status = 'pending', owner = NULL, expires = 0, error = ?, updated = ? "
+            "WHERE run_id = ? AND seq = ? AND owner = ? AND status = 'leased'",
+            (str(error)[:2000], time.time(), lease.run_id, lease.seq, worker_id),
+        )
+
+    # ---------------------- status / merge ----------------------
+    def counts(self, run_id: str) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM leases WHERE run_id = ? GROUP BY status", (run_id,)
+            ).fetchall()
+        out = {"pending": 0, "leased": 0, "done": 0, "failed": 0}
+        out.update({s: n for s, n in rows})
+        return out
+
+    def is_finished(self, run_id: str) -> bool:
+        c = self.counts(run_id)
+        return c["pending"] == 0 and c["leased"] == 0
+
+    def next_expiry(self, run_id: str) -> Optional[float]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(expires) FROM leases WHERE run_id = ? AND status = 'leased'", (run_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def merge(self, run_id: str, runs_dir: str, out_path: Optional[str] = None) -> Tuple[Path, int]:
+        """
+        Concatenate every attempt's result file, in lease order, into one run file
+        (drafts/runs/<run_id>.drafts.jsonl); repeated draft IDs are written once.
+        Returns (path, drafts written).
+        """
+        out = Path(out_path) if out_path else Path(runs_dir) / f"{run_id}.drafts.jsonl"
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, attempts FROM leases WHERE run_id = ? ORDER BY seq", (run_id,)
+            ).fetchall()
+        seen: Set[str] = set()
+        written = 0
+        tmp = out.with_name(out.name + ".tmp")
+        out.parent.mkdir(parents=True, exist_ok=True)
+        with tmp.open("w", encoding="utf-8") as dst:
+            for seq, attempts in rows:
+                for attempt in range(1, attempts + 1):
+                    part = result_path(runs_dir, run_id, seq, attempt)
+                    if not part.exists():
+                        continue
+                    with part.open("r", encoding="utf-8") as src:
+                        for line in src:
+                            line = line.strip()
+                            if not line:
+                                continue
+                            try:
+                                draft_id = json.loads(line).get("id")
+                            except json.JSONDecodeError:
+                                continue  # torn last line of a killed attempt
+                            if draft_id in seen:
+                                continue
+                            seen.add(draft_id)
+                            dst.write(line + "\n")
+                            written += 1
+            dst.flush()
+            os.fsync(dst.fileno())
+        os.replace(tmp, out)
+        with self._lock:
+            self._conn.execute("UPDATE jobs SET merged = ? WHERE run_id = ?", (str(out), run_id))
+        return out, written
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> "JobQueue":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
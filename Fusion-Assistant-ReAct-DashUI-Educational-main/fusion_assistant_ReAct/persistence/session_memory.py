@@ -0,0 +1,183 @@
+# fusion_assistant_ReAct/persistence/session_memory.py
+"""
+Per-session conversation memory for the ReAct front end.
+
+Each UI session (one browser tab) gets its own windows, one per
+conversation (the active document, or a tool such as "lcel"). A window
+keeps only the last `keep_turns` (user, assistant) turns, and what goes
+into a prompt is trimmed further to `max_turns` / `max_tokens`, so prompt
+size depends on the current session's recent context only -- never on
+how many other analysts are using the app or how long it has been up.
+
+Sessions idle for `idle_seconds` are evicted (checked opportunistically on
+access), and at most `max_sessions` are kept (least recently used first).
+Callbacks registered with on_evict() get the id of every evicted or
+dropped session, so per-session state kept elsewhere (the Dash UI's
+documents and transcripts) is released under the same policy; touch()
+marks a session as used without opening a window.
+
+Code that has no session handle (tools called by the executor) reads the
+session of the request it runs in from `current_session`, which
+GroupChatSystem sets around each executor call.
+
+Env:
+  SESSION_KEEP_TURNS          turns stored per conversation (default 8)
+  SESSION_HISTORY_MAX_TOKENS  token cap for history rendered into a prompt (default 1000)
+  SESSION_IDLE_SECONDS        evict sessions idle this long (default 3600)
+  SESSION_MAX                 sessions kept at most (default 500)
+"""
+
+from __future__ import annotations
+from collections import OrderedDict, deque
+from contextvars import ContextVar
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+import os
+import threading
+import time
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+
+from ..util.misc import approx_tokens
+
+
+# (session_id, conversation) of the request being handled, if any
+current_session: ContextVar[Optional[Tuple[str, str]]] = ContextVar("current_session", default=None)
+
+
+class SessionWindow:
+    """Last `keep_turns` turns of one conversation."""
+
+    def __init__(self, keep_turns: int):
+        self._turns: Deque[Tuple[str, str]] = deque(maxlen=max(keep_turns, 1))
+        self._lock = threading.Lock()
+
+    def add(self, user: str, assistant: str) -> None:
+        with self._lock:
+            self._turns.append((str(user or ""), str(assistant or "")))
+
+    def turns(self, max_turns: Optional[int] = None) -> List[Tuple[str, str]]:
+        with self._lock:
+            turns = list(self._turns)
+        if max_turns is not None:
+            turns = turns[-max_turns:] if max_turns > 0 else []
+        return turns
+
+    def render(self, max_turns: int, max_tokens: int, max_chars: Optional[int] = None) -> str:
+        """'User: ...' / 'Assistant: ...' lines, oldest first; oldest dropped until under max_tokens."""
+        lines: List[str] = []
+        for user, assistant in self.turns(max_turns):
+            lines.append(f"User: {user[:max_chars] if max_chars else user}")
+            lines.append(f"Assistant: {assistant[:max_chars] if max_chars else assistant}")
+        while lines and approx_tokens("\n".join(lines)) > max_tokens:
+            lines.pop(0)
+        return "\n".join(lines)
+
+    def messages(self, max_turns: int, max_tokens: int) -> List[BaseMessage]:
+        """Same window as chat messages (for MessagesPlaceholder prompts)."""
+        msgs: List[BaseMessage] = []
+        for user, assistant in self.turns(max_turns):
+            msgs.extend((HumanMessage(content=user), AIMessage(content=assistant)))
+        while msgs and approx_tokens("\n".join(str(m.content) for m in msgs)) > max_tokens:
+            del msgs[:2]
+        return msgs
+
+    def __len__(self) -> int:
+        return len(self._turns)
+
+
+class SessionMemoryStore:
+    def __init__(
+        self,
+        *,
+        keep_turns: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+        idle_seconds: Optional[float] = None,
+        max_sessions: Optional[int] = None,
+    ):
+        self.keep_turns = keep_turns if keep_turns is not None else int(os.getenv("SESSION_KEEP_TURNS", "8"))
+        self.max_tokens = max_tokens if max_tokens is not None else int(os.getenv("SESSION_HISTORY_MAX_TOKENS", "1000"))
+        self.idle_seconds = idle_seconds if idle_seconds is not None else float(os.getenv("SESSION_IDLE_SECONDS", "3600"))
+        self.max_sessions = max_sessions if max_sessions is not None else int(os.getenv("SESSION_MAX", "500"))
+        # session_id -> (last_used, {conversation: SessionWindow}); oldest access first
+        self._sessions: "OrderedDict[str, Tuple[float, Dict[str, SessionWindow]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._next_sweep = 0.0
+        self._evicted = 0
+        self._evict_listeners: List[Callable[[str], None]] = []
+
+    def on_evict(self, listener: Callable[[str], None]) -> None:
+        """Call `listener(session_id)` whenever a session is evicted or dropped."""
+        self._evict_listeners.append(listener)
+
+    def _notify(self, session_ids: List[str]) -> None:
+        # outside self._lock: listeners may call back into the store
+        for sid in session_ids:
+            for listener in self._evict_listeners:
+                try:
+                    listener(sid)
+                except Exception as e:
+                    print(f"[session_memory] Evict listener failed for {sid}: {e}")
+
+    def _use(self, session_id: str, now: float, gone: List[str]) -> Dict[str, SessionWindow]:
+        """Mark `session_id` most recently used; evicted ids are appended to `gone`. Caller holds the lock."""
+        gone.extend(self._sweep(now))
+        entry = self._sessions.pop(session_id, None)
+        windows = entry[1] if entry else {}
+        self._sessions[session_id] = (now, windows)
+        while len(self._sessions) > self.max_sessions:
+            gone.append(self._sessions.popitem(last=False)[0])
+            self._evicted += 1
+        return windows
+
+    def window(self, session_id: str, conversation: str = "default") -> SessionWindow:
+        gone: List[str] = []
+        with self._lock:
+            windows = self._use(session_id, time.time(), gone)
+            win = windows.get(conversation)
+            if win is None:
+                win = windows[conversation] = SessionWindow(self.keep_turns)
+        self._notify(gone)
+        return win
+
+    def touch(self, session_id: str) -> None:
+        gone: List[str] = []
+        with self._lock:
+            self._use(session_id, time.time(), gone)
+        self._notify(gone)
+
+    def current_window(self, conversation_suffix: str = "") -> Optional[SessionWindow]:
+        """Window for the request in progress (see current_session); None outside one."""
+        cur = current_session.get()
+        if cur is None:
+            return None
+        session_id, conversation = cur
+        return self.window(session_id, conversation + conversation_suffix)
+
+    def _sweep(self, now: float) -> List[str]:
+        if now < self._next_sweep or self.idle_seconds <= 0:
+            return []
+        self._next_sweep = now + min(self.idle_seconds / 4, 60.0)
+        cutoff = now - self.idle_seconds
+        gone: List[str] = []
+        while self._sessions:
+            sid, (last_used, _w) = next(iter(self._sessions.items()))
+            if last_used >= cutoff:
+                break
+            del self._sessions[sid]
+            self._evicted += 1
+            gone.append(sid)
+            print(f"[session_memory] Evicted idle session {sid}")
+        return gone
+
+    def drop(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+        self._notify([session_id])
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "conversations": sum(len(w) for _t, w in self._sessions.values()),
+                "evicted": self._evicted,
+            }
@@ -1,6 +1,8 @@
 # fusion_assistant_ReAct/react_agent.py
 from __future__ import annotations
 from typing import Optional, Any, Dict
+import json
+import os
 from pydantic import BaseModel, Field
 
 from langchain.agents import AgentExecutor, create_react_agent
@@ -9,6 +11,9 @@ from langchain_core.tools import Tool
 from langchain.memory import ConversationBufferMemory
 from langchain_core.callbacks import BaseCallbackHandler
 
+from .react_parser import TolerantReActOutputParser
+from .llm.early_stop import EarlyStopLLM
+
 # NEW: pull configured paths so the asset tool can run from backend config
 from .io import paths  # provides ASSET_DIR, DRAFT_CHECKPOINT
 
@@ -61,7 +66,14 @@ def _mk_tool(name: str, description: str, handler, *, return_direct: bool = Fals
     def _run(payload: Dict[str, Any]) -> str:
         print(f"[TOOL {name}] invoked with payload: {payload}")
         if isinstance(payload, str):
-            return _as_text(handler(payload, None, None))
+            # The ReAct parser hands over Action Input as a (JSON) string
+            try:
+                decoded = json.loads(payload)
+            except ValueError:
+                decoded = None
+            if not isinstance(decoded, dict):
+                return _as_text(handler(payload, None, None))
+            payload = decoded
         q = payload.get("query", "")
         ctx = payload.get("context")
         fn = payload.get("filename")
@@ -77,24 +89,16 @@ def _mk_tool(name: str, description: str, handler, *, return_direct: bool = Fals
 
 # --------------------------- STRICT ReAct Prompt ---------------------------
 
+# Layout is fixed from most to least stable (rules, tools, document, history,
+# query) so Ollama can reuse the cached prompt prefix across turns.
 REACT_PROMPT = PromptTemplate.from_template(
 """You are a precise ReAct agent that selects the best tool and responds ONLY in valid ReAct format.
 
-Available tools:
-{tools}
-
-The tool names you can choose from are: {tool_names}.
-
-The conversation input is structured as:
-- "User query:" <user message>
-- "Active document filename:" <filename or 'None'>
-- "Active document text:" <full text or empty>
-
 ### RULES (follow EXACTLY)
 - Do NOT repeat the user's question back as your answer.
 - If you need a tool, output EXACTLY:
   Thought: <brief reason for choosing ONE tool>
-  Action: <ONE name from {tool_names}>
+  Action: <ONE tool name>
   Action Input: {{"query": "<copy the user's question>", "context": "<full doc text or null>", "filename": "<filename or null>"}}
   After you output the line starting with `Action Input: {{...}}`, OUTPUT NOTHING ELSE.
 
@@ -108,6 +112,17 @@ The conversation input is structured as:
 
 - Call at most ONE tool unless absolutely necessary.
 
+Available tools:
+{tools}
+
+The tool names you can choose from are: {tool_names}.
+
+The conversation input is structured as:
+- "Active document filename:" <filename or 'None'>
+- "Active document text:" <full text or empty>
+- "Recent conversation:" <earlier turns, if any>
+- "User query:" <the new user message>
+
 Question: {input}
 {agent_scratchpad}
 """
@@ -125,6 +140,8 @@ def build_react_agent_executor(
 ) -> AgentExecutor:
     """
     Wrap your existing agents behind ReAct tools and return an AgentExecutor.
+    No executor-level memory unless one is passed: conversation history is
+    per session and arrives inside the packed input (see GroupChatSystem).
     """
 
     # --- Adapters: map tool call -> your agent functions ---
@@ -178,22 +195,25 @@ def build_react_agent_executor(
                  _asset_handle, return_direct=True),
     ]
 
-    # Respect stop tokens coming from your model config (you already bind them in your LLM)
+    # Stop only before a hallucinated Observation. "Final Answer:" must not be a stop:
+    # the answer text follows it, and EarlyStopLLM ends the stream once the answer is complete.
     stop_tokens = [
         "\nObservation:",
-        "\nFinal Answer:",
         "Observation:",
-        "Final Answer:",
     ]
+    # Stream and cut generation once Action Input / Final Answer is complete
+    if os.getenv("REACT_EARLY_STOP", "1").lower() not in ("0", "false", "no"):
+        llm = EarlyStopLLM(llm)
     llm_bound = getattr(llm, "bind", lambda **kw: llm)(stop=stop_tokens)
 
-    mem = memory or ConversationBufferMemory(return_messages=True)
-    agent = create_react_agent(llm=llm_bound, tools=tools, prompt=REACT_PROMPT)
+    # Tolerant parser: near-miss outputs are repaired locally instead of re-prompting
+    parser = TolerantReActOutputParser(tool_names=[t.name for t in tools])
+    agent = create_react_agent(llm=llm_bound, tools=tools, prompt=REACT_PROMPT, output_parser=parser)
 
     executor = AgentExecutor(
         agent=agent,
         tools=tools,
-        memory=mem,
+        memory=memory,
         verbose=True,
         handle_parsing_errors=True,
         max_iterations=3,
@@ -0,0 +1,241 @@
+# fusion_assistant_ReAct/react_parser.py
+"""
+Tolerant ReAct output parser.
+
+Small local models often get the ReAct format almost right: a tool name
+with different casing or a typo, single-quoted or truncated JSON in
+`Action Input`, prose after the JSON, or both an action and a made-up
+`Final Answer`. With the stock parser each of those costs another LLM round
+trip (handle_parsing_errors re-prompts). This parser salvages them locally
+and only raises (-> re-prompt) when nothing usable is left.
+
+Action Input is normalised to a compact JSON string, which the tools in
+react_agent.py decode back into {"query", "context", "filename"}.
+"""
+
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Tuple, Union
+import difflib
+import json
+import re
+import threading
+
+from langchain.agents.agent import AgentOutputParser
+from langchain_core.agents import AgentAction, AgentFinish
+from langchain_core.exceptions import OutputParserException
+
+
+FINAL_ANSWER = "Final Answer:"
+_ACTION_RE = re.compile(r"^[ \t]*Action\s*\d*\s*:[ \t]*(.*)$", flags=re.MULTILINE | re.IGNORECASE)
+_INPUT_RE = re.compile(r"Action\s*\d*\s*Input\s*\d*\s*:[ \t]*", flags=re.IGNORECASE)
+_FINAL_RE = re.compile(r"Final\s*Answer\s*:", flags=re.IGNORECASE)
+_SMART = str.maketrans({"“": '"', "”": '"', "‘": "'", "’": "'"})
+
+_MISSING_ACTION = "Invalid Format: Missing 'Action:' after 'Thought:'"
+_MISSING_INPUT = "Invalid Format: Missing 'Action Input:' after 'Action:'"
+_NO_TOOL_ACTION = "No tool was named. If no tool is needed, reply with 'Final Answer:' instead of an Action."
+
+# Action values meaning "no tool"; never mapped to a tool mentioned elsewhere in the output
+_NO_TOOL = {"", "none", "n/a", "na", "no", "no tool", "no_tool", "nothing", "null", "-", "final answer"}
+
+_stats_lock = threading.Lock()
+_STATS: Dict[str, int] = {"clean": 0, "recovered": 0, "reprompt": 0}
+
+
+def parser_stats() -> Dict[str, Any]:
+    with _stats_lock:
+        s = dict(_STATS)
+    malformed = s["recovered"] + s["reprompt"]
+    return {**s, "local_recovery_rate": (s["recovered"] / malformed) if malformed else 0.0}
+
+
+def _count(key: str) -> None:
+    with _stats_lock:
+        _STATS[key] += 1
+
+
+# ----------------------------- JSON repair -----------------------------
+
+def balanced_json_object(text: str) -> Tuple[Optional[str], bool]:
+    """
+    First {...} in text (string-aware). Returns (snippet, complete); an
+    unterminated object is closed so truncated output can still be repaired.
+    """
+    start = text.find("{")
+    if start == -1:
+        return None, False
+    depth, in_str, quote, esc = 0, False, "", False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_str:
+            if esc:
+                esc = False
+            elif ch == "\\":
+                esc = True
+            elif ch == quote:
+                in_str = False
+            continue
+        if ch in "\"'":
+            in_str, quote = True, ch
+        elif ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1], True
+    tail = text[start:].rstrip().rstrip(",")
+    if in_str:
+        tail += quote
+    return tail + "}" * max(depth, 1), False
+
+
+def repair_json_object(raw: str) -> Optional[Dict[str, Any]]:
+    """Best-effort parse of a model-written JSON object; None if hopeless."""
+    snippet, _ = balanced_json_object((raw or "").translate(_SMART))
+    if snippet is None:
+        return None
+    attempts = [snippet]
+    s = re.sub(r",\s*([}\]])", r"\1", snippet)                        # trailing commas
+    s = re.sub(r"(?<=[{,])\s*([A-Za-z_][\w-]*)\s*:", r' "\1":', s)     # unquoted keys
+    s = re.sub(r"\bNone\b", "null", s)
+    s = re.sub(r"\bTrue\b", "true", re.sub(r"\bFalse\b", "false", s))
+    attempts.append(s)
+    if "'" in s:
+        # single-quoted keys/values -> double quotes
+        attempts.append(re.sub(r"'((?:[^'\\]|\\.)*)'", lambda m: json.dumps(m.group(1)), s))
+    for a in attempts:
+        try:
+            obj = json.loads(a, strict=False)
+        except Exception:
+            continue
+        if isinstance(obj, dict):
+            return obj
+    # Last resort: pull "query" out with a regex
+    m = re.search(r"[\"']?query[\"']?\s*:\s*[\"']((?:[^\"'\\]|\\.)*)", snippet)
+    if m:
+        return {"query": m.group(1)}
+    return None
+
+
+# ----------------------------- parser -----------------------------
+
+class TolerantReActOutputParser(AgentOutputParser):
+    """Drop-in for ReActSingleInputOutputParser that repairs near-misses."""
+
+    tool_names: List[str] = []
+    fuzzy_cutoff: float = 0.6
+
+    @property
+    def _type(self) -> str:
+        return "react-tolerant"
+
+    @staticmethod
+    def _clean_name(name: str) -> str:
+        return re.sub(r"[`*\"'\[\]()]", "", name or "").strip().rstrip(".:").strip()
+
+    def _match_tool(self, name: str, text: str) -> Optional[str]:
+        cleaned = self._clean_name(name)
+        if cleaned.lower() in _NO_TOOL and name.strip():
+            return None
+        if cleaned in self.tool_names:
+            return cleaned
+        lowered = {t.lower(): t for t in self.tool_names}
+        key = cleaned.lower().replace(" ", "_").replace("-", "_")
+        if key in lowered:
+            return lowered[key]
+        close = difflib.get_close_matches(key, list(lowered), n=1, cutoff=self.fuzzy_cutoff)
+        if close:
+            return lowered[close[0]]
+        # Tool named somewhere on the Action line, e.g. "use the lcel_query_planner tool",
+        # or by its leading word ("the lcel planner")
+        words = set(re.findall(r"[a-z0-9]+", cleaned.lower()))
+        hits = [t for t in self.tool_names if t.lower() in cleaned.lower() or t.lower().split("_")[0] in words]
+        if len(hits) == 1:
+            return hits[0]
+        if cleaned:
+            return None
+        # Action line missing or blank but exactly one tool mentioned in the output
+        hits = [t for t in self.tool_names if t in text]
+        return hits[0] if len(hits) == 1 else None
+
+    def parse(self, text: str) -> Union[AgentAction, AgentFinish]:
+        fixes: List[str] = []
+        action_m = _ACTION_RE.search(text)
+        input_m = _INPUT_RE.search(text)
+        final_m = _FINAL_RE.search(text)
+
+        if action_m or input_m:
+            tool = self._match_tool(action_m.group(1) if action_m else "", text)
+            if tool is not None and input_m is not None:
+                if not action_m:
+                    fixes.append("missing-action")
+                elif tool != action_m.group(1).strip():
+                    fixes.append(f"tool '{action_m.group(1).strip()}' -> '{tool}'")
+                if final_m and final_m.start() < (action_m or input_m).start():
+                    # The model answered first and then rambled into an action
+                    return self._finish(text, final_m, ["dropped-action"])
+                tool_input, more = self._tool_input(text[input_m.end():])
+                fixes += more
+                if final_m:
+                    fixes.append("dropped-final-answer")
+                return self._done(AgentAction(tool, tool_input, text), fixes)
+
+        if final_m:
+            return self._finish(text, final_m, fixes)
+
+        _count("reprompt")
+        msg = f"Could not parse LLM output: `{text}`"
+        if not action_m:
+            raise OutputParserException(msg, observation=_MISSING_ACTION, llm_output=text, send_to_llm=True)
+        if self._clean_name(action_m.group(1)).lower() in _NO_TOOL:
+            raise OutputParserException(msg, observation=_NO_TOOL_ACTION, llm_output=text, send_to_llm=True)
+        if not input_m:
+            raise OutputParserException(msg, observation=_MISSING_INPUT, llm_output=text, send_to_llm=True)
+        raise OutputParserException(
+            msg,
+            observation=f"Invalid tool name. Choose one of: {', '.join(self.tool_names)}",
+            llm_output=text,
+            send_to_llm=True,
+        )
+
+    def _tool_input(self, raw: str) -> Tuple[str, List[str]]:
+        stripped = raw.strip()
+        first, _, rest = stripped.partition("\n")
+        if "{" not in first:
+            # Plain-text input: first line is the query
+            fixes = ["trailing-text"] if rest.strip() else []
+            return json.dumps({"query": first.strip().strip('"')}, ensure_ascii=False), fixes
+        snippet, complete = balanced_json_object(stripped)
+        fixes: List[str] = []
+        if not complete:
+            fixes.append("closed-json")
+        elif snippet is not None and stripped[stripped.find(snippet) + len(snippet):].strip():
+            fixes.append("trailing-text")
+        try:
+            obj = json.loads(snippet or "")
+            if not isinstance(obj, dict):
+                raise ValueError
+        except Exception:
+            obj = repair_json_object(stripped)
+            if obj is None:
+                obj = {"query": stripped.split("\n", 1)[0]}
+            fixes.append("json-repair")
+        return json.dumps(obj, ensure_ascii=False), fixes
+
+    def _finish(self, text: str, final_m, fixes: List[str]) -> AgentFinish:
+        out = text[final_m.end():]
+        nxt = re.search(r"\n\s*(Thought|Action|Observation|Question)\s*:", out)
+        if nxt:
+            out = out[:nxt.start()]
+            fixes.append("trailing-text")
+        return self._done(AgentFinish({"output": out.strip()}, text), fixes)
+
+    def _done(self, result, fixes: List[str]):
+        if fixes:
+            _count("recovered")
+            s = parser_stats()
+            print(f"[react-parser] Recovered locally ({', '.join(fixes)}) | "
+                  f"recovered {s['recovered']}, re-prompted {s['reprompt']}")
+        else:
+            _count("clean")
+        return result
@@ -0,0 +1,73 @@
+# fusion_assistant_ReAct/retrieval/classifier.py
+"""
+Tiny embedding classifiers for cheap, local decisions.
+
+Uses the same MiniLM embeddings as the vector stores (embeddings_oss) so no
+extra model is loaded. Intended for small labeled sets (tens to hundreds of
+examples) where nearest-centroid is as good as anything heavier.
+"""
+
+from __future__ import annotations
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+import threading
+
+import numpy as np
+
+
+def _normalize(m: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(m, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return m / norms
+
+
+class NearestCentroidClassifier:
+    """
+    Cosine nearest-centroid over sentence embeddings.
+
+    predict() returns (label, margin) where margin is the cosine gap between the
+    best and second-best centroid. Callers treat a small margin as "not sure".
+    """
+
+    def __init__(self, embeddings: Any):
+        self.embeddings = embeddings
+        self.labels: List[Hashable] = []
+        self._centroids: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_fitted(self) -> bool:
+        return self._centroids is not None
+
+    def fit(self, texts: Sequence[str], labels: Sequence[Hashable]) -> "NearestCentroidClassifier":
+        if len(texts) != len(labels):
+            raise ValueError("texts and labels must have the same length")
+        if not texts:
+            raise ValueError("cannot fit on an empty example set")
+
+        vecs = _normalize(np.asarray(self.embeddings.embed_documents(list(texts)), dtype=np.float32))
+        by_label: Dict[Hashable, List[int]] = {}
+        for i, lbl in enumerate(labels):
+            by_label.setdefault(lbl, []).append(i)
+
+        order = list(by_label.keys())
+        centroids = np.stack([vecs[by_label[lbl]].mean(axis=0) for lbl in order])
+        with self._lock:
+            self.labels = order
+            self._centroids = _normalize(centroids)
+        return self
+
+    def scores(self, text: str) -> Dict[Hashable, float]:
+        if self._centroids is None:
+            raise RuntimeError("classifier is not fitted")
+        q = _normalize(np.asarray(self.embeddings.embed_query(text or ""), dtype=np.float32))
+        sims = self._centroids @ q
+        return {lbl: float(s) for lbl, s in zip(self.labels, sims)}
+
+    def predict(self, text: str) -> Tuple[Optional[Hashable], float]:
+        sc = self.scores(text)
+        if not sc:
+            return None, 0.0
+        ranked = sorted(sc.items(), key=lambda kv: kv[1], reverse=True)
+        if len(ranked) == 1:
+            return ranked[0][0], 1.0
+        return ranked[0][0], ranked[0][1] - ranked[1][1]
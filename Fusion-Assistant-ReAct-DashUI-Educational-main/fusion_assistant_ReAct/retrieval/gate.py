@@ -0,0 +1,140 @@
+# fusion_assistant_ReAct/retrieval/gate.py
+"""
+Local retrieval gate for the LQEL agent.
+
+Answers "should we pull saved LQEL examples for this query?" with a
+nearest-centroid classifier over MiniLM query embeddings, so the LLM gate
+only runs when the local decision is not confident.
+
+Training data:
+  - built-in seed examples (below)
+  - labeled rows from query_DS.xlsx (or any sheet with the same columns)
+"""
+
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Tuple
+import os
+import threading
+
+from .classifier import NearestCentroidClassifier
+from ..io.paths import QUERY_DS_XLSX
+from ..io.query_ds import read_labeled_queries
+
+
+# (query, retrieve?) — YES for new/underspecified asks, NO for edits of an existing query
+_SEED_EXAMPLES: List[Tuple[str, bool]] = [
+    ("I need an lqel query for multiple login attempts on various assets", True),
+    ("give me an example query for failed authentication grouped by user", True),
+    ("what is the best way to query firewall denies by country", True),
+    ("write a query for all admin actions in active directory", True),
+    ("show me queries for dns lookups to suspicious domains", True),
+    ("how do I find outbound traffic over 50MB", True),
+    ("build a query for virus alerts on endpoints", True),
+    ("I need a query for sso logins from outside the US", True),
+    ("change source asset to fhahn.prod and destination user to service.account1", False),
+    ("replace the destination address with 10.10.11.7 in the previous query", False),
+    ("add limit(10) to that query", False),
+    ("modify where(result = FAILED) to use ISTARTS-WITH instead", False),
+    ("update the groupby in the last query to destination_user", False),
+    ("set the destination account to servGrp in the query above", False),
+    ("remove the calculate(count) from my query", False),
+    ("make the source_user match case-insensitive with nocase", False),
+]
+
+
+def _truthy(v: Any) -> Optional[bool]:
+    s = str(v).strip().lower()
+    if s in ("1", "y", "yes", "true", "retrieve"):
+        return True
+    if s in ("0", "n", "no", "false", "direct"):
+        return False
+    return None
+
+
+def load_gate_examples(path: str = QUERY_DS_XLSX) -> List[Tuple[str, bool]]:
+    """
+    Read labeled gate examples from an Excel sheet.
+
+    Uses a 'Retrieve' column when present. Otherwise derives labels from the
+    query_DS layout (Query / Expected Tool Call / Expected Result): LQEL rows
+    whose expected result updates a previous query are NO, the rest YES.
+    """
+    out: List[Tuple[str, bool]] = []
+    for row in read_labeled_queries(path):
+        q = row["query"]
+        if "retrieve" in row:
+            lbl = _truthy(row.get("retrieve"))
+            if lbl is not None:
+                out.append((q, lbl))
+            continue
+        tool = str(row.get("expected tool call") or "").lower()
+        if "lqel" not in tool and "lcel" not in tool:
+            continue
+        result = str(row.get("expected result") or "").lower()
+        out.append((q, "update previous query" not in result))
+    return out
+
+
+class LocalRetrievalGate:
+    """
+    decide(query) -> True/False when confident, None when the caller should
+    fall back to the LLM gate.
+    """
+
+    def __init__(
+        self,
+        embeddings: Any,
+        *,
+        examples_path: Optional[str] = QUERY_DS_XLSX,
+        extra_examples: Optional[List[Tuple[str, bool]]] = None,
+        min_margin: Optional[float] = None,
+    ):
+        self.embeddings = embeddings
+        self.examples_path = examples_path
+        self.extra_examples = list(extra_examples or [])
+        self.min_margin = (
+            min_margin if min_margin is not None
+            else float(os.getenv("LCEL_GATE_MIN_MARGIN", "0.04"))
+        )
+        self._clf: Optional[NearestCentroidClassifier] = None
+        self._clf_failed = False
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {"local": 0, "fallback": 0}
+
+    def _ensure_trained(self) -> Optional[NearestCentroidClassifier]:
+        """Train once; a failed attempt is remembered so later calls fall back without retrying."""
+        if self._clf is not None or self._clf_failed:
+            return self._clf
+        with self._lock:
+            if self._clf is None and not self._clf_failed:
+                try:
+                    examples = _SEED_EXAMPLES + load_gate_examples(self.examples_path) + self.extra_examples
+                    clf = NearestCentroidClassifier(self.embeddings)
+                    clf.fit([q for q, _ in examples], [lbl for _, lbl in examples])
+                    print(f"[gate] Trained local retrieval gate on {len(examples)} examples.")
+                    self._clf = clf
+                except Exception as e:
+                    print(f"[gate] Local gate unavailable: {e}")
+                    self._clf_failed = True
+        return self._clf
+
+    def decide(self, query: str) -> Optional[bool]:
+        clf = self._ensure_trained()
+        if clf is None:
+            self._stats["fallback"] += 1
+            return None
+        try:
+            label, margin = clf.predict(query)
+        except Exception as e:
+            print(f"[gate] Local gate prediction failed: {e}")
+            self._stats["fallback"] += 1
+            return None
+        if label is None or margin < self.min_margin:
+            self._stats["fallback"] += 1
+            return None
+        self._stats["local"] += 1
+        return bool(label)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self._stats["local"] + self._stats["fallback"]
+        return {**self._stats, "local_rate": (self._stats["local"] / total) if total else 0.0}
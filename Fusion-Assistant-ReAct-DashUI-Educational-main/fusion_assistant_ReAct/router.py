@@ -0,0 +1,232 @@
+# fusion_assistant_ReAct/router.py
+"""
+Deterministic fast-path router in front of the ReAct AgentExecutor.
+
+Most messages map unambiguously to one tool (LQEL tokens -> query planner,
+JSON asset context -> asset drafting). For those we call the tool directly
+and skip the ReAct LLM round trip. Anything ambiguous falls through to the
+wrapped executor unchanged.
+
+Decision order:
+  1) JSON asset record(s) in the active document -> asset_discovery_ops,
+     unless the message itself matches the LQEL rule
+  2) keyword rules (exactly one tool matched)    -> that tool; the asset
+     rule needs an asset noun AND a drafting verb, since a match starts a
+     full batch run (one generic word like "owner" is not enough)
+  3) embedding classifier over tool descriptions + labeled examples,
+     accepted only when its margin clears `min_margin`
+  4) otherwise -> ReAct
+"""
+
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Tuple
+import json
+import os
+import re
+import threading
+
+from langchain_core.agents import AgentAction
+
+from .retrieval.classifier import NearestCentroidClassifier
+from .io.paths import QUERY_DS_XLSX
+from .io.query_ds import read_labeled_queries
+
+
+LCEL_TOOL = "lcel_query_planner"
+ASSET_TOOL = "asset_discovery_ops"
+
+_LQEL_RULE = re.compile(
+    r"\b(lqel|leql|lcel)\b|where\(|groupby\(|calculate\(|timeslice\(|istarts-with|icontains|nocase\(",
+    flags=re.IGNORECASE,
+)
+_ASSET_NOUN_RULE = re.compile(
+    r"\b(assets?|asset discovery|inventory|hosts?|endpoints?|owners?)\b",
+    flags=re.IGNORECASE,
+)
+_ASSET_VERB_RULE = re.compile(
+    r"\b(draft(s|ed|ing)?|e-?mails?|notify|notifications?)\b",
+    flags=re.IGNORECASE,
+)
+_ASSET_KEYS = ("hostname", "ip", "mac", "asset_id")
+
+# Extra utterances per tool so the centroids are not built from one description alone
+_SEED_UTTERANCES: Dict[str, List[str]] = {
+    LCEL_TOOL: [
+        "I need an lqel query for multiple login attempts on various assets",
+        "write a log search query for failed authentications grouped by user",
+        "change the destination user in the query to service.account1",
+        "query for firewall denies by country",
+    ],
+    ASSET_TOOL: [
+        "I need to report on the documents for asset discovery",
+        "draft emails to the owners of offline assets",
+        "run the asset drafting job from the configured inventory",
+        "notify owners about stale endpoint agents",
+    ],
+}
+
+# query_DS 'Expected Tool Call' values -> tool names
+_SHEET_TOOL_NAMES = {
+    "lqel query agent": LCEL_TOOL,
+    "asset discovery agent": ASSET_TOOL,
+}
+
+
+def _is_asset_json(context: Optional[str]) -> bool:
+    if not context or not context.strip().startswith(("{", "[")):
+        return False
+    try:
+        data = json.loads(context)
+    except Exception:
+        return False
+    if isinstance(data, list):
+        data = data[0] if data and isinstance(data[0], dict) else None
+    return isinstance(data, dict) and any(k in data for k in _ASSET_KEYS)
+
+
+def _asset_rule(query: str) -> bool:
+    return bool(_ASSET_NOUN_RULE.search(query) and _ASSET_VERB_RULE.search(query))
+
+
+class FastPathRouter:
+    """
+    Wraps an AgentExecutor. invoke() accepts the executor's {"input": ...}
+    plus optional raw fields ("query", "context", "filename") that the
+    router uses for its decision; only "input" is forwarded on fallback.
+    """
+
+    def __init__(
+        self,
+        executor: Any,
+        *,
+        embeddings: Any = None,
+        min_margin: Optional[float] = None,
+        examples_path: Optional[str] = QUERY_DS_XLSX,
+        enabled: Optional[bool] = None,
+    ):
+        self.executor = executor
+        self.tools = {t.name: t for t in getattr(executor, "tools", [])}
+        self.embeddings = embeddings
+        self.examples_path = examples_path
+        self.min_margin = (
+            min_margin if min_margin is not None
+            else float(os.getenv("ROUTER_MIN_MARGIN", "0.06"))
+        )
+        if enabled is None:
+            enabled = os.getenv("ROUTER_FASTPATH", "1").lower() not in ("0", "false", "no")
+        self.enabled = enabled
+        self._clf: Optional[NearestCentroidClassifier] = None
+        self._clf_failed = False
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {"fast_path": 0, "react": 0}
+
+    # ---- executor passthroughs (callers treat the router as the executor) ----
+    def __getattr__(self, name: str):
+        if name == "executor":
+            raise AttributeError(name)
+        return getattr(self.executor, name)
+
+    # ---------------------- classifier ----------------------
+    def _ensure_classifier(self) -> Optional[NearestCentroidClassifier]:
+        if self._clf is not None or self._clf_failed or self.embeddings is None:
+            return self._clf
+        with self._lock:
+            if self._clf is None and not self._clf_failed:
+                texts: List[str] = []
+                labels: List[str] = []
+                for name, tool in self.tools.items():
+                    texts.append(tool.description)
+                    labels.append(name)
+                    for u in _SEED_UTTERANCES.get(name, []):
+                        texts.append(u)
+                        labels.append(name)
+                for row in read_labeled_queries(self.examples_path):
+                    name = _SHEET_TOOL_NAMES.get(str(row.get("expected tool call") or "").strip().lower())
+                    if name in self.tools:
+                        texts.append(row["query"])
+                        labels.append(name)
+                try:
+                    self._clf = NearestCentroidClassifier(self.embeddings).fit(texts, labels)
+                    print(f"[router] Trained tool classifier on {len(texts)} examples.")
+                except Exception as e:
+                    print(f"[router] Tool classifier unavailable: {e}")
+                    self._clf_failed = True
+        return self._clf
+
+    # ---------------------- routing ----------------------
+    def route(self, query: str, context: Optional[str] = None) -> Tuple[Optional[str], str]:
+        """Return (tool_name, reason); tool_name is None when ReAct should decide."""
+        q = query or ""
+        lqel = LCEL_TOOL in self.tools and bool(_LQEL_RULE.search(q))
+        # An explicit LQEL request wins over an open asset document
+        if not lqel and ASSET_TOOL in self.tools and _is_asset_json(context):
+            return ASSET_TOOL, "json-asset-context"
+
+        hits = []
+        if lqel:
+            hits.append(LCEL_TOOL)
+        if ASSET_TOOL in self.tools and _asset_rule(q):
+            hits.append(ASSET_TOOL)
+        if len(hits) == 1:
+            return hits[0], "rule"
+
+        clf = self._ensure_classifier()
+        if clf is None:
+            return None, "no-classifier"
+        try:
+            name, margin = clf.predict(q)
+        except Exception as e:
+            return None, f"classifier-error: {e}"
+        if name is not None and margin >= self.min_margin:
+            return name, f"embedding margin={margin:.3f}"
+        return None, f"ambiguous margin={margin:.3f}"
+
+    def invoke(self, inputs: Dict[str, Any], *args, **kwargs) -> Dict[str, Any]:
+        packed = inputs["input"]
+        query = inputs.get("query", packed)
+        context = inputs.get("context")
+        filename = inputs.get("filename")
+
+        tool_name, reason = (None, "disabled")
+        if self.enabled:
+            tool_name, reason = self.route(query, context)
+
+        if tool_name is None:
+            self._stats["react"] += 1
+            print(f"[router] ReAct fallback ({reason}) | {self._hit_rate_str()}")
+            return self.executor.invoke({"input": packed}, *args, **kwargs)
+
+        self._stats["fast_path"] += 1
+        print(f"[router] Fast path -> {tool_name} ({reason}) | {self._hit_rate_str()}")
+        payload = {"query": query, "context": context or None, "filename": filename or None}
+        # Same entry point (and tool callbacks) the executor uses for an Action Input
+        observation = self.tools[tool_name].run(
+            json.dumps(payload, ensure_ascii=False), callbacks=self._callbacks(*args, **kwargs)
+        )
+
+        mem = getattr(self.executor, "memory", None)
+        if mem is not None:
+            try:
+                mem.save_context({"input": packed}, {"output": observation})
+            except Exception:
+                pass
+
+        action = AgentAction(tool=tool_name, tool_input=payload, log=f"[fast-path] {reason}")
+        return {"input": packed, "output": observation, "intermediate_steps": [(action, observation)]}
+
+    def _callbacks(self, config: Optional[Dict[str, Any]] = None, **kwargs) -> List[Any]:
+        """Executor-level handlers plus any passed in the invoke() config."""
+        callbacks = list(getattr(self.executor, "callbacks", None) or [])
+        extra = (config or kwargs.get("config") or {}).get("callbacks")
+        if isinstance(extra, list):
+            callbacks += [cb for cb in extra if cb not in callbacks]
+        return callbacks
+
+    # ---------------------- reporting ----------------------
+    def stats(self) -> Dict[str, Any]:
+        total = self._stats["fast_path"] + self._stats["react"]
+        return {**self._stats, "hit_rate": (self._stats["fast_path"] / total) if total else 0.0}
+
+    def _hit_rate_str(self) -> str:
+        s = self.stats()
+        return f"hit rate {s['fast_path']}/{s['fast_path'] + s['react']} ({s['hit_rate']:.0%})"
@@ -0,0 +1,98 @@
+# fusion_assistant_ReAct/telemetry/prompt_eval.py
+"""
+Per-call prompt-eval accounting for Ollama models.
+
+Ollama only evaluates the part of a prompt that is not already in its KV
+cache, so `prompt_eval_count` dropping on a follow-up question about the
+same document means the shared prefix was reused.
+
+Ollama reports those counts only in the final chunk of a response. A call
+that EarlyStopLLM cuts short (REACT_EARLY_STOP) never receives it, so it is
+logged as a separate "early_stopped" record with the prompt and output sizes
+and prompt_eval_count None; set REACT_EARLY_STOP=0 to measure prefix reuse
+on ReAct calls at the cost of the trailing tokens.
+"""
+
+from __future__ import annotations
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+import time
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+
+_REGISTRY: Deque[Dict[str, Any]] = deque(maxlen=500)
+
+
+def push(record: Dict[str, Any]) -> None:
+    _REGISTRY.appendleft(record)
+
+
+def get_recent(limit: int = 20) -> List[Dict[str, Any]]:
+    return list(list(_REGISTRY)[:limit])
+
+
+class PromptEvalLogger(BaseCallbackHandler):
+    """Logs prompt_eval_count / eval_count for every chat-model call of one profile."""
+
+    def __init__(self, label: str = "default", verbose: bool = True):
+        self.label = label
+        self.verbose = verbose
+        self._prompt_chars: Dict[Any, int] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id=None, **kwargs):
+        try:
+            self._prompt_chars[run_id] = sum(len(str(m.content)) for batch in messages for m in batch)
+        except Exception:
+            pass
+
+    def on_llm_end(self, response, *, run_id=None, **kwargs):
+        chars = self._prompt_chars.pop(run_id, None)
+        try:
+            info: Optional[Dict[str, Any]] = response.generations[0][0].generation_info or {}
+        except Exception:
+            return
+        if "prompt_eval_count" not in info:
+            return
+        rec = {
+            "ts": time.time(),
+            "profile": self.label,
+            "model": info.get("model"),
+            "prompt_chars": chars,
+            "prompt_eval_count": info.get("prompt_eval_count"),
+            "eval_count": info.get("eval_count"),
+            "prompt_eval_ms": round((info.get("prompt_eval_duration") or 0) / 1e6, 1),
+            "total_ms": round((info.get("total_duration") or 0) / 1e6, 1),
+        }
+        push(rec)
+        if self.verbose:
+            print(
+                f"[prompt-eval] {self.label}: prompt_eval_count={rec['prompt_eval_count']} "
+                f"(prompt {chars} chars) eval_count={rec['eval_count']} "
+                f"prompt_eval={rec['prompt_eval_ms']}ms total={rec['total_ms']}ms"
+            )
+
+    def on_llm_error(self, error, *, run_id=None, **kwargs):
+        chars = self._prompt_chars.pop(run_id, None)
+        if not isinstance(error, GeneratorExit):
+            return
+        # stream closed by the consumer (early stop): no Ollama counts, log the cut instead
+        try:
+            out_chars = sum(len(g.text) for batch in kwargs["response"].generations for g in batch)
+        except Exception:
+            out_chars = None
+        rec = {
+            "ts": time.time(),
+            "profile": self.label,
+            "early_stopped": True,
+            "prompt_chars": chars,
+            "output_chars": out_chars,
+            "prompt_eval_count": None,
+            "eval_count": None,
+        }
+        push(rec)
+        if self.verbose:
+            print(
+                f"[prompt-eval] {self.label}: early-stopped after {out_chars} chars "
+                f"(prompt {chars} chars; Ollama counts are not reported for aborted streams)"
+            )
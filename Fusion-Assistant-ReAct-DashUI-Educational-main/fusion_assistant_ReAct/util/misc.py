@@ -4,7 +4,7 @@ Keep this file dependency-light so it can be imported anywhere.
 """
 
 from __future__ import annotations
-from typing import Iterable, Iterator, List, Sequence, Tuple, TypeVar
+from typing import Any, Iterable, Iterator, List, Sequence, Tuple, TypeVar
 from datetime import datetime
 
 T = TypeVar("T")
@@ -81,3 +81,47 @@ def normalize_chain_result(result) -> str:
         except Exception:
             return str(result)
     return str(result)
+
+
+def scalar_value(v: Any) -> Any:
+    """
+    Hashable stand-in for container values, shared by asset triage and the
+    change-detection snapshot so both agree on asset identity:
+    lists (e.g. "ip": [...]) -> sorted "a, b"; empty -> None; dicts -> sorted pairs.
+    """
+    if isinstance(v, (list, tuple, set)):
+        items = sorted(str(x).strip() for x in v if x is not None and str(x).strip())
+        return ", ".join(items) or None
+    if isinstance(v, dict):
+        return str(sorted((str(k), str(x)) for k, x in v.items())) if v else None
+    return v
+
+
+def canonical_json(obj) -> str:
+    """Key-sorted, whitespace-free JSON; equal records always serialize identically."""
+    import json
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def content_id(obj, digest_size: int = 10) -> str:
+    """
+    Stable hex digest (BLAKE2b) of an object's canonical JSON.
+    Unlike hash(), it is identical across processes and PYTHONHASHSEED values.
+    """
+    import hashlib
+    return hashlib.blake2b(canonical_json(obj).encode("utf-8"), digest_size=digest_size).hexdigest()
+
+
+_tiktoken_ok = True
+
+
+def approx_tokens(text: str) -> int:
+    """tiktoken count when available, else ~4 chars per token."""
+    global _tiktoken_ok
+    if _tiktoken_ok:
+        try:
+            from .token import count_tokens
+            return count_tokens(text)
+        except Exception:
+            _tiktoken_ok = False
+    return len(text or "") // 4
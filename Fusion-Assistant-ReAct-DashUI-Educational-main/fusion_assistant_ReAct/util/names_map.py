@@ -1,7 +1,9 @@
 import pandas as pd
 
+from ..io.excel_cache import read_excel_cached
+
 def load_names_from_excel(name_excel_path: str) -> list[str]:
-    df = pd.read_excel(name_excel_path, usecols=[0], engine='openpyxl')
+    df = read_excel_cached(name_excel_path, usecols=[0], engine='openpyxl')
     return df.iloc[:,0].dropna().astype(str).tolist()
 
 def split_name_variants(names: list[str]) -> dict:
@@ -0,0 +1,6 @@
+# tests/conftest.py
+import os
+import sys
+
+# run from anywhere: make the package root importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
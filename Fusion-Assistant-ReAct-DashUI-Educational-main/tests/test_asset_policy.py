@@ -0,0 +1,33 @@
+# tests/test_asset_policy.py
+from fusion_assistant_ReAct.agents.asset_digest import rules_cover
+from fusion_assistant_ReAct.agents.asset_policy import AssetPolicy
+
+SAMPLE = {
+    "hostname": "prod2.example.com", "ip": ["10.10.1.7"], "mac": "00:0D:AA:55:44:DD", "os": "Windows Server 2019",
+    "status": "offline", "last_seen": "2025-08-13T14:18:49+00:00", "resource_owner": "Alice Johnson",
+    "owner": "IT Operations", "secondary_owner": "Security Team",
+}
+
+
+def test_descriptive_extra_fields_stay_on_template_path():
+    policy = AssetPolicy(template_classes=["healthy", "offline", "stale"])
+    assert policy.classify(SAMPLE)[0] == "offline"
+    assert not policy.needs_llm(SAMPLE)
+    assert rules_cover([SAMPLE, {**SAMPLE, "tags": ["prod"]}])
+
+
+def test_risk_fields_need_llm():
+    policy = AssetPolicy()
+    cls, reasons = policy.classify({**SAMPLE, "vulnerabilities": ["CVE-2024-1234"]})
+    assert cls == "anomalous" and "vulnerabilities" in reasons[0]
+    assert not rules_cover([SAMPLE, {**SAMPLE, "notes": "odd traffic"}])
+
+
+def test_strict_rule_fields(monkeypatch):
+    monkeypatch.setenv("ASSET_DIGEST_RULE_FIELDS", "hostname,ip,mac,os,status,last_seen,owner,resource_owner")
+    assert not rules_cover([SAMPLE])  # secondary_owner is outside the allow-list
+
+
+def test_list_ip_rendered_joined():
+    text = AssetPolicy().render_findings({**SAMPLE, "ip": ["10.10.1.7", "10.10.1.8"]})
+    assert text.startswith("prod2.example.com (10.10.1.7, 10.10.1.8) is reporting")
@@ -0,0 +1,40 @@
+# tests/test_asset_record.py
+import json
+
+from fusion_assistant_ReAct.agents.asset_record import AssetRecord, resolve_record
+
+REC = {"hostname": "web1", "ip": ["10.0.0.5"], "status": "online", "tags": ["prod"]}
+
+
+def _write(path, recs):
+    path.write_text("".join(json.dumps(r) + "\n" for r in recs), encoding="utf-8")
+
+
+def test_summary_ref_resolves_from_another_cwd(tmp_path, monkeypatch):
+    inv = tmp_path / "inv.jsonl"
+    _write(inv, [{"hostname": "other"}, REC])
+    monkeypatch.chdir(tmp_path)
+    summary = AssetRecord.from_dict(REC, source=("inv.jsonl", 2)).summary()
+    assert summary["ref"] == f"{inv.resolve()}:2"
+    monkeypatch.chdir("/")
+    assert resolve_record(summary) == REC
+
+
+def test_edited_input_line_does_not_resolve(tmp_path):
+    inv = tmp_path / "inv.jsonl"
+    _write(inv, [REC])
+    summary = AssetRecord.from_dict(REC, source=(str(inv), 1)).summary()
+    _write(inv, [{**REC, "hostname": "db7"}])
+    assert resolve_record(summary) is None
+    assert resolve_record(summary["ref"]) == {**REC, "hostname": "db7"}
+
+
+def test_refs_resolve_after_the_file_is_rewritten(tmp_path):
+    inv = tmp_path / "inv.jsonl"
+    recs = [{"hostname": f"h{i}", "note": "é" * i} for i in range(50)]
+    _write(inv, recs)
+    assert resolve_record(f"{inv}:50") == recs[49]
+    assert resolve_record(f"{inv}:1") == recs[0]
+    assert resolve_record(f"{inv}:51") is None
+    _write(inv, [{"hostname": "new"}] + recs)
+    assert resolve_record(f"{inv}:2") == recs[0]
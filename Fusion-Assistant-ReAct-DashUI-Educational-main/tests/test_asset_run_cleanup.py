@@ -0,0 +1,39 @@
+# tests/test_asset_run_cleanup.py
+from pathlib import Path
+
+import pytest
+
+from fusion_assistant_ReAct.agents import asset_agent as aa
+
+SAMPLE = str(Path(__file__).resolve().parent.parent / "assets_test" / "sample_assets.jsonl")
+
+
+class _Chain:
+    def invoke(self, x):
+        return {"answer": "findings"}
+
+
+def test_run_stores_are_closed_when_drafting_fails(tmp_path, monkeypatch):
+    closed = []
+
+    def tracked(cls, path):
+        class Tracked(cls):
+            def close(self):
+                closed.append(cls.__name__)
+                super().close()
+        return lambda *a, **k: Tracked(str(tmp_path / path))
+
+    monkeypatch.setattr(aa, "BodyStore", tracked(aa.BodyStore, "bodies.sqlite"))
+    monkeypatch.setattr(aa, "DraftIndex", tracked(aa.DraftIndex, "index.sqlite"))
+    monkeypatch.setattr(aa, "AssetSnapshotStore", tracked(aa.AssetSnapshotStore, "snap.sqlite"))
+    monkeypatch.setattr(aa, "CheckpointStore", tracked(aa.CheckpointStore, "ckpt.sqlite"))
+    monkeypatch.setenv("ASSET_PROGRESS_EVERY_S", "100")
+
+    agent = aa.Asset_Discovery_Agent(_Chain())
+    monkeypatch.setattr(agent, "handle_query", lambda *a, **k: (_ for _ in ()).throw(RuntimeError("llm down")))
+    with pytest.raises(RuntimeError):
+        agent.run_from_config(
+            asset_dir=SAMPLE, checkpoint_path=str(tmp_path / "ckpt.jsonl"), run_id="R",
+            run_file=str(tmp_path / "R.drafts.jsonl"), workers=1,
+        )
+    assert sorted(closed) == ["AssetSnapshotStore", "BodyStore", "CheckpointStore", "DraftIndex"]
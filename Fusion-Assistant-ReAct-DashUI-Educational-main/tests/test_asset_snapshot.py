@@ -0,0 +1,26 @@
+# tests/test_asset_snapshot.py
+import pandas as pd
+
+from fusion_assistant_ReAct.agents.asset_triage import TRIAGE_COLUMNS, triage
+from fusion_assistant_ReAct.persistence.asset_snapshot import asset_key
+
+
+def test_list_and_empty_ip_fields():
+    assert asset_key({"ip": []}) is None
+    assert asset_key({"hostname": [], "ip": ["10.0.0.9"]}) == "ip:10.0.0.9"
+    assert asset_key({"ip": ["10.0.0.2", "10.0.0.1"]}) == asset_key({"ip": ["10.0.0.1", "10.0.0.2"]})
+    assert asset_key({"ip": [], "mac": "00-0D-AA"}) == "mac:00:0d:aa"
+
+
+def test_snapshot_keys_agree_with_triage_duplicates():
+    recs = [
+        {"ip": ["10.0.0.2", "10.0.0.1"]},
+        {"ip": ["10.0.0.1", "10.0.0.2"]},
+        {"ip": []},
+        {"ip": [], "hostname": "web2"},
+    ]
+    df = pd.DataFrame([{c: r.get(c) for c in TRIAGE_COLUMNS} for r in recs])
+    dup = triage(df)["duplicate"].tolist()
+    keys = [asset_key(r) for r in recs]
+    assert dup == [True, False, False, False]
+    assert keys[0] == keys[1] and keys[2] is None and keys[3] == "hostname:web2"
@@ -0,0 +1,50 @@
+# tests/test_asset_triage.py
+import json
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from fusion_assistant_ReAct.agents.asset_triage import load_inventory, run_triage, triage
+
+NOW = datetime(2026, 1, 10, tzinfo=timezone.utc)
+
+
+def _frame(records):
+    return pd.DataFrame(records, columns=["asset_id", "mac", "hostname", "ip", "status", "last_seen", "owner", "resource_owner"])
+
+
+def test_list_ip_is_key_when_hostname_missing():
+    df = _frame([
+        {"ip": ["10.0.0.2", "10.0.0.1"], "status": "online", "last_seen": "2026-01-09T00:00:00Z", "owner": "a"},
+        {"ip": ["10.0.0.1", "10.0.0.2"], "status": "online", "last_seen": "2026-01-09T00:00:00Z", "owner": "a"},
+        {"ip": ["10.0.0.3"], "status": "online", "last_seen": "2026-01-09T00:00:00Z", "owner": "a"},
+        {"ip": [], "status": "online", "last_seen": "2026-01-09T00:00:00Z", "owner": "a"},
+    ])
+    flags = triage(df, now=NOW, stale_days=30)
+    # same address set in a different order is the same asset; the last one is kept
+    assert flags["duplicate"].tolist() == [True, False, False, False]
+
+
+def test_non_string_status_and_owner():
+    df = _frame([
+        {"hostname": "a", "status": ["online"], "owner": ["team"], "last_seen": "2026-01-09T00:00:00Z"},
+        {"hostname": "b", "status": 1, "owner": {"name": "x"}, "last_seen": "2026-01-09T00:00:00Z"},
+        {"hostname": "c", "status": None, "owner": [], "last_seen": None},
+    ])
+    flags = triage(df, now=NOW, stale_days=30)
+    assert flags["offline"].tolist() == [False, True, True]
+    assert flags["owner_missing"].tolist() == [False, False, True]
+
+
+def test_run_triage_on_sample_style_records(tmp_path):
+    path = tmp_path / "inv.jsonl"
+    rows = [
+        {"ip": ["10.10.1.7"], "status": "offline", "last_seen": "2025-08-13T14:18:49+00:00", "owner": "IT"},
+        {"ip": ["10.10.1.7"], "status": "offline", "last_seen": "2025-08-13T14:18:49+00:00", "owner": "IT"},
+        {"hostname": "db1", "ip": ["10.10.1.15"], "status": "online", "last_seen": "2025-08-13T14:18:49+00:00"},
+    ]
+    path.write_text("".join(json.dumps(r) + "\n" for r in rows), encoding="utf-8")
+    flags, summary, skip = run_triage([path])
+    assert summary["duplicate"] == 1
+    assert skip == {(str(path), 1)}
+    assert len(load_inventory([path])) == 3
@@ -0,0 +1,35 @@
+# tests/test_body_store.py
+from fusion_assistant_ReAct.persistence import body_store
+from fusion_assistant_ReAct.persistence.body_store import BodyStore, expand
+from email_reporting.smtp_delivery import DeliveryLog, deliver_approved
+
+DRAFT = {
+    "id": "d1", "run_id": "R", "approved": True, "to": ["owner@example.com"], "subject": "Asset Review: web01",
+    "record": {"hostname": "web01.corp", "ip": "10.0.0.1", "owner": "alice"},
+    "body": "Dear alice,\n\nweb01.corp (10.0.0.1) is offline.\n\nThanks",
+}
+
+
+def _use_store(monkeypatch, path):
+    monkeypatch.setitem(body_store._open_stores, body_store.DRAFT_BODY_STORE_DB, BodyStore(str(path)))
+
+
+def test_pack_expand_roundtrip(tmp_path, monkeypatch):
+    _use_store(monkeypatch, tmp_path / "bodies.sqlite")
+    packed = body_store._open_stores[body_store.DRAFT_BODY_STORE_DB].pack(DRAFT)
+    assert "body" not in packed and packed["body_ref"]
+    out = expand(packed)
+    assert out["body"] == DRAFT["body"] and not out.get("body_missing")
+
+
+def test_missing_body_is_flagged_and_not_sent(tmp_path, monkeypatch):
+    packed = BodyStore(str(tmp_path / "elsewhere.sqlite")).pack(DRAFT)
+    _use_store(monkeypatch, tmp_path / "empty.sqlite")  # store the reader sees lacks the sections
+    out = expand(packed)
+    assert out["body_missing"] is True and out["body"] == ""
+
+    sent = []
+    log = DeliveryLog(str(tmp_path / "delivery.sqlite"))
+    stats = deliver_approved([out], log=log, send_fn=lambda msg, s, r: sent.append(msg))
+    assert sent == []
+    assert stats["failed"] == 1 and log.status("d1") == "failed"
@@ -0,0 +1,46 @@
+# tests/test_checkpoint_store.py
+import json
+
+from fusion_assistant_ReAct.persistence.checkpoint_store import CheckpointStore, db_path_for
+
+
+def _log(path, ids):
+    with open(path, "a", encoding="utf-8") as fh:
+        for i in ids:
+            fh.write(json.dumps({"id": i, "status": "drafted", "run_id": "r1"}) + "\n")
+
+
+def test_uncommitted_marks_are_replayed_from_the_jsonl(tmp_path):
+    jsonl = tmp_path / "ckpt.jsonl"
+    _log(jsonl, ["a"])
+    store = CheckpointStore(db_path_for(str(jsonl)), jsonl_path=str(jsonl), commit_every=50)
+    _log(jsonl, ["b", "c"])
+    store.mark({"id": "b", "status": "drafted"})
+    store.mark({"id": "c", "status": "drafted"})
+    store._conn.close()  # crash: the batch of two marks is never committed
+
+    with CheckpointStore(db_path_for(str(jsonl)), jsonl_path=str(jsonl)) as reopened:
+        assert all(reopened.has(i) for i in "abc")
+
+
+def test_torn_last_line_is_left_for_the_next_open(tmp_path):
+    jsonl = tmp_path / "ckpt.jsonl"
+    _log(jsonl, ["a"])
+    with open(jsonl, "a") as fh:
+        fh.write('{"id": "b", "sta')
+    with CheckpointStore(db_path_for(str(jsonl)), jsonl_path=str(jsonl)) as store:
+        assert store.has("a") and not store.has("b")
+    with open(jsonl, "a") as fh:
+        fh.write('tus": "drafted"}\n')
+    with CheckpointStore(db_path_for(str(jsonl)), jsonl_path=str(jsonl)) as store:
+        assert store.has("b")
+
+
+def test_compact_keeps_one_line_per_id(tmp_path):
+    jsonl = tmp_path / "ckpt.jsonl"
+    _log(jsonl, ["a", "a", "b"])
+    with CheckpointStore(db_path_for(str(jsonl)), jsonl_path=str(jsonl)) as store:
+        stats = store.compact(str(jsonl))
+    assert (stats["jsonl_before"], stats["jsonl_after"], stats["ids"]) == (3, 2, 2)
+    with CheckpointStore(db_path_for(str(jsonl)), jsonl_path=str(jsonl)) as store:
+        assert store.count() == 2
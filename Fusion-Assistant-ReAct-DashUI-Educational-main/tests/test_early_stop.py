@@ -0,0 +1,39 @@
+# tests/test_early_stop.py
+from fusion_assistant_ReAct.llm.early_stop import completion_point
+from fusion_assistant_ReAct.telemetry import prompt_eval
+from fusion_assistant_ReAct.telemetry.prompt_eval import PromptEvalLogger
+
+
+def test_json_action_input_ends_at_closing_brace():
+    head = 'Thought: t\nAction: lcel_query_planner\nAction Input: {"query": "a {b}"}'
+    assert completion_point(head + "\nObservation: made up") == len(head)
+    assert completion_point('Action Input: {"query": "a", "context": ') is None
+
+
+def test_plain_text_action_input_ends_at_newline():
+    head = "Action: lcel_query_planner\nAction Input: failed logins by user"
+    assert completion_point(head) is None
+    assert completion_point(head + "\nThought: more") == len(head)
+
+
+def test_final_answer_ends_at_next_keyword_line():
+    head = "Thought: done\nFinal Answer: the query is where(a=1)\nsecond line"
+    assert completion_point(head) is None
+    assert completion_point(head + "\nQuestion: next") == len(head)
+
+
+class _Gen:
+    text = "Action Input: {}"
+
+
+class _Result:
+    generations = [[_Gen()]]
+
+
+def test_early_stopped_call_is_logged():
+    logger = PromptEvalLogger(label="react", verbose=False)
+    logger.on_llm_error(GeneratorExit(), run_id="r1", response=_Result())
+    rec = prompt_eval.get_recent(1)[0]
+    assert rec["early_stopped"] and rec["output_chars"] == len(_Gen.text) and rec["prompt_eval_count"] is None
+    logger.on_llm_error(RuntimeError("boom"), run_id="r2")
+    assert prompt_eval.get_recent(1)[0] is rec
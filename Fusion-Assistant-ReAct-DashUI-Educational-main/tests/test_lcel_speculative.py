@@ -0,0 +1,78 @@
+# tests/test_lcel_speculative.py
+import threading
+
+from fusion_assistant_ReAct.agents.lcel_agent import LCELQueryAgent
+
+
+class _Chain:
+    def __init__(self, name, calls):
+        self.name, self.calls = name, calls
+
+    def invoke(self, inputs):
+        self.calls.append(self.name)
+        return f"{self.name}:{len(inputs.get('context') or [])}"
+
+
+class _Retriever:
+    def __init__(self, calls, delay=0.0, fail=False):
+        self.calls, self.delay, self.fail = calls, delay, fail
+        self.release = threading.Event()
+
+    def invoke(self, query):
+        self.calls.append("retrieve")
+        if self.delay:
+            self.release.wait(self.delay)
+        if self.fail:
+            raise RuntimeError("index gone")
+        return ["doc1", "doc2"]
+
+
+class _Gate:
+    def __init__(self, answer):
+        self.answer = answer
+
+    def decide(self, q):
+        return self.answer
+
+
+def _agent(calls, retriever, gate_answer, deadline=5.0):
+    agent = LCELQueryAgent(
+        _Chain("qa", calls), retrieval_gate=_Gate(gate_answer), retriever=retriever,
+        combine_docs_chain=_Chain("combine", calls), speculative=True, speculative_deadline=deadline,
+    )
+    agent.direct_chain = _Chain("direct", calls)
+    return agent
+
+
+def test_gate_yes_uses_fetched_docs():
+    calls = []
+    agent = _agent(calls, _Retriever(calls), True)
+    assert agent._speculative_candidate("failed logins", []) == "combine:2"
+    assert agent.speculative_stats()["used"] == 1
+
+
+def test_gate_no_discards_docs():
+    calls = []
+    agent = _agent(calls, _Retriever(calls), False)
+    assert agent._speculative_candidate("change the user", []) == "direct:0"
+    assert agent.speculative_stats()["discarded"] == 1
+
+
+def test_timeout_answers_directly_without_second_retrieval():
+    calls = []
+    retriever = _Retriever(calls, delay=5.0)
+    agent = _agent(calls, retriever, True, deadline=0.05)
+    try:
+        assert agent._speculative_candidate("failed logins", []) == "direct:0"
+    finally:
+        retriever.release.set()
+    assert calls.count("retrieve") == 1 and "qa" not in calls
+    assert agent.speculative_stats()["timeout"] == 1
+
+
+def test_fetch_error_answers_directly():
+    calls = []
+    agent = _agent(calls, _Retriever(calls, fail=True), True)
+    assert agent._speculative_candidate("failed logins", []) == "direct:0"
+    assert calls.count("retrieve") == 1 and "qa" not in calls
+    assert agent.speculative_stats()["error"] == 1
@@ -0,0 +1,15 @@
+# tests/test_llm_models.py
+from fusion_assistant_ReAct.llm.models import build_chat_model, get_llm_for
+
+
+def test_worker_model_uses_explicit_base_url(monkeypatch):
+    monkeypatch.setenv("FAKE_OLLAMA", "0")
+    llm = build_chat_model(profile="draft", base_url="http://gpu2:11434")
+    assert llm.base_url == "http://gpu2:11434"
+
+
+def test_profiled_worker_model_uses_explicit_base_url(monkeypatch):
+    monkeypatch.setenv("FAKE_OLLAMA", "0")
+    llm = get_llm_for("asset_docs", base_url="http://gpu3:11434", model_kwargs={"num_ctx": 2048})
+    assert llm.model.base_url == "http://gpu3:11434"
+    assert llm.model.num_ctx == 2048
@@ -0,0 +1,19 @@
+# tests/test_lqel_repair.py
+from fusion_assistant_ReAct.lqel.repair import repair_lqel, sql_to_lqel
+
+
+def test_leading_prose_is_trimmed():
+    assert repair_lqel("Sure! where(a=1) groupby(b)")[0] == "where(a=1) groupby(b)"
+    assert repair_lqel("Here is your query:\nwhere(status=online)")[0] == "where(status=online)"
+
+
+def test_leading_search_terms_are_kept():
+    assert repair_lqel("status where(a=1)")[0] == "status where(a=1)"
+    assert repair_lqel('"disk: full" where(a=1)')[0] == '"disk: full" where(a=1)'
+
+
+def test_sql_rewrite_separates_clauses():
+    assert sql_to_lqel("SELECT * FROM t WHERE a=1 LIMIT 10") == "where(a=1) limit(10)"
+    body, fixes = repair_lqel("SELECT count(*) FROM t WHERE a=1 GROUP BY b")
+    assert body == "where(a=1) groupby(b) calculate(count)"
+    assert fixes == ["sql-rewrite"]
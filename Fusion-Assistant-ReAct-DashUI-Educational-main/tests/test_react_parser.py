@@ -0,0 +1,37 @@
+# tests/test_react_parser.py
+import pytest
+from langchain_core.agents import AgentAction, AgentFinish
+from langchain_core.exceptions import OutputParserException
+
+from fusion_assistant_ReAct.react_parser import TolerantReActOutputParser
+
+TOOLS = ["lcel_query_planner", "asset_discovery_ops"]
+
+
+def _parse(text):
+    return TolerantReActOutputParser(tool_names=TOOLS).parse(text)
+
+
+@pytest.mark.parametrize("action", ["none", "N/A", "No tool"])
+def test_no_tool_action_is_not_mapped_to_a_mentioned_tool(action):
+    text = f"Thought: the lcel_query_planner is not needed\nAction: {action}\nAction Input: {{\"query\": \"hi\"}}"
+    with pytest.raises(OutputParserException) as e:
+        _parse(text)
+    assert "Final Answer" in e.value.observation
+
+
+def test_no_tool_action_with_final_answer_finishes():
+    out = _parse("Thought: x\nAction: none\nAction Input: lcel_query_planner\nFinal Answer: hello")
+    assert isinstance(out, AgentFinish) and out.return_values["output"] == "hello"
+
+
+def test_unknown_action_name_is_not_replaced_by_a_mention():
+    with pytest.raises(OutputParserException):
+        _parse("Thought: x\nAction: web_search\nAction Input: lcel_query_planner")
+
+
+def test_near_miss_and_missing_action_still_recovered():
+    out = _parse("Thought: x\nAction: Lcel-Query-Planner\nAction Input: q")
+    assert isinstance(out, AgentAction) and out.tool == "lcel_query_planner"
+    out = _parse("Thought: I will use asset_discovery_ops\nAction Input: {\"query\": \"q\"}")
+    assert isinstance(out, AgentAction) and out.tool == "asset_discovery_ops"
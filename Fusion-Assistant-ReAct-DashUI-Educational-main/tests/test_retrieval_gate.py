@@ -0,0 +1,24 @@
+# tests/test_retrieval_gate.py
+from fusion_assistant_ReAct.retrieval.gate import LocalRetrievalGate
+
+
+class _BrokenEmbeddings:
+    calls = 0
+
+    def embed_documents(self, texts):
+        _BrokenEmbeddings.calls += 1
+        raise ConnectionError("embedding backend down")
+
+    def embed_query(self, text):
+        _BrokenEmbeddings.calls += 1
+        raise ConnectionError("embedding backend down")
+
+
+def test_failed_training_is_not_retried_per_query():
+    gate = LocalRetrievalGate(_BrokenEmbeddings(), examples_path=None)
+    assert gate.decide("failed logins by user") is None
+    calls = _BrokenEmbeddings.calls
+    assert calls >= 1
+    assert gate.decide("another query") is None
+    assert _BrokenEmbeddings.calls == calls
+    assert gate.stats()["fallback"] == 2
@@ -0,0 +1,57 @@
+# tests/test_router.py
+import json
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.tools import Tool
+
+from fusion_assistant_ReAct.router import ASSET_TOOL, LCEL_TOOL, FastPathRouter
+
+
+class _Recorder(BaseCallbackHandler):
+    def __init__(self):
+        self.started = []
+
+    def on_tool_start(self, serialized, input_str, **kwargs):
+        self.started.append((serialized.get("name"), input_str))
+
+
+class _Executor:
+    def __init__(self, handler):
+        self.calls = []
+        self.callbacks = [handler]
+        self.tools = [
+            Tool(name=name, description=name, func=lambda p, n=name: f"{n}:{json.loads(p)['query']}")
+            for name in (LCEL_TOOL, ASSET_TOOL)
+        ]
+
+    def invoke(self, inputs, *args, **kwargs):
+        self.calls.append(inputs)
+        return {"input": inputs["input"], "output": "react"}
+
+
+def _router():
+    handler = _Recorder()
+    return FastPathRouter(_Executor(handler), embeddings=None, enabled=True), handler
+
+
+def test_single_generic_word_does_not_start_a_batch_run():
+    router, _ = _router()
+    for q in ("who is the owner of this file?", "summarize the inventory", "email"):
+        assert router.route(q) == (None, "no-classifier")
+    assert router.route("draft emails to the owners of offline assets") == (ASSET_TOOL, "rule")
+
+
+def test_fast_path_fires_executor_callbacks():
+    router, handler = _router()
+    out = router.invoke({"input": "packed", "query": "where(a=1) lqel please"})
+    assert out["output"] == f"{LCEL_TOOL}:where(a=1) lqel please"
+    assert handler.started and handler.started[0][0] == LCEL_TOOL
+    assert router.executor.calls == []
+
+
+def test_lqel_request_wins_over_open_asset_document():
+    router, _ = _router()
+    doc = '{"hostname": "web01", "ip": "10.0.0.5"}'
+    q = "write an lqel query: where(source_asset=web01) groupby(user)"
+    assert router.route(q, doc) == (LCEL_TOOL, "rule")
+    assert router.route("review this", doc) == (ASSET_TOOL, "json-asset-context")
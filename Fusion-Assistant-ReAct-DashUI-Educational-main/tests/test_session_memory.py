@@ -0,0 +1,23 @@
+# tests/test_session_memory.py
+from fusion_assistant_ReAct.persistence import session_memory as sm
+
+
+def test_evict_listeners_see_lru_idle_and_dropped_sessions(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(sm.time, "time", lambda: clock[0])
+    store = sm.SessionMemoryStore(keep_turns=2, max_tokens=100, idle_seconds=60, max_sessions=2)
+    state = {}
+    store.on_evict(lambda sid: state.pop(sid, None))
+
+    for sid in ("a", "b", "c"):
+        store.touch(sid)
+        state[sid] = object()
+    assert sorted(state) == ["b", "c"]  # "a" was least recently used
+
+    clock[0] += 120
+    store.window("d").add("hi", "hello")
+    state["d"] = object()
+    assert sorted(state) == ["d"]  # "b" and "c" went idle
+
+    store.drop("d")
+    assert state == {} and store.stats()["sessions"] == 0